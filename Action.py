@@ -15,21 +15,56 @@ class Action(Enum):
     GRAB = "grab"
     CLIMB = "climb"
 
+class CellFeatures:
+    """Knowledge-derived facts about one target cell, shared by every action aimed at it.
+
+    The probabilities run the frontier inference, so they are only worked out
+    when an action first needs them.
+    """
+    __slots__ = ("definitely_safe", "safe", "dangerous", "visited",
+                 "curiosity_bonus", "exploration_bonus",
+                 "_pos", "_knowledge_base", "_pit_probability", "_wumpus_probability")
+
+    def __init__(self, pos: Tuple[int, int], knowledge_base):
+        self._pos = pos
+        self._knowledge_base = knowledge_base
+        self._pit_probability = None
+        self._wumpus_probability = None
+
+    @property
+    def pit_probability(self) -> float:
+        if self._pit_probability is None:
+            self._pit_probability = self._knowledge_base.get_pit_probability(self._pos)
+        return self._pit_probability
+
+    @property
+    def wumpus_probability(self) -> float:
+        if self._wumpus_probability is None:
+            self._wumpus_probability = self._knowledge_base.get_wumpus_probability(self._pos)
+        return self._wumpus_probability
+
 class ActionSelector:
-    def __init__(self, epsilon=0.1, curiosity_weight=0.3, decay_rate=0.995):
+    def __init__(self, epsilon=0.1, curiosity_weight=0.3, decay_rate=0.995, rng: Optional[random.Random] = None):
         self.epsilon = epsilon
+        # Exploration and tie breaks draw from this generator so episodes can be replayed
+        self.rng = rng if rng is not None else random.Random()
         self.curiosity_weight = curiosity_weight
         self.decay_rate = decay_rate
         self.step_count = 0
         
+        # Per-step evaluation context, valid while the knowledge base version is unchanged
+        self._features = {}
+        self._features_kb = None
+        self._features_version = None
+        
     def select_action(self, current_pos: Tuple[int, int], knowledge_base, 
                      available_actions: List[Action], has_arrow: bool = True) -> Action:
         self.step_count += 1
         
         current_epsilon = self.epsilon * (self.decay_rate ** self.step_count)
         
-        if random.random() < current_epsilon:
-            return random.choice(available_actions)
+        if self.rng.random() < current_epsilon:
+            return self.rng.choice(available_actions)
         
         action_utilities = {}
         
@@ -44,7 +79,7 @@ class ActionSelector:
                        if utility == max_utility]
         
         if len(best_actions) > 1:
-            tie_breaker = {action: random.random() * 0.1 for action in best_actions}
+            tie_breaker = {action: self.rng.random() * 0.1 for action in best_actions}
             best_action = max(best_actions, key=lambda a: tie_breaker[a])
         else:
             best_action = best_actions[0]
@@ -76,28 +111,24 @@ class ActionSelector:
         if target_pos is None:
             return -1000.0
         
+        features = self.get_cell_features(target_pos, knowledge_base)
         base_utility = 0.0
         
-        if knowledge_base.is_definitely_safe(target_pos):
+        if features.definitely_safe:
             base_utility += 100.0
-        elif knowledge_base.is_safe(target_pos):
+        elif features.safe:
             base_utility += 50.0
-        elif knowledge_base.is_dangerous(target_pos):
-            pit_prob = knowledge_base.get_pit_probability(target_pos)
-            wumpus_prob = knowledge_base.get_wumpus_probability(target_pos)
-            
-            danger_penalty = -(pit_prob * 500 + wumpus_prob * 400)
+        elif features.dangerous:
+            danger_penalty = -(features.pit_probability * 500 + features.wumpus_probability * 400)
             base_utility += danger_penalty
         
-        if target_pos not in knowledge_base.visited:
-            curiosity_bonus = self._calculate_curiosity_bonus(target_pos, knowledge_base)
-            base_utility += curiosity_bonus
+        if not features.visited:
+            base_utility += features.curiosity_bonus
         
         distance_penalty = self._calculate_distance_penalty(current_pos, target_pos)
         base_utility -= distance_penalty
         
-        exploration_bonus = self._calculate_exploration_bonus(target_pos, knowledge_base)
-        base_utility += exploration_bonus
+        base_utility += features.exploration_bonus
         
         return base_utility
     
@@ -110,7 +141,7 @@ class ActionSelector:
         if target_pos is None:
             return -100.0
         
-        wumpus_prob = knowledge_base.get_wumpus_probability(target_pos)
+        wumpus_prob = self.get_cell_features(target_pos, knowledge_base).wumpus_probability
         if wumpus_prob > 0.5:
             return 200.0 + wumpus_prob * 100
         elif wumpus_prob > 0.2:
@@ -118,6 +149,26 @@ class ActionSelector:
         
         return -10.0
     
+    def get_cell_features(self, pos: Tuple[int, int], knowledge_base) -> CellFeatures:
+        """Evaluate pos once per knowledge base version and reuse it for every action"""
+        if (knowledge_base is not self._features_kb or
+                knowledge_base.version != self._features_version):
+            self._features = {}
+            self._features_kb = knowledge_base
+            self._features_version = knowledge_base.version
+        
+        features = self._features.get(pos)
+        if features is None:
+            features = CellFeatures(pos, knowledge_base)
+            features.definitely_safe = knowledge_base.is_definitely_safe(pos)
+            features.safe = knowledge_base.is_safe(pos)
+            features.dangerous = knowledge_base.is_dangerous(pos)
+            features.visited = pos in knowledge_base.visited
+            features.curiosity_bonus = self._calculate_curiosity_bonus(pos, knowledge_base)
+            features.exploration_bonus = self._calculate_exploration_bonus(pos, knowledge_base)
+            self._features[pos] = features
+        return features
+    
     def _calculate_curiosity_bonus(self, pos: Tuple[int, int], knowledge_base) -> float:
         if pos in knowledge_base.visited:
             return 0.0
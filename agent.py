@@ -1,21 +1,53 @@
+import copy
+import logging
 import random
-from typing import Set, Tuple, List, Optional, Dict
+from typing import FrozenSet, NamedTuple, Set, Tuple, List, Optional, Dict
 from collections import deque
-from heapq import heappush, heappop
-from knowledge_base import KnowledgeBase
+from environment import copy_random
+from knowledge_base import KnowledgeBase, KnowledgeSnapshot
 from Action import ActionSelector, Action
+from codes import (ACTION_CODES, RESULT_CODES, UNKNOWN_ACTION, INVALID_ACTION, FORWARD, TURN_LEFT,
+                   TURN_RIGHT, GRAB, SHOOT, CLIMB, MOVED, GRABBED_GOLD, WUMPUS_KILLED, CLIMBED_OUT)
+from path_planner import SafePathPlanner
+from topology import GridTopology
+
+logger = logging.getLogger(__name__)
+
+class AgentSnapshot(NamedTuple):
+    """Immutable state of a WumpusAgent, its random generator and its knowledge base"""
+    position: Tuple[int, int]
+    direction: int
+    has_arrow: bool
+    has_gold: bool
+    plan: Tuple[str, ...]
+    returning_home: bool
+    score: int
+    move_count: int
+    shot_attempted: bool
+    last_stench_positions: FrozenSet[Tuple[int, int]]
+    consecutive_stench: int
+    danger_threshold: float
+    last_safe_position: Tuple[int, int]
+    selector_steps: int
+    rng_state: tuple
+    knowledge: KnowledgeSnapshot
 
 class WumpusAgent:
-    def __init__(self, size=10):
+    def __init__(self, size=10, num_wumpuses=2, kb_class=KnowledgeBase, rng: Optional[random.Random] = None):
         self.size = size
+        self.num_wumpuses = num_wumpuses
+        self.kb_class = kb_class
+        self.rng = rng if rng is not None else random.Random()
         self.reset()
 
     def reset(self):
+        self.topology = GridTopology.for_size(self.size)
         self.position = (0, 0)
         self.direction = 0
         self.has_arrow = True
         self.has_gold = False
-        self.kb = KnowledgeBase(self.size)
+        self.kb = self.kb_class(self.size, self.num_wumpuses)
+        self.planner = SafePathPlanner(self.topology)
         self.plan = deque()
         self.returning_home = False
         self.score = 0
@@ -29,9 +61,51 @@ class WumpusAgent:
         self.action_selector = ActionSelector(
             epsilon=0.1,
             curiosity_weight=0.3,
-            decay_rate=0.995
+            decay_rate=0.995,
+            rng=self.rng
         )
 
+    def snapshot(self) -> AgentSnapshot:
+        """Immutable copy of the current state; the knowledge base part is shared while unchanged"""
+        return AgentSnapshot(
+            self.position, self.direction, self.has_arrow, self.has_gold, tuple(self.plan),
+            self.returning_home, self.score, self.move_count, self.shot_attempted,
+            frozenset(self.last_stench_positions), self.consecutive_stench, self.danger_threshold,
+            self.last_safe_position, self.action_selector.step_count, self.rng.getstate(),
+            self.kb.snapshot())
+
+    def restore(self, snapshot: AgentSnapshot):
+        """Return to a snapshot's state"""
+        self.position = snapshot.position
+        self.direction = snapshot.direction
+        self.has_arrow = snapshot.has_arrow
+        self.has_gold = snapshot.has_gold
+        self.plan = deque(snapshot.plan)
+        self.returning_home = snapshot.returning_home
+        self.score = snapshot.score
+        self.move_count = snapshot.move_count
+        self.shot_attempted = snapshot.shot_attempted
+        self.last_stench_positions = set(snapshot.last_stench_positions)
+        self.consecutive_stench = snapshot.consecutive_stench
+        self.danger_threshold = snapshot.danger_threshold
+        self.last_safe_position = snapshot.last_safe_position
+        self.action_selector.step_count = snapshot.selector_steps
+        self.rng.setstate(snapshot.rng_state)
+        self.kb.restore(snapshot.knowledge)
+
+    def clone(self, rng: Optional[random.Random] = None) -> "WumpusAgent":
+        """Independent copy; without rng it makes the same random choices this agent would"""
+        other = copy.copy(self)
+        other.rng = rng if rng is not None else copy_random(self.rng)
+        other.kb = self.kb.clone()
+        other.planner = SafePathPlanner(self.topology)
+        other.plan = self.plan.copy()
+        other.last_stench_positions = set(self.last_stench_positions)
+        selector = other.action_selector = copy.copy(self.action_selector)
+        selector.rng = other.rng
+        selector._features_kb = None
+        return other
+
     def get_action(self, percepts: List[str]) -> str:
         
         self.kb.add_percept(self.position, percepts)
@@ -69,6 +143,12 @@ class WumpusAgent:
                 next_pos = self._get_next_position()
                 if not self._is_definitely_safe(next_pos):
                     self.plan.clear()
+                    if self.returning_home:
+                        # The planner has already repaired its route home around the change
+                        path = self._find_safe_path_to_start()
+                        if path:
+                            self.plan.extend(self._path_to_actions(path))
+                            return self.plan.popleft()
                     return self._choose_action_with_selector(percepts)
             return next_action
 
@@ -83,11 +163,23 @@ class WumpusAgent:
      safe_actions = self._filter_safe_actions(available_actions, percepts)
 
      if self.kb.safe_cells==self.kb.visited:
-        print("No safe actions available, considering risky moves")
+        logger.debug("No safe actions available at %s, considering risky moves", self.position)
         risky_action = self._choose_risky_move(available_actions, percepts)
         if risky_action:
             return risky_action
     
+     if not any(self._get_target_position_from_action(action) not in self.kb.visited
+                for action in safe_actions if action.value.startswith("move_")):
+        # Nothing new next door: one sweep gives the cost of and path to every
+        # reachable safe unvisited cell, so head for the best of them
+        frontier = self.planner.frontier(self.kb, self.position, self.direction)
+        if frontier.distances:
+            target = self._choose_best_safe_target(frontier.distances)
+            path = frontier.path(target)
+            if path:
+                self.plan.extend(self._path_to_actions(path))
+                return self.plan.popleft()
+
      if safe_actions:
         selected_action = self.action_selector.select_action(
             self.position,
@@ -98,7 +190,7 @@ class WumpusAgent:
         return self._convert_action_to_command(selected_action)
      
      if self._should_make_risky_move():
-        print("No safe actions available, considering risky moves")
+        logger.debug("No safe actions available at %s, considering risky moves", self.position)
         risky_action = self._choose_risky_move(available_actions, percepts)
         if risky_action:
             return risky_action
@@ -111,7 +203,7 @@ class WumpusAgent:
 
     def _choose_risky_move(self, available_actions: List[Action], percepts: List[str]) -> Optional[str]:
      risky_moves = []
-     print(available_actions)
+     logger.debug("Risky move candidates: %s", available_actions)
     
      for action in available_actions:
         if action.value.startswith("move_"):
@@ -128,12 +220,12 @@ class WumpusAgent:
                 risk_score -= info_bonus
                 
                 risky_moves.append((risk_score, action, target_pos))
-     print(risky_moves)
+     logger.debug("Risky moves: %s", risky_moves)
      if not risky_moves:
         return None
         
      risky_moves.sort(key=lambda x: x[0])
-     print("sorted moves",risky_moves)
+     logger.debug("Sorted risky moves: %s", risky_moves)
     
      best_score, best_action, best_pos = risky_moves[0]
     
@@ -251,41 +343,6 @@ class WumpusAgent:
         
         return self.direction
 
-    def _choose_action(self, percepts: List[str]) -> str:
-        if self._is_in_immediate_danger(percepts):
-            return self._emergency_action(percepts)
-
-        if "Stench" in percepts and not self.shot_attempted and self.has_arrow:
-            shoot_action = self._try_shoot_wumpus(percepts)
-            if shoot_action:
-                return shoot_action
-
-        safe_unvisited = self._get_definitely_safe_unvisited()
-        if safe_unvisited:
-            target = self._choose_best_safe_target(safe_unvisited)
-            path = self._find_safe_path_to_position(target)
-            if path:
-                self.plan.extend(self._path_to_actions(path))
-                return self.plan.popleft()
-
-        if not self.returning_home:
-            self.returning_home = True
-            path = self._find_safe_path_to_start()
-            if path:
-                self.plan.extend(self._path_to_actions(path))
-                return self.plan.popleft()
-
-        return self._emergency_action(percepts)
-
-    def _is_in_immediate_danger(self, percepts: List[str]) -> bool:
-        if ("Stench" in percepts or "Breeze" in percepts) and not self.shot_attempted:
-            return True
-        
-        if not self._is_definitely_safe(self.position):
-            return True
-            
-        return False
-
     def _emergency_action(self, percepts: List[str]) -> str:
         safe_moves = self._get_safe_adjacent_moves()
         
@@ -307,16 +364,8 @@ class WumpusAgent:
         return "TurnLeft"
 
     def _get_safe_adjacent_moves(self) -> List[Tuple[int, int]]:
-        safe_moves = []
-        x, y = self.position
-        
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if (0 <= nx < self.size and 0 <= ny < self.size and 
-                self._is_definitely_safe((nx, ny))):
-                safe_moves.append((nx, ny))
-        
-        return safe_moves
+        return [pos for pos in self.topology.adjacent(self.position)
+                if self._is_definitely_safe(pos)]
 
     def _is_definitely_safe(self, pos: Tuple[int, int]) -> bool:
         if pos in self.kb.visited:
@@ -338,9 +387,10 @@ class WumpusAgent:
         
         return safe_unvisited
 
-    def _choose_best_safe_target(self, safe_targets: Set[Tuple[int, int]]) -> Tuple[int, int]:
+    def _choose_best_safe_target(self, safe_targets: Dict[Tuple[int, int], int]) -> Tuple[int, int]:
+        """Best of the targets, given the number of actions needed to reach each"""
         def target_score(pos):
-            distance_score = 1.0 / (1 + self._manhattan_distance(self.position, pos))
+            distance_score = 1.0 / (1 + safe_targets[pos])
             
             unexplored_neighbors = sum(1 for adj in self._get_adjacent(pos) 
                                      if adj not in self.kb.visited and self._is_definitely_safe(adj))
@@ -355,15 +405,9 @@ class WumpusAgent:
             return None
 
         if "Stench" in percepts:
-            x, y = self.position
-            
-            possible_targets = []
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < self.size and 0 <= ny < self.size and 
-                    (nx, ny) in self.kb.wumpus_possible and
-                    self.kb.get_wumpus_probability((nx, ny)) > 0.7):
-                    possible_targets.append((nx, ny))
+            possible_targets = [pos for pos in self.topology.adjacent(self.position)
+                                if pos in self.kb.wumpus_possible and
+                                self.kb.get_wumpus_probability(pos) > 0.7]
             
             if possible_targets:
                 target = max(possible_targets, key=lambda pos: self.kb.get_wumpus_probability(pos))
@@ -381,35 +425,7 @@ class WumpusAgent:
 
     def _find_safe_path_to_position(self, target: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Find a path using only definitely safe cells"""
-        if self.position == target:
-            return []
-
-        open_set = [(0, self.position)]
-        came_from = {}
-        g_score = {self.position: 0}
-
-        while open_set:
-            current = heappop(open_set)[1]
-            
-            if current == target:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                return list(reversed(path))
-
-            for neighbor in self._get_adjacent(current):
-                if not self._is_definitely_safe(neighbor):
-                    continue
-
-                tentative_g_score = g_score[current] + 1
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score = tentative_g_score + self._manhattan_distance(neighbor, target)
-                    heappush(open_set, (f_score, neighbor))
-
-        return []
+        return self.planner.path(self.kb, self.position, target, self.direction)
 
     def _find_safe_path_to_start(self) -> List[Tuple[int, int]]:
         """Find a safe path back to starting position"""
@@ -417,10 +433,7 @@ class WumpusAgent:
 
     def _get_next_position(self) -> Tuple[int, int]:
         """Get the position agent would move to if going forward"""
-        x, y = self.position
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        dx, dy = directions[self.direction]
-        return (x + dx, y + dy)
+        return self.topology.ahead(self.position, self.direction)
 
     def _path_to_actions(self, path: List[Tuple[int, int]]) -> List[str]:
         """Convert path to sequence of actions"""
@@ -494,23 +507,18 @@ class WumpusAgent:
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
-    def _get_adjacent(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+    def _get_adjacent(self, pos: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
         """Get all adjacent positions within bounds"""
-        x, y = pos
-        adjacent = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.size and 0 <= ny < self.size:
-                adjacent.append((nx, ny))
-        return adjacent
+        return self.topology.adjacent(pos)
 
     def update_state(self, action: str, result: str):
         """Update agent state based on action result"""
-        if action == "Forward" and "Moved forward" in result:
-            x, y = self.position
-            directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-            dx, dy = directions[self.direction]
-            new_pos = (x + dx, y + dy)
+        self.apply_result(ACTION_CODES.get(action, UNKNOWN_ACTION), RESULT_CODES.get(result, INVALID_ACTION))
+
+    def apply_result(self, action: int, result: int):
+        """Update agent state from an ActionCode and the ResultCode it produced"""
+        if action == FORWARD and result == MOVED:
+            new_pos = self.topology.ahead(self.position, self.direction)
             
             # Update last safe position before moving
             if self._is_definitely_safe(self.position):
@@ -520,23 +528,23 @@ class WumpusAgent:
             self.kb.add_visit(self.position)
             self.score -= 1
 
-        elif action == "TurnLeft":
+        elif action == TURN_LEFT:
             self.direction = (self.direction - 1) % 4
 
-        elif action == "TurnRight":
+        elif action == TURN_RIGHT:
             self.direction = (self.direction + 1) % 4
 
-        elif action == "Grab" and "Grabbed gold" in result:
+        elif action == GRAB and result == GRABBED_GOLD:
             self.has_gold = True
             self.score += 1000
 
-        elif action == "Shoot":
+        elif action == SHOOT:
             self.has_arrow = False
             self.score -= 10
-            if "Wumpus died" in result:
+            if result == WUMPUS_KILLED:
                 self.kb.wumpus_killed()
 
-        elif action == "Climb" and "Climbed out" in result:
+        elif action == CLIMB and result == CLIMBED_OUT:
             self.score += 500
 
     def get_score(self) -> int:
@@ -0,0 +1,216 @@
+"""Vectorized Wumpus World: N independent worlds stepped together with NumPy.
+
+Cells are addressed by flat index y * size + x. Actions and results are the
+small integer codes from codes.py instead of the strings used by
+WumpusEnvironment; ACTION_NAMES / RESULT_NAMES map them back.
+"""
+import numpy as np
+
+from environment import WumpusEnvironment
+from topology import GridTopology, DIRECTIONS
+from world_generator import WorldGenerator, IMPOSSIBLE
+from codes import (FORWARD, TURN_LEFT, TURN_RIGHT, GRAB, SHOOT, CLIMB, ACTION_NAMES,
+                   MOVED, BUMP, FELL_INTO_PIT, EATEN_BY_WUMPUS, TURNED_LEFT, TURNED_RIGHT, GRABBED_GOLD,
+                   NO_GOLD, ARROW_MISSED, ARROW_HIT_WALL, WUMPUS_KILLED, NO_ARROW, CLIMBED_OUT,
+                   CANNOT_CLIMB, AGENT_DEAD, INVALID_ACTION, RESULT_NAMES, STENCH, BREEZE, GLITTER)
+
+class BatchWumpusEnvironment:
+    def __init__(self, num_worlds: int, size=10, num_wumpuses=2, seed=None, reject_impossible=False):
+        self.num_worlds = num_worlds
+        self.size = size
+        self.num_wumpuses = num_wumpuses
+        self.rng = np.random.default_rng(seed)
+
+        cells = size * size
+        self.generator = WorldGenerator(size, num_wumpuses, reject_impossible=reject_impossible)
+
+        # Neighbor indices padded with a sentinel column (index == cells) for edge cells
+        topology = GridTopology.for_size(size)
+        self.neighbors = np.full((cells, 4), cells, dtype=np.int64)
+        for index, cell in enumerate(topology.cells):
+            for slot, (ax, ay) in enumerate(topology.neighbors[cell]):
+                self.neighbors[index, slot] = ay * size + ax
+        self.direction_dx = np.array([dx for dx, _ in DIRECTIONS])
+        self.direction_dy = np.array([dy for _, dy in DIRECTIONS])
+
+        n = num_worlds
+        self.pits = np.zeros((n, cells), dtype=bool)
+        self.wumpus_positions = np.zeros((n, cells), dtype=bool)
+        self.wumpus_alive = np.zeros((n, cells), dtype=bool)
+        self.gold = np.zeros(n, dtype=np.int64)
+        self.solvability = np.zeros(n, dtype=np.uint8)
+        self.breeze = np.zeros((n, cells + 1), dtype=bool)
+        self.stench = np.zeros((n, cells + 1), dtype=np.uint8)
+
+        self.agent_x = np.zeros(n, dtype=np.int64)
+        self.agent_y = np.zeros(n, dtype=np.int64)
+        self.agent_direction = np.zeros(n, dtype=np.int64)
+        self.agent_alive = np.ones(n, dtype=bool)
+        self.agent_has_gold = np.zeros(n, dtype=bool)
+        self.agent_has_arrow = np.ones(n, dtype=bool)
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """Generate fresh random worlds for all worlds, or only where mask is True"""
+        worlds = np.arange(self.num_worlds) if mask is None else np.flatnonzero(mask)
+        while len(worlds):
+            failed = self._generate(worlds)
+            worlds = worlds[failed]
+
+    def restart(self, mask=None):
+        """Put agents back at the start of their current worlds"""
+        worlds = np.arange(self.num_worlds) if mask is None else np.flatnonzero(mask)
+        self.wumpus_alive[worlds] = self.wumpus_positions[worlds]
+        self.agent_x[worlds] = 0
+        self.agent_y[worlds] = 0
+        self.agent_direction[worlds] = 0
+        self.agent_alive[worlds] = True
+        self.agent_has_gold[worlds] = False
+        self.agent_has_arrow[worlds] = True
+        self._build_percept_maps(worlds)
+
+    def _generate(self, worlds: np.ndarray) -> np.ndarray:
+        """Draw new layouts for the given worlds; returns a mask of worlds where the
+        Wumpuses could not be placed and which must be drawn again"""
+        pits, wumpuses, gold, failed = self.generator.generate_arrays(len(worlds), self.rng)
+        solvability = self.generator.classify_arrays(pits, wumpuses, gold)
+        if self.generator.reject_impossible:
+            failed |= solvability == IMPOSSIBLE
+
+        self.pits[worlds] = pits
+        self.wumpus_positions[worlds] = wumpuses
+        self.gold[worlds] = gold
+        self.solvability[worlds] = solvability
+        self.restart(np.isin(np.arange(self.num_worlds), worlds))
+        return failed
+
+    def load_environment(self, world: int, environment: WumpusEnvironment):
+        """Copy the layout of a scalar environment into one of the batch worlds"""
+        size = self.size
+        self.pits[world] = False
+        self.wumpus_positions[world] = False
+        for x, y in environment.pits:
+            self.pits[world, y * size + x] = True
+        for x, y in environment.wumpus_positions:
+            self.wumpus_positions[world, y * size + x] = True
+        gx, gy = environment.gold_pos
+        self.gold[world] = gy * size + gx
+        self.solvability[world] = environment.solvability
+        self.restart(np.arange(self.num_worlds) == world)
+
+    def _build_percept_maps(self, worlds: np.ndarray):
+        cells = self.size * self.size
+        padded = np.zeros((len(worlds), cells + 1), dtype=np.uint8)
+        padded[:, :cells] = self.pits[worlds]
+        self.breeze[worlds, :cells] = padded[:, self.neighbors].any(axis=2)
+        padded[:, :cells] = self.wumpus_alive[worlds]
+        self.stench[worlds, :cells] = padded[:, self.neighbors].sum(axis=2)
+        self.breeze[worlds, cells] = False
+        self.stench[worlds, cells] = 0
+
+    def agent_index(self) -> np.ndarray:
+        return self.agent_y * self.size + self.agent_x
+
+    def get_percepts(self) -> np.ndarray:
+        """Percept bit flags (STENCH | BREEZE | GLITTER) for every world"""
+        worlds = np.arange(self.num_worlds)
+        index = self.agent_index()
+        percepts = np.where(self.stench[worlds, index] > 0, STENCH, 0)
+        percepts |= np.where(self.breeze[worlds, index], BREEZE, 0)
+        percepts |= np.where((index == self.gold) & ~self.agent_has_gold, GLITTER, 0)
+        return percepts.astype(np.uint8)
+
+    def execute_action(self, actions: np.ndarray) -> np.ndarray:
+        """Apply one action code per world and return one result code per world"""
+        actions = np.asarray(actions)
+        results = np.full(self.num_worlds, INVALID_ACTION, dtype=np.int64)
+        alive = self.agent_alive.copy()
+        results[~alive] = AGENT_DEAD
+
+        self._move_forward(np.flatnonzero(alive & (actions == FORWARD)), results)
+
+        turning = np.flatnonzero(alive & (actions == TURN_LEFT))
+        self.agent_direction[turning] = (self.agent_direction[turning] - 1) % 4
+        results[turning] = TURNED_LEFT
+        turning = np.flatnonzero(alive & (actions == TURN_RIGHT))
+        self.agent_direction[turning] = (self.agent_direction[turning] + 1) % 4
+        results[turning] = TURNED_RIGHT
+
+        grabbing = np.flatnonzero(alive & (actions == GRAB))
+        success = (self.agent_index()[grabbing] == self.gold[grabbing]) & ~self.agent_has_gold[grabbing]
+        self.agent_has_gold[grabbing[success]] = True
+        results[grabbing] = np.where(success, GRABBED_GOLD, NO_GOLD)
+
+        self._shoot_arrow(np.flatnonzero(alive & (actions == SHOOT)), results)
+
+        climbing = np.flatnonzero(alive & (actions == CLIMB))
+        at_start = (self.agent_x[climbing] == 0) & (self.agent_y[climbing] == 0)
+        results[climbing] = np.where(at_start, CLIMBED_OUT, CANNOT_CLIMB)
+        return results
+
+    def _move_forward(self, worlds: np.ndarray, results: np.ndarray):
+        direction = self.agent_direction[worlds]
+        new_x = self.agent_x[worlds] + self.direction_dx[direction]
+        new_y = self.agent_y[worlds] + self.direction_dy[direction]
+        inside = (new_x >= 0) & (new_x < self.size) & (new_y >= 0) & (new_y < self.size)
+        results[worlds[~inside]] = BUMP
+
+        worlds, new_x, new_y = worlds[inside], new_x[inside], new_y[inside]
+        self.agent_x[worlds] = new_x
+        self.agent_y[worlds] = new_y
+        index = new_y * self.size + new_x
+        in_pit = self.pits[worlds, index]
+        eaten = ~in_pit & self.wumpus_alive[worlds, index]
+        self.agent_alive[worlds[in_pit | eaten]] = False
+        results[worlds] = np.where(in_pit, FELL_INTO_PIT, np.where(eaten, EATEN_BY_WUMPUS, MOVED))
+
+    def _shoot_arrow(self, worlds: np.ndarray, results: np.ndarray):
+        results[worlds[~self.agent_has_arrow[worlds]]] = NO_ARROW
+        worlds = worlds[self.agent_has_arrow[worlds]]
+        self.agent_has_arrow[worlds] = False
+
+        # Arrow has 70% chance to hit if aimed correctly
+        missed = self.rng.random(len(worlds)) > 0.7
+        results[worlds[missed]] = ARROW_MISSED
+        worlds = worlds[~missed]
+        if not len(worlds):
+            return
+
+        # Walk every arrow along its heading at once and find the first living Wumpus
+        direction = self.agent_direction[worlds]
+        steps = np.arange(1, self.size)
+        ray_x = self.agent_x[worlds, None] + self.direction_dx[direction][:, None] * steps
+        ray_y = self.agent_y[worlds, None] + self.direction_dy[direction][:, None] * steps
+        inside = (ray_x >= 0) & (ray_x < self.size) & (ray_y >= 0) & (ray_y < self.size)
+        ray_index = np.where(inside, ray_y * self.size + ray_x, 0)
+        hits = inside & self.wumpus_alive[worlds[:, None], ray_index]
+        any_hit = hits.any(axis=1)
+        results[worlds[~any_hit]] = ARROW_HIT_WALL
+
+        killers = worlds[any_hit]
+        killed = ray_index[any_hit, np.argmax(hits[any_hit], axis=1)]
+        self.wumpus_alive[killers, killed] = False
+        np.subtract.at(self.stench, (killers[:, None], self.neighbors[killed]), 1)
+        self.stench[killers, -1] = 0
+        results[killers] = WUMPUS_KILLED
+
+    def to_environment(self, world: int) -> WumpusEnvironment:
+        """Build a scalar WumpusEnvironment holding the current state of one world"""
+        size = self.size
+        environment = WumpusEnvironment(size, self.num_wumpuses)
+        environment.pits = {(i % size, i // size) for i in np.flatnonzero(self.pits[world])}
+        environment.wumpus_positions = {(i % size, i // size)
+                                        for i in np.flatnonzero(self.wumpus_positions[world])}
+        environment.gold_pos = (int(self.gold[world]) % size, int(self.gold[world]) // size)
+        environment.solvability = int(self.solvability[world])
+        environment.restart()
+        environment.wumpus_alive = {(i % size, i // size)
+                                    for i in np.flatnonzero(self.wumpus_alive[world])}
+        environment._build_percept_maps()
+        environment.agent_pos = (int(self.agent_x[world]), int(self.agent_y[world]))
+        environment.agent_direction = int(self.agent_direction[world])
+        environment.agent_alive = bool(self.agent_alive[world])
+        environment.agent_has_gold = bool(self.agent_has_gold[world])
+        environment.agent_has_arrow = bool(self.agent_has_arrow[world])
+        return environment
@@ -0,0 +1,256 @@
+from collections.abc import MutableSet
+from typing import Tuple
+
+from knowledge_base import KnowledgeBase
+from topology import GridTopology
+
+def _popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+if hasattr(int, "bit_count"):
+    _popcount = int.bit_count
+
+class BitSet(MutableSet):
+    """Set of (x, y) cells stored as the bits of one int (cell index = y * size + x)"""
+    __slots__ = ("size", "bits")
+
+    def __init__(self, size: int, bits: int = 0):
+        self.size = size
+        self.bits = bits
+
+    def __contains__(self, pos) -> bool:
+        x, y = pos
+        size = self.size
+        if 0 <= x < size and 0 <= y < size:
+            return self.bits & (1 << (y * size + x)) != 0
+        return False
+
+    def __iter__(self):
+        # Scanning the binary string is linear in the board size once, whereas
+        # peeling off low bits one at a time costs a full-width int op per cell
+        size = self.size
+        digits = bin(self.bits)[:1:-1]
+        index = digits.find("1")
+        while index >= 0:
+            yield (index % size, index // size)
+            index = digits.find("1", index + 1)
+
+    def __len__(self) -> int:
+        return _popcount(self.bits)
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, BitSet):
+            return self.size == other.size and self.bits == other.bits
+        return MutableSet.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"BitSet({sorted(self)})"
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def __sub__(self, other):
+        if isinstance(other, BitSet):
+            return BitSet(self.size, self.bits & ~other.bits)
+        return MutableSet.__sub__(self, other)
+
+    def __and__(self, other):
+        if isinstance(other, BitSet):
+            return BitSet(self.size, self.bits & other.bits)
+        return MutableSet.__and__(self, other)
+
+    def __or__(self, other):
+        if isinstance(other, BitSet):
+            return BitSet(self.size, self.bits | other.bits)
+        return MutableSet.__or__(self, other)
+
+    def add(self, pos: Tuple[int, int]):
+        x, y = pos
+        self.bits |= 1 << (y * self.size + x)
+
+    def discard(self, pos: Tuple[int, int]):
+        x, y = pos
+        size = self.size
+        if 0 <= x < size and 0 <= y < size:
+            self.bits &= ~(1 << (y * size + x))
+
+    def clear(self):
+        self.bits = 0
+
+    def copy(self) -> "BitSet":
+        return BitSet(self.size, self.bits)
+
+class BitboardKnowledgeBase(KnowledgeBase):
+    """KnowledgeBase backed by integer bitboards instead of sets of tuples.
+
+    The cell sets are exposed as BitSet views, so code that reads
+    `kb.visited`, `kb.safe_cells` and friends keeps working unchanged, while
+    the inference steps work on whole boards with a few bitwise operations.
+    """
+
+    def __init__(self, size=10, num_wumpuses=2, incremental=True, exact_probabilities=True):
+        self.size = size
+        self._dirty_bits = 0
+        self._safe_bits_version = None
+        self._safe_bits = 0
+
+        super().__init__(size, num_wumpuses, incremental, exact_probabilities)
+
+    def _new_cell_set(self) -> BitSet:
+        return BitSet(self.size)
+
+    def _freeze_cells(self, cells: BitSet) -> int:
+        return cells.bits
+
+    def _thaw_cells(self, bits: int) -> BitSet:
+        return BitSet(self.size, bits)
+
+    def _freeze_dirty(self) -> int:
+        return self._dirty_bits
+
+    def _thaw_dirty(self, bits: int):
+        self._dirty_bits = bits
+
+    def _neighbor_mask(self, pos: Tuple[int, int]) -> int:
+        x, y = pos
+        return self.topology.neighbor_mask(y * self.size + x)
+
+    def _index_bit(self, pos: Tuple[int, int]) -> int:
+        x, y = pos
+        size = self.size
+        if 0 <= x < size and 0 <= y < size:
+            return 1 << (y * size + x)
+        return 0
+
+    def add_visit(self, pos: Tuple[int, int]):
+        self.version += 1
+        bit = self._index_bit(pos)
+        if not self.visited.bits & bit:
+            self._mark_dirty(pos)
+        self.visited.bits |= bit
+        self.safe_cells.bits |= bit
+
+        self.pit_possible.bits &= ~bit
+        self.wumpus_possible.bits &= ~bit
+        self.wumpus_definite.bits &= ~bit
+        self.pit_definite.bits &= ~bit
+
+    def _add_location(self, locations: BitSet, neighbor_count, pos: Tuple[int, int]):
+        # Neighbor counts come from popcounts over the masks, so no tallies are kept
+        bit = self._index_bit(pos)
+        if not locations.bits & bit:
+            locations.bits |= bit
+            self._mark_dirty(pos)
+
+    def _mark_dirty(self, pos: Tuple[int, int]):
+        self._dirty_bits |= self._neighbor_mask(pos)
+
+    def _add_pit_possibilities(self, pos: Tuple[int, int]):
+        self.pit_possible.bits |= (self._neighbor_mask(pos) & ~self.visited.bits &
+                                   ~self.safe_cells.bits & ~self.no_pit.bits)
+
+    def _add_wumpus_possibilities(self, pos: Tuple[int, int]):
+        self.wumpus_possible.bits |= (self._neighbor_mask(pos) & ~self.visited.bits &
+                                      ~self.safe_cells.bits & ~self.no_wumpus.bits)
+
+    def _mark_adjacent_safe_from_pits(self, pos: Tuple[int, int]):
+        adjacent = self._neighbor_mask(pos)
+        self.no_pit.bits |= adjacent
+        self.pit_possible.bits &= ~adjacent
+        self.pit_definite.bits &= ~adjacent
+        self.safe_cells.bits |= adjacent & ~(self.visited.bits | self.wumpus_definite.bits |
+                                             self.wumpus_possible.bits)
+
+    def _mark_adjacent_safe_from_wumpus(self, pos: Tuple[int, int]):
+        adjacent = self._neighbor_mask(pos)
+        self.no_wumpus.bits |= adjacent
+        self.wumpus_possible.bits &= ~adjacent
+        self.wumpus_definite.bits &= ~adjacent
+        self.safe_cells.bits |= adjacent & ~(self.visited.bits | self.pit_definite.bits |
+                                             self.pit_possible.bits)
+
+    def _update_safety_knowledge(self):
+        # Only cells next to new evidence can change status, so in incremental mode
+        # just the dirty part of each frontier is re-checked, one neighbor mask per cell
+        wumpus_candidates = self.wumpus_possible.bits
+        pit_candidates = self.pit_possible.bits
+        if self.incremental:
+            wumpus_candidates &= self._dirty_bits
+            pit_candidates &= self._dirty_bits
+        self._dirty_bits = 0
+
+        no_stench = self.no_stench_locations.bits
+        stench = self.stench_locations.bits
+        visited = self.visited.bits
+        ruled_out = wumpus_candidates & self.no_wumpus.bits
+        for pos in BitSet(self.size, wumpus_candidates & ~ruled_out):
+            adjacent = self._neighbor_mask(pos)
+            if adjacent & no_stench:
+                ruled_out |= self._index_bit(pos)
+                continue
+            visited_neighbors = _popcount(adjacent & visited)
+            if visited_neighbors > 0:
+                self.certainty_map[pos] = min(1.0, _popcount(adjacent & stench) / visited_neighbors)
+            else:
+                self.certainty_map[pos] = 0.5
+        self.wumpus_possible.bits &= ~ruled_out
+
+        no_breeze = self.no_breeze_locations.bits
+        ruled_out = pit_candidates & self.no_pit.bits
+        for pos in BitSet(self.size, pit_candidates & ~ruled_out):
+            if self._neighbor_mask(pos) & no_breeze:
+                ruled_out |= self._index_bit(pos)
+        self.pit_possible.bits &= ~ruled_out
+        self.safe_cells.bits |= ruled_out & ~(self.wumpus_possible.bits | self.wumpus_definite.bits)
+
+    def is_safe(self, pos: Tuple[int, int]) -> bool:
+        return self.safe_cells.bits & self._index_bit(pos) != 0
+
+    def is_dangerous(self, pos: Tuple[int, int]) -> bool:
+        bit = self._index_bit(pos)
+        if self.visited.bits & bit:
+            return False
+
+        if (self.pit_definite.bits | self.wumpus_definite.bits) & bit:
+            return True
+
+        danger = self.pit_possible.bits
+        if self.wumpus_alive:
+            danger |= self.wumpus_possible.bits
+        return danger & bit != 0
+
+    def _definitely_safe_bits(self) -> int:
+        # Agents ask about many cells per step, so the mask is built once per version
+        if self._safe_bits_version != self.version:
+            uncertain = (self.pit_possible.bits | self.wumpus_possible.bits |
+                         self.pit_definite.bits | self.wumpus_definite.bits)
+            self._safe_bits = (self.visited.bits | (self.safe_cells.bits & ~uncertain) |
+                               (self.no_pit.bits & self.no_wumpus.bits))
+            self._safe_bits_version = self.version
+        return self._safe_bits
+
+    def is_definitely_safe(self, pos: Tuple[int, int]) -> bool:
+        return self._definitely_safe_bits() & self._index_bit(pos) != 0
+
+    def get_safe_unvisited_cells(self) -> BitSet:
+        return BitSet(self.size, self.safe_cells.bits & ~self.visited.bits)
+
+    def get_definitely_safe_unvisited_cells(self) -> BitSet:
+        return BitSet(self.size, self.safe_cells.bits & ~self.visited.bits & self._definitely_safe_bits())
+
+    def _heuristic_pit_probability(self, pos: Tuple[int, int]) -> float:
+        if not self.pit_possible.bits & self._index_bit(pos):
+            return 0.0
+
+        adjacent = self._neighbor_mask(pos)
+        visited_neighbors = _popcount(adjacent & self.visited.bits)
+        if visited_neighbors > 0:
+            return min(1.0, _popcount(adjacent & self.breeze_locations.bits) / visited_neighbors)
+        else:
+            return 0.2
@@ -0,0 +1,557 @@
+"""Retained-mode rendering of the board on a Tk canvas.
+
+The static items of a board (cell backgrounds, grid lines, coordinate labels)
+are created once per layout. Every cell keeps the IDs of its own items, and
+after a step only the cells whose contents or knowledge changed are
+reconfigured with itemconfig/coords. The animation tick touches just the
+pulsing Wumpus, gold and agent items.
+
+Boards of any size are supported. The canvas scrolls over the board, and only
+cells inside the visible viewport get items; panning creates items for cells
+that come into view and deletes those that leave it. Below DETAIL_CELL_SIZE
+pixels per cell the view switches to a level of detail without emoji, glow
+effects or per-cell backgrounds, so cell contents are plain shapes.
+"""
+import math
+from typing import Dict, FrozenSet, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+
+# Drawing layers from bottom to top; every item is kept inside its layer
+LAYERS = ("background", "knowledge", "element", "marker", "agent")
+
+VISITED = "visited"
+SAFE = "safe"
+EMPTY_STATE = (None, None, False, "")
+
+# Canvas heading vectors indexed by direction (0 = North, 1 = East, 2 = South, 3 = West);
+# canvas y grows downwards
+SCREEN_DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+
+# Cell sizes in pixels: the artwork is designed at BASE_CELL_SIZE and scaled from there
+BASE_CELL_SIZE = 55
+MIN_CELL_SIZE = 2
+MAX_CELL_SIZE = 110
+# Smaller cells drop emoji, glow effects and per-cell backgrounds
+DETAIL_CELL_SIZE = 28
+# Smaller cells drop grid lines and the agent's heading dot
+GRID_LINE_CELL_SIZE = 6
+# Minimum spacing of coordinate labels in pixels
+LABEL_SPACING = 24
+
+class BoardView:
+    """Canvas items of the visible part of one board, updated in place as the episode advances"""
+
+    def __init__(self, canvas, colors: Dict[str, str], cell_size: int = BASE_CELL_SIZE, offset: int = 25):
+        self.canvas = canvas
+        self.colors = colors
+        self.cell_size = cell_size
+        self.offset = offset
+        self.size = 0
+        self.pits: FrozenSet[Cell] = frozenset()
+        self.wumpus_positions: FrozenSet[Cell] = frozenset()
+        self.pulse_phase = 0.0
+        self.agent_scale = 1.0
+        self.viewport = (0, -1, 0, -1)
+        self._layer_tops: Dict[str, int] = {}
+        self._cell_items: Dict[Cell, Dict[str, int]] = {}
+        self._cell_states: Dict[Cell, Tuple] = {}
+        self._tracked: Dict[str, FrozenSet[Cell]] = {}
+        self._kb_key = None
+        self._gold: Optional[Cell] = None
+        self._living_wumpuses: Set[Cell] = set()
+        self._gold_cell: Optional[Cell] = None
+        self._agent_items: Dict[str, int] = {}
+        self._agent_state = None
+
+    # Layout
+
+    @property
+    def detail(self) -> bool:
+        """Whether cells are large enough for emoji and glow effects"""
+        return self.cell_size >= DETAIL_CELL_SIZE
+
+    def _px(self, length: float) -> int:
+        """A length of the BASE_CELL_SIZE artwork scaled to the current cell size"""
+        return max(1, round(length * self.cell_size / BASE_CELL_SIZE))
+
+    def _font(self, points: int, *style) -> Tuple:
+        return ("Segoe UI", self._px(points)) + style
+
+    def cell_origin(self, cell: Cell) -> Tuple[int, int]:
+        """Canvas coordinates of the top-left corner of a cell; row 0 is drawn at the bottom"""
+        x, y = cell
+        return (self.offset + x * self.cell_size,
+                self.offset + (self.size - 1 - y) * self.cell_size)
+
+    def _canvas_size(self) -> Tuple[int, int]:
+        canvas = self.canvas
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if width <= 1 or height <= 1:
+            # Not mapped yet; fall back to the requested size
+            width, height = int(canvas.cget("width")), int(canvas.cget("height"))
+        return width, height
+
+    def _visible_range(self) -> Tuple[int, int, int, int]:
+        """(x0, x1, y0, y1) bounds, inclusive, of the board cells inside the canvas window"""
+        width, height = self._canvas_size()
+        left, top = self.canvas.canvasx(0), self.canvas.canvasy(0)
+        cell_size, offset, last = self.cell_size, self.offset, self.size - 1
+        first_row = int((top - offset) // cell_size)
+        last_row = int((top + height - offset) // cell_size)
+        return (max(0, int((left - offset) // cell_size)),
+                min(last, int((left + width - offset) // cell_size)),
+                max(0, last - last_row), min(last, last - first_row))
+
+    def _in_view(self, cell: Cell) -> bool:
+        x0, x1, y0, y1 = self.viewport
+        return x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1
+
+    def _create(self, layer: str, kind: str, *coords, **options) -> int:
+        """Create an item at the top of its layer"""
+        item = getattr(self.canvas, "create_" + kind)(*coords, **options)
+        self.canvas.tag_lower(item, self._layer_tops[layer])
+        return item
+
+    @staticmethod
+    def _cell_tag(cell: Cell) -> str:
+        return f"cell{cell[0]}_{cell[1]}"
+
+    # Building
+
+    def build(self, environment, snapshot):
+        """Show a new board (or a restart of the current one) from scratch.
+
+        Only the fixed layout is read from the environment; everything that
+        changes during a game comes from snapshots.
+        """
+        if environment.size != self.size:
+            self.size = environment.size
+            self.fit()
+        self.pits = frozenset(environment.pits)
+        self.wumpus_positions = frozenset(environment.wumpus_positions)
+        self._tracked = {}
+        self._kb_key = None
+        self._gold = None
+        self._agent_state = None
+        self._track(snapshot)
+        self._relayout()
+        self._update_agent(snapshot)
+
+    def fit(self):
+        """Zoom so the whole board fits the canvas, clamped to the supported cell sizes"""
+        width, height = self._canvas_size()
+        available = min(width, height) - 2 * self.offset
+        self.cell_size = max(MIN_CELL_SIZE, min(BASE_CELL_SIZE, available // max(1, self.size)))
+        self._set_scroll_region()
+        self.canvas.xview_moveto(0)
+        self.canvas.yview_moveto(0)
+
+    def _set_scroll_region(self):
+        extent = 2 * self.offset + self.size * self.cell_size
+        self.canvas.configure(scrollregion=(0, 0, extent, extent))
+
+    def _relayout(self):
+        """Delete every item and recreate those of the visible cells"""
+        canvas = self.canvas
+        canvas.delete("all")
+        self._cell_items = {}
+        self._cell_states = {}
+        self._living_wumpuses = set()
+        self._gold_cell = None
+        # Hidden marker items bound each layer, so items created later land in the right place
+        self._layer_tops = {layer: canvas.create_line(0, 0, 0, 0, state="hidden") for layer in LAYERS}
+        self.viewport = self._visible_range()
+        self._draw_grid()
+        for cell in self._range_cells(self.viewport):
+            self._show_cell(cell)
+        self._build_agent()
+        if self._agent_state is not None:
+            state, self._agent_state = self._agent_state, None
+            self._place_agent(state)
+
+    def _content_cells(self) -> Set[Cell]:
+        cells = set(self.pits | self.wumpus_positions)
+        for tracked in self._tracked.values():
+            cells |= tracked
+        if self._gold is not None:
+            cells.add(self._gold)
+        return cells
+
+    def _draw_grid(self):
+        """Grid lines and coordinate labels for the visible rows and columns"""
+        canvas, colors = self.canvas, self.colors
+        canvas.delete("grid")
+        x0, x1, y0, y1 = self.viewport
+        if x0 > x1 or y0 > y1:
+            return
+        cell_size, offset = self.cell_size, self.offset
+        left, bottom = self.cell_origin((x0, y0))
+        right, top = self.cell_origin((x1 + 1, y1 + 1))
+        bottom += cell_size
+        top += cell_size
+        if not self.detail:
+            self._create("background", "rectangle", left, top, right, bottom,
+                         fill=colors["bg_tertiary"], outline="", width=0, tags="grid")
+        if cell_size >= GRID_LINE_CELL_SIZE:
+            for x in range(x0, x1 + 2):
+                position = offset + x * cell_size
+                self._create("background", "line", position, top, position, bottom,
+                             fill=colors["grid_line"], width=1, tags="grid")
+            for y in range(y0, y1 + 2):
+                position = self.cell_origin((0, y))[1] + cell_size
+                self._create("background", "line", left, position, right, position,
+                             fill=colors["grid_line"], width=1, tags="grid")
+
+        every = max(1, math.ceil(LABEL_SPACING / cell_size))
+        end = offset + self.size * cell_size
+        font = ("Segoe UI", 10 if self.detail else 8, "bold")
+        for x in range(x0 - x0 % every, x1 + 1, every):
+            if x >= x0:
+                self._create("background", "text", offset + x * cell_size + cell_size // 2, end + 18,
+                             text=str(x), font=font, fill=colors["text_secondary"], tags="grid")
+        for y in range(y0 - y0 % every, y1 + 1, every):
+            if y >= y0:
+                self._create("background", "text", offset - 18, self.cell_origin((0, y))[1] + cell_size // 2,
+                             text=str(y), font=font, fill=colors["text_secondary"], tags="grid")
+
+    def _show_cell(self, cell: Cell):
+        """Create the items of a cell entering the viewport"""
+        left, top = self.cell_origin(cell)
+        cell_size, tag = self.cell_size, self._cell_tag(cell)
+        if self.detail:
+            fill = self.colors["bg_tertiary"] if (cell[0] + cell[1]) % 2 == 0 else "#404040"
+            self._create("background", "rectangle", left, top, left + cell_size, top + cell_size,
+                         fill=fill, outline="", width=0, tags=tag)
+        if cell in self.pits:
+            self._draw_pit(cell, left, top, tag)
+        state = self._cell_state(cell)
+        if state != EMPTY_STATE:
+            self._render_cell(cell, state)
+
+    def _hide_cell(self, cell: Cell):
+        """Delete the items of a cell leaving the viewport"""
+        self.canvas.delete(self._cell_tag(cell))
+        self._cell_items.pop(cell, None)
+        self._cell_states.pop(cell, None)
+        self._living_wumpuses.discard(cell)
+        if self._gold_cell == cell:
+            self._gold_cell = None
+
+    def _draw_pit(self, cell: Cell, left: int, top: int, tag: str):
+        cell_size, px = self.cell_size, self._px
+        if not self.detail:
+            self._create("element", "oval", left, top, left + cell_size, top + cell_size,
+                         fill="#000000", outline="", tags=tag)
+            return
+        self._create("element", "oval", left + px(5), top + px(5), left + cell_size - px(5),
+                     top + cell_size - px(5), fill="#000000", outline="", tags=tag)
+        self._create("element", "oval", left + px(8), top + px(8), left + cell_size - px(8),
+                     top + cell_size - px(8), fill=self.colors["pit_color"],
+                     outline=self.colors["text_muted"], width=2, tags=tag)
+        self._create("element", "text", left + cell_size // 2, top + cell_size // 2,
+                     text="⚫", font=self._font(20), tags=tag)
+
+    # Viewport
+
+    def sync_viewport(self):
+        """Create and delete cell items after the canvas was scrolled or resized"""
+        viewport = self._visible_range()
+        if viewport == self.viewport:
+            return
+        old, self.viewport = self.viewport, viewport
+        self._draw_grid()
+        leaving = self._range_cells(old)
+        if not self.detail:
+            # Cells whose contents have since cleared still own items, so include everything drawn
+            leaving = set(leaving) | self._cell_items.keys()
+        for cell in leaving:
+            if not self._in_view(cell):
+                self._hide_cell(cell)
+        x0, x1, y0, y1 = old
+        for cell in self._range_cells(viewport):
+            if not (x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1):
+                self._show_cell(cell)
+
+    def _range_cells(self, viewport):
+        """Cells of a viewport that may have items at the current level of detail.
+
+        Without per-cell backgrounds empty cells have no items, so only cells with contents are listed.
+        """
+        x0, x1, y0, y1 = viewport
+        if self.detail:
+            return [(x, y) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1)]
+        return [cell for cell in self._content_cells()
+                if x0 <= cell[0] <= x1 and y0 <= cell[1] <= y1]
+
+    def zoom(self, factor: float, x: Optional[int] = None, y: Optional[int] = None):
+        """Scale the cells by factor, keeping the board point under window position (x, y) in place"""
+        cell_size = max(MIN_CELL_SIZE, min(MAX_CELL_SIZE, round(self.cell_size * factor)))
+        if cell_size == self.cell_size:
+            if factor > 1 and cell_size < MAX_CELL_SIZE:
+                cell_size += 1
+            elif factor < 1 and cell_size > MIN_CELL_SIZE:
+                cell_size -= 1
+            else:
+                return
+        canvas = self.canvas
+        if x is None or y is None:
+            width, height = self._canvas_size()
+            x, y = width // 2, height // 2
+        board_x = (canvas.canvasx(x) - self.offset) / self.cell_size
+        board_y = (canvas.canvasy(y) - self.offset) / self.cell_size
+        self.cell_size = cell_size
+        self._set_scroll_region()
+        extent = 2 * self.offset + self.size * cell_size
+        canvas.xview_moveto((self.offset + board_x * cell_size - x) / extent)
+        canvas.yview_moveto((self.offset + board_y * cell_size - y) / extent)
+        self._relayout()
+
+    # Per-step updates
+
+    def update(self, snapshot):
+        """Reconfigure the visible cells whose state changed since the last snapshot, then the agent"""
+        for cell in self._track(snapshot):
+            if self._in_view(cell):
+                state = self._cell_state(cell)
+                if state != self._cell_states.get(cell, EMPTY_STATE):
+                    self._render_cell(cell, state)
+        self._update_agent(snapshot)
+
+    def _track(self, snapshot) -> Set[Cell]:
+        """Keep the snapshot's displayed cell sets; returns the cells that entered or left any of them"""
+        changed = set()
+        tracked = {"alive": snapshot.wumpus_alive}
+        if snapshot.knowledge_key != self._kb_key:
+            self._kb_key = snapshot.knowledge_key
+            tracked.update(visited=snapshot.visited, safe=snapshot.safe_cells,
+                           pit=snapshot.pit_possible, wumpus=snapshot.wumpus_possible)
+        for name, cells in tracked.items():
+            previous = self._tracked.get(name)
+            if previous is None:
+                changed |= cells
+            elif cells is not previous:
+                changed |= cells ^ previous
+            self._tracked[name] = cells
+
+        gold = None if snapshot.agent_has_gold else snapshot.gold_pos
+        if gold != self._gold:
+            changed.update(cell for cell in (gold, self._gold) if cell is not None)
+            self._gold = gold
+        return changed
+
+    def _cell_state(self, cell: Cell) -> Tuple:
+        tracked = self._tracked
+        if cell in tracked["visited"]:
+            knowledge = VISITED
+        elif cell in tracked["safe"]:
+            knowledge = SAFE
+        else:
+            knowledge = None
+        wumpus = None
+        if cell in self.wumpus_positions:
+            wumpus = cell in tracked["alive"]
+        marker = ("P?" if cell in tracked["pit"] else "") + ("W?" if cell in tracked["wumpus"] else "")
+        return knowledge, wumpus, cell == self._gold, marker
+
+    def _render_cell(self, cell: Cell, state: Tuple):
+        knowledge, wumpus, gold, marker = state
+        old_knowledge, old_wumpus, old_gold, old_marker = self._cell_states.get(cell, EMPTY_STATE)
+        self._cell_states[cell] = state
+        items = self._cell_items.setdefault(cell, {})
+        canvas, colors, detail, px = self.canvas, self.colors, self.detail, self._px
+        left, top = self.cell_origin(cell)
+        cell_size, tag = self.cell_size, self._cell_tag(cell)
+        right, bottom = left + cell_size, top + cell_size
+
+        if knowledge != old_knowledge:
+            if "knowledge" not in items:
+                inset = px(2) if detail else 0
+                items["knowledge"] = self._create("knowledge", "rectangle", left + inset, top + inset,
+                                                  right - inset, bottom - inset, tags=tag)
+            if knowledge is None:
+                canvas.itemconfig(items["knowledge"], state="hidden")
+            elif not detail:
+                fill = colors["cell_visited"] if knowledge == VISITED else colors["cell_safe"]
+                canvas.itemconfig(items["knowledge"], state="normal", fill=fill, outline="", width=0)
+            elif knowledge == VISITED:
+                canvas.itemconfig(items["knowledge"], state="normal", fill=colors["cell_visited"],
+                                  outline=colors["accent"], width=2)
+            else:
+                canvas.itemconfig(items["knowledge"], state="normal", fill=colors["cell_safe"],
+                                  outline=colors["success"], width=1)
+
+        if wumpus != old_wumpus and wumpus is not None:
+            if "wumpus_body" not in items:
+                inset = px(8) if detail else 0
+                items["wumpus_body"] = self._create("element", "rectangle", left + inset, top + inset,
+                                                    right - inset, bottom - inset,
+                                                    width=2 if detail else 0, tags=tag)
+                if detail:
+                    items["wumpus_glow"] = self._create("element", "rectangle", left, top, left, top,
+                                                        fill="#ff4444", outline="", stipple="gray25", tags=tag)
+                    canvas.tag_lower(items["wumpus_glow"], items["wumpus_body"])
+                    items["wumpus_text"] = self._create("element", "text", left + cell_size // 2,
+                                                        top + cell_size // 2, font=self._font(24), tags=tag)
+            if wumpus:
+                canvas.itemconfig(items["wumpus_body"], fill=colors["wumpus_color"],
+                                  outline="#cc0000" if detail else "")
+            else:
+                canvas.itemconfig(items["wumpus_body"], fill="#666666", outline="#333333" if detail else "")
+            if detail:
+                canvas.itemconfig(items["wumpus_glow"], state="normal" if wumpus else "hidden")
+                canvas.itemconfig(items["wumpus_text"], text="👹" if wumpus else "💀")
+                if wumpus:
+                    self._living_wumpuses.add(cell)
+                    self._pulse_wumpus(cell)
+                else:
+                    self._living_wumpuses.discard(cell)
+
+        if gold != old_gold:
+            if "gold_coin" not in items:
+                if detail:
+                    items["gold_coin"] = self._create("element", "oval", left, top, left, top,
+                                                      fill=colors["gold_color"], outline="#cc9900",
+                                                      width=3, tags=tag)
+                    items["gold_text"] = self._create("element", "text", left + cell_size // 2,
+                                                      top + cell_size // 2, text="💰",
+                                                      font=self._font(20), tags=tag)
+                else:
+                    items["gold_coin"] = self._create("element", "oval", left, top, right, bottom,
+                                                      fill=colors["gold_color"], outline="", tags=tag)
+            visibility = "normal" if gold else "hidden"
+            canvas.itemconfig(items["gold_coin"], state=visibility)
+            if detail:
+                canvas.itemconfig(items["gold_text"], state=visibility)
+                if gold:
+                    self._gold_cell = cell
+                    self._pulse_gold()
+                elif self._gold_cell == cell:
+                    self._gold_cell = None
+
+        if marker != old_marker:
+            if "marker" not in items:
+                if detail:
+                    items["marker"] = self._create("marker", "text", left + cell_size // 4,
+                                                   top + cell_size // 4, fill=colors["danger"],
+                                                   font=self._font(10, "bold"), tags=tag)
+                else:
+                    half = max(1, cell_size // 2)
+                    items["marker"] = self._create("marker", "rectangle", left, top, left + half, top + half,
+                                                   fill=colors["danger"], outline="", tags=tag)
+            if detail:
+                canvas.itemconfig(items["marker"], text=marker)
+            else:
+                canvas.itemconfig(items["marker"], state="normal" if marker else "hidden")
+
+    # Agent
+
+    def _build_agent(self):
+        colors = self.colors
+        create = self._create
+        self._agent_items = {
+            "glow": create("agent", "oval", 0, 0, 0, 0, fill=colors["agent_color"], outline="",
+                           stipple="gray25"),
+            "body": create("agent", "oval", 0, 0, 0, 0, fill=colors["agent_color"], outline="#ffffff",
+                           width=3 if self.detail else 1),
+            "heading": create("agent", "oval", 0, 0, 0, 0, fill="#ffffff", outline=""),
+            "face": create("agent", "text", 0, 0, text="🤖", font=self._font(20)),
+            "gold": create("agent", "text", 0, 0, text="💰", font=self._font(16)),
+            "arrow": create("agent", "text", 0, 0, text="🏹", font=self._font(12)),
+            "dead_body": create("agent", "oval", 0, 0, 0, 0, fill="#666666", outline="#333333", width=2),
+            "dead_face": create("agent", "text", 0, 0, text="💀", font=self._font(20)),
+        }
+
+    def _agent_center(self, position: Cell) -> Tuple[int, int]:
+        left, top = self.cell_origin(position)
+        return left + self.cell_size // 2, top + self.cell_size // 2
+
+    def _update_agent(self, snapshot):
+        state = (snapshot.position, snapshot.direction, snapshot.agent_alive,
+                 snapshot.agent_has_gold, snapshot.has_arrow)
+        if state != self._agent_state:
+            self._place_agent(state)
+
+    def _place_agent(self, state):
+        self._agent_state = state
+        position, _, alive, has_gold, has_arrow = state
+        canvas, items, detail, px = self.canvas, self._agent_items, self.detail, self._px
+        center_x, center_y = self._agent_center(position)
+
+        def show(name, visible):
+            canvas.itemconfig(items[name], state="normal" if visible else "hidden")
+
+        show("body", alive)
+        show("heading", alive and self.cell_size >= GRID_LINE_CELL_SIZE)
+        for name in ("glow", "face"):
+            show(name, alive and detail)
+        show("gold", alive and detail and has_gold)
+        show("arrow", alive and detail and has_arrow)
+        show("dead_body", not alive)
+        show("dead_face", not alive and detail)
+        dead = px(15) if detail else max(1, self.cell_size // 2)
+        canvas.coords(items["gold"], center_x, center_y - px(30))
+        canvas.coords(items["arrow"], center_x + px(25), center_y - px(25))
+        canvas.coords(items["dead_body"], center_x - dead, center_y - dead, center_x + dead, center_y + dead)
+        canvas.coords(items["dead_face"], center_x, center_y)
+        canvas.coords(items["face"], center_x, center_y)
+        self._pulse_agent()
+
+    def center_on_agent(self):
+        """Scroll so the agent is in the middle of the canvas window"""
+        if self._agent_state is None:
+            return
+        width, height = self._canvas_size()
+        center_x, center_y = self._agent_center(self._agent_state[0])
+        extent = 2 * self.offset + self.size * self.cell_size
+        self.canvas.xview_moveto((center_x - width / 2) / extent)
+        self.canvas.yview_moveto((center_y - height / 2) / extent)
+        self.sync_viewport()
+
+    # Animation
+
+    def animate(self, pulse_phase: float, agent_scale: float):
+        """Move only the pulsing items to the given animation phase"""
+        self.pulse_phase = pulse_phase
+        self.agent_scale = agent_scale
+        for cell in self._living_wumpuses:
+            self._pulse_wumpus(cell)
+        if self._gold_cell is not None:
+            self._pulse_gold()
+        if self._agent_state is not None and self.detail:
+            self._pulse_agent()
+
+    def _pulse_wumpus(self, cell: Cell):
+        left, top = self.cell_origin(cell)
+        px = self._px
+        glow = px(4 + 2 * math.sin(self.pulse_phase))
+        self.canvas.coords(self._cell_items[cell]["wumpus_glow"], left + px(5) - glow, top + px(5) - glow,
+                           left + self.cell_size - px(5) + glow, top + self.cell_size - px(5) + glow)
+
+    def _pulse_gold(self):
+        left, top = self.cell_origin(self._gold_cell)
+        px = self._px
+        sparkle = round(3 * math.sin(self.pulse_phase * 2) * self.cell_size / BASE_CELL_SIZE)
+        self.canvas.coords(self._cell_items[self._gold_cell]["gold_coin"],
+                           left + px(12) + sparkle, top + px(12) + sparkle,
+                           left + self.cell_size - px(12) + sparkle, top + self.cell_size - px(12) + sparkle)
+
+    def _pulse_agent(self):
+        position, direction, alive = self._agent_state[:3]
+        if not alive:
+            return
+        canvas, items = self.canvas, self._agent_items
+        center_x, center_y = self._agent_center(position)
+        if self.detail:
+            glow = self._px(25 + 5 * math.sin(self.pulse_phase))
+            canvas.coords(items["glow"], center_x - glow, center_y - glow, center_x + glow, center_y + glow)
+            size = int(self.cell_size // 3 * self.agent_scale)
+            canvas.itemconfig(items["face"], font=self._font(round(20 * self.agent_scale)))
+        else:
+            size = max(1, self.cell_size // 2)
+        canvas.coords(items["body"], center_x - size, center_y - size, center_x + size, center_y + size)
+        dx, dy = SCREEN_DIRECTIONS[direction]
+        heading_x = center_x + dx * size // 2
+        heading_y = center_y + dy * size // 2
+        dot = self._px(4)
+        canvas.coords(items["heading"], heading_x - dot, heading_y - dot, heading_x + dot, heading_y + dot)
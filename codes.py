@@ -0,0 +1,76 @@
+"""Small integer codes for actions, results and percepts.
+
+ActionCode and ResultCode are what WumpusEnvironment.step and
+WumpusAgent.apply_result exchange, what the batch environment steps with and
+what traces store on disk; the string API of execute_action and update_state
+wraps them. ACTION_NAMES, RESULT_NAMES and PERCEPT_NAMES map codes back to the
+strings, and ACTION_CODES / RESULT_CODES / PERCEPT_FLAGS map the other way.
+"""
+from enum import IntEnum
+from typing import Iterable
+
+class ActionCode(IntEnum):
+    FORWARD = 0
+    TURN_LEFT = 1
+    TURN_RIGHT = 2
+    GRAB = 3
+    SHOOT = 4
+    CLIMB = 5
+
+class ResultCode(IntEnum):
+    MOVED = 0
+    BUMP = 1
+    FELL_INTO_PIT = 2
+    EATEN_BY_WUMPUS = 3
+    TURNED_LEFT = 4
+    TURNED_RIGHT = 5
+    GRABBED_GOLD = 6
+    NO_GOLD = 7
+    ARROW_MISSED = 8
+    ARROW_HIT_WALL = 9
+    WUMPUS_KILLED = 10
+    NO_ARROW = 11
+    CLIMBED_OUT = 12
+    CANNOT_CLIMB = 13
+    AGENT_DEAD = 14
+    INVALID_ACTION = 15
+
+FORWARD, TURN_LEFT, TURN_RIGHT, GRAB, SHOOT, CLIMB = ActionCode
+ACTION_NAMES = ("Forward", "TurnLeft", "TurnRight", "Grab", "Shoot", "Climb")
+
+(MOVED, BUMP, FELL_INTO_PIT, EATEN_BY_WUMPUS, TURNED_LEFT, TURNED_RIGHT, GRABBED_GOLD,
+ NO_GOLD, ARROW_MISSED, ARROW_HIT_WALL, WUMPUS_KILLED, NO_ARROW, CLIMBED_OUT,
+ CANNOT_CLIMB, AGENT_DEAD, INVALID_ACTION) = ResultCode
+RESULT_NAMES = (
+    "Moved forward", "Bump", "Fell into pit - Agent died", "Eaten by Wumpus - Agent died",
+    "Turned left", "Turned right", "Grabbed gold", "No gold here", "Arrow missed",
+    "Arrow missed - hit wall", "Arrow hit Wumpus - Wumpus died (Scream)", "No arrow to shoot",
+    "Climbed out of cave", "Can only climb from starting position (0,0)", "Agent is dead",
+    "Invalid action",
+)
+
+# Code for an action string the environment does not know (it answers "Invalid action")
+UNKNOWN_ACTION = 255
+
+# Percept bit flags
+STENCH, BREEZE, GLITTER, BUMP_PERCEPT, SCREAM = 1, 2, 4, 8, 16
+PERCEPT_NAMES = ("Stench", "Breeze", "Glitter", "Bump", "Scream")
+
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES)}
+RESULT_CODES = {name: code for code, name in enumerate(RESULT_NAMES)}
+PERCEPT_FLAGS = {name: 1 << bit for bit, name in enumerate(PERCEPT_NAMES)}
+
+def percept_flags(percepts: Iterable[str]) -> int:
+    flags = 0
+    for percept in percepts:
+        flags |= PERCEPT_FLAGS.get(percept, 0)
+    return flags
+
+def percept_names(flags: int):
+    return [name for bit, name in enumerate(PERCEPT_NAMES) if flags >> bit & 1]
+
+# Episode outcomes reported by the simulator
+VICTORY = "victory"
+DEATH = "death"
+TIMEOUT = "timeout"
+OUTCOME_NAMES = (VICTORY, DEATH, TIMEOUT)
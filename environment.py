@@ -1,10 +1,85 @@
+import copy
 import random
-from typing import Set, Tuple, List
+from typing import FrozenSet, NamedTuple, Set, Tuple, List, Optional
+from codes import (ACTION_CODES, RESULT_NAMES, UNKNOWN_ACTION, ResultCode,
+                   FORWARD, TURN_LEFT, TURN_RIGHT, GRAB, SHOOT, CLIMB, MOVED, BUMP, FELL_INTO_PIT,
+                   EATEN_BY_WUMPUS, TURNED_LEFT, TURNED_RIGHT, GRABBED_GOLD, NO_GOLD, ARROW_MISSED,
+                   ARROW_HIT_WALL, WUMPUS_KILLED, NO_ARROW, CLIMBED_OUT, CANNOT_CLIMB, AGENT_DEAD,
+                   INVALID_ACTION)
+from topology import GridTopology
+from world_generator import WorldGenerator, classify_world, SOLVABLE
+
+# Flags of the cells of WumpusEnvironment.grid
+PIT_CELL = 1
+WUMPUS_CELL = 2
+
+def parse_grid(text: str) -> List[List[str]]:
+    """Split grid text into rows of cells; rows are either one character per cell or space separated"""
+    grid = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            grid.append(line.split() if ' ' in line else list(line))
+    return grid
+
+def parse_grid_from_file(file_path):
+    with open(file_path, "r") as file:
+        return parse_grid(file.read())
+
+def format_grid(grid: List[List[str]]) -> str:
+    return "\n".join("".join(row) for row in grid) + "\n"
+
+def copy_random(rng: random.Random) -> random.Random:
+    """Independent generator continuing rng's sequence (skips the OS seeding of Random())"""
+    copied = random.Random.__new__(random.Random)
+    copied.setstate(rng.getstate())
+    return copied
+
+class EnvironmentSnapshot(NamedTuple):
+    """Immutable state of a WumpusEnvironment; cell sets are frozensets and maps are bytes"""
+    size: int
+    num_wumpuses: int
+    solvability: int
+    pits: FrozenSet[Tuple[int, int]]
+    wumpus_positions: FrozenSet[Tuple[int, int]]
+    gold_pos: Optional[Tuple[int, int]]
+    breeze_map: bytes
+    wumpus_alive: FrozenSet[Tuple[int, int]]
+    grid: bytes
+    stench_map: bytes
+    agent_pos: Tuple[int, int]
+    agent_direction: int
+    agent_alive: bool
+    agent_has_gold: bool
+    agent_has_arrow: bool
+    arrow_state: tuple
 
 class WumpusEnvironment:
-    def __init__(self, size=10, num_wumpuses=2):
+    """One world and the agent in it.
+
+    step() takes an ActionCode and returns a ResultCode; execute_action() is the
+    string wrapper around it. The layout is kept both as cell sets (pits,
+    wumpus_positions, wumpus_alive) and as a flat grid of PIT_CELL and
+    WUMPUS_CELL flags indexed by y * size + x, which is what stepping reads.
+    """
+
+    __slots__ = ("size", "topology", "num_wumpuses", "reject_impossible", "solvability", "rng",
+                 "arrow_rng", "_generator", "pits", "wumpus_positions", "wumpus_alive", "gold_pos",
+                 "agent_pos", "agent_direction", "agent_alive", "agent_has_gold", "agent_has_arrow",
+                 "grid", "breeze_map", "stench_map")
+
+    def __init__(self, size=10, num_wumpuses=2, seed=None, reject_impossible=False,
+                 arrow_rng: Optional[random.Random] = None):
         self.size = size
+        self.topology = GridTopology.for_size(size)
         self.num_wumpuses = num_wumpuses
+        self.reject_impossible = reject_impossible
+        self.solvability = SOLVABLE
+        # World generation draws from this generator only, so a seed fixes the layout
+        self.rng = random.Random(seed)
+        # Arrow hits draw from their own generator, independent of the layout
+        self.arrow_rng = arrow_rng if arrow_rng is not None else random.Random()
+        self._generator = None
         self.reset()
 
     def reset(self):
@@ -20,65 +95,152 @@ class WumpusEnvironment:
         self.generate_random_environment()
 
     def generate_random_environment(self):
-        self.pits.clear()
-        self.wumpus_positions.clear()
-        self.wumpus_alive.clear()
-        
-        safe_zone = {(0, 0), (0, 1), (1, 0)}
-        
-        num_pits = random.randint(int(self.size * self.size * 0.08), int(self.size * self.size * 0.10))
-        for _ in range(num_pits):
-            while True:
-                pos = (random.randint(0, self.size-1), random.randint(0, self.size-1))
-                if pos not in safe_zone and pos not in self.pits:
-                    self.pits.add(pos)
-                    break
+        generator = self._generator
+        if (generator is None or generator.size != self.size or generator.num_wumpuses != self.num_wumpuses
+                or generator.reject_impossible != self.reject_impossible):
+            generator = self._generator = WorldGenerator(self.size, self.num_wumpuses,
+                                                         reject_impossible=self.reject_impossible)
+        pits, wumpuses, gold, self.solvability = generator.generate(self.rng)
+        self.pits = pits
+        self.wumpus_positions = wumpuses
+        self.wumpus_alive = wumpuses.copy()
+        self.gold_pos = gold
+
+        self.agent_pos = (0, 0)
+        self.agent_direction = 0
+        self.agent_alive = True
+        self.agent_has_gold = False
+        self.agent_has_arrow = True
+        self._build_percept_maps()
+
+    def load_from_grid(self, grid: List[List[str]]):
+        """Load pits, Wumpuses and gold from a text grid (row 0 is the top row)"""
+        pits = set()
+        wumpuses = set()
+        gold_pos = None
+
+        for y, row in enumerate(grid):
+            for x, cell in enumerate(row):
+                world_y = len(grid) - 1 - y
 
-        for _ in range(self.num_wumpuses):
+                if cell == 'P':
+                    pits.add((x, world_y))
+                elif cell == 'W':
+                    wumpuses.add((x, world_y))
+                elif cell == 'G':
+                    gold_pos = (x, world_y)
+
+        self.load_world(len(grid), pits, wumpuses, gold_pos)
+
+    def load_world(self, size: int, pits: Set[Tuple[int, int]], wumpus_positions: Set[Tuple[int, int]],
+                   gold_pos: Optional[Tuple[int, int]], solvability: Optional[int] = None):
+        """Install a fixed layout; without gold a random free cell gets it.
+
+        A layout that comes with its solvability was classified as given, so a
+        gold-less one (IMPOSSIBLE) is played without gold.
+        """
+        self.size = size
+        self.topology = GridTopology.for_size(size)
+        self.pits = set(pits)
+        self.wumpus_positions = set(wumpus_positions)
+        self.gold_pos = gold_pos
+        self.num_wumpuses = len(self.wumpus_positions)
+
+        if self.gold_pos is None and solvability is None:
             while True:
-                pos = (random.randint(0, self.size-1), random.randint(0, self.size-1))
-                if (pos not in safe_zone and pos not in self.pits and 
-                    pos not in self.wumpus_positions and
-                    self._minimum_wumpus_distance(pos)):
-                    self.wumpus_positions.add(pos)
-                    self.wumpus_alive.add(pos)
+                pos = (self.rng.randint(0, self.size-1), self.rng.randint(0, self.size-1))
+                if pos != (0, 0) and pos not in self.pits and pos not in self.wumpus_positions:
+                    self.gold_pos = pos
                     break
 
-        while True:
-            pos = (random.randint(0, self.size-1), random.randint(0, self.size-1))
-            if pos not in safe_zone and pos not in self.pits and pos not in self.wumpus_positions:
-                self.gold_pos = pos
-                break
+        if solvability is None:
+            solvability = classify_world(self.size, self.pits, self.wumpus_positions, self.gold_pos)
+        self.solvability = solvability
+        self.restart()
 
+    def restart(self):
+        """Put the agent back at the start of the current world without regenerating it"""
         self.agent_pos = (0, 0)
         self.agent_direction = 0
         self.agent_alive = True
         self.agent_has_gold = False
         self.agent_has_arrow = True
+        self.wumpus_alive = self.wumpus_positions.copy()
+        self._build_percept_maps()
+
+    def _build_percept_maps(self):
+        """Flag the hazards of every cell and count its adjacent pits and living Wumpuses
+        (all indexed by y * size + x)"""
+        size = self.size
+        self.grid = bytearray(size * size)
+        self.breeze_map = bytearray(size * size)
+        self.stench_map = bytearray(size * size)
+        for x, y in self.pits:
+            self.grid[y * size + x] |= PIT_CELL
+            for ax, ay in self.topology.neighbors[(x, y)]:
+                self.breeze_map[ay * size + ax] += 1
+        for x, y in self.wumpus_alive:
+            self.grid[y * size + x] |= WUMPUS_CELL
+            for ax, ay in self.topology.neighbors[(x, y)]:
+                self.stench_map[ay * size + ax] += 1
+
+    def snapshot(self) -> EnvironmentSnapshot:
+        """Immutable copy of the current state, including the arrow generator"""
+        return EnvironmentSnapshot(
+            self.size, self.num_wumpuses, self.solvability, frozenset(self.pits),
+            frozenset(self.wumpus_positions), self.gold_pos, bytes(self.breeze_map),
+            frozenset(self.wumpus_alive), bytes(self.grid),
+            bytes(self.stench_map), self.agent_pos, self.agent_direction, self.agent_alive,
+            self.agent_has_gold, self.agent_has_arrow, self.arrow_rng.getstate())
+
+    def restore(self, snapshot: EnvironmentSnapshot):
+        """Return to a snapshot's state, world layout included"""
+        if snapshot.size != self.size:
+            self.size = snapshot.size
+            self.topology = GridTopology.for_size(snapshot.size)
+        self.num_wumpuses = snapshot.num_wumpuses
+        self.solvability = snapshot.solvability
+        self.pits = set(snapshot.pits)
+        self.wumpus_positions = set(snapshot.wumpus_positions)
+        self.gold_pos = snapshot.gold_pos
+        self.breeze_map = bytearray(snapshot.breeze_map)
+        self.wumpus_alive = set(snapshot.wumpus_alive)
+        self.grid = bytearray(snapshot.grid)
+        self.stench_map = bytearray(snapshot.stench_map)
+        self.agent_pos = snapshot.agent_pos
+        self.agent_direction = snapshot.agent_direction
+        self.agent_alive = snapshot.agent_alive
+        self.agent_has_gold = snapshot.agent_has_gold
+        self.agent_has_arrow = snapshot.agent_has_arrow
+        self.arrow_rng.setstate(snapshot.arrow_state)
+
+    def clone(self, arrow_rng: Optional[random.Random] = None) -> "WumpusEnvironment":
+        """Independent copy sharing the layout; without arrow_rng, arrows hit as they would here"""
+        other = copy.copy(self)
+        other.rng = copy_random(self.rng)
+        other.arrow_rng = arrow_rng if arrow_rng is not None else copy_random(self.arrow_rng)
+        other.wumpus_alive = set(self.wumpus_alive)
+        other.grid = bytearray(self.grid)
+        other.stench_map = bytearray(self.stench_map)
+        return other
 
-    def _minimum_wumpus_distance(self, pos: Tuple[int, int], min_dist=3) -> bool:
-        for wpos in self.wumpus_positions:
-            if abs(pos[0] - wpos[0]) + abs(pos[1] - wpos[1]) < min_dist:
-                return False
-        return True
+    def _kill_wumpus(self, pos: Tuple[int, int]):
+        self.wumpus_alive.remove(pos)
+        size = self.size
+        self.grid[pos[1] * size + pos[0]] &= ~WUMPUS_CELL
+        for ax, ay in self.topology.neighbors[pos]:
+            self.stench_map[ay * size + ax] -= 1
 
     def get_percepts(self) -> List[str]:
         percepts = []
         x, y = self.agent_pos
+        index = y * self.size + x
 
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-          nx, ny = x + dx, y + dy
-          if 0 <= nx < self.size and 0 <= ny < self.size:
-             if (nx, ny) in self.wumpus_alive:
-                percepts.append("Stench")
-                break
-
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.size and 0 <= ny < self.size:
-                if (nx, ny) in self.pits:
-                    percepts.append("Breeze")
-                    break
+        if self.stench_map[index]:
+            percepts.append("Stench")
+
+        if self.breeze_map[index]:
+            percepts.append("Breeze")
 
         if self.agent_pos == self.gold_pos and not self.agent_has_gold:
             percepts.append("Glitter")
@@ -86,83 +248,77 @@ class WumpusEnvironment:
         return percepts
 
     def execute_action(self, action: str) -> str:
+        return RESULT_NAMES[self.step(ACTION_CODES.get(action, UNKNOWN_ACTION))]
+
+    def step(self, action: int) -> ResultCode:
+        """Apply one ActionCode and return its ResultCode"""
         if not self.agent_alive:
-            return "Agent is dead"
+            return AGENT_DEAD
 
-        if action == "Forward":
+        if action == FORWARD:
             return self._move_forward()
-        elif action == "TurnLeft":
-            return self._turn_left()
-        elif action == "TurnRight":
-            return self._turn_right()
-        elif action == "Grab":
+        elif action == TURN_LEFT:
+            self.agent_direction = (self.agent_direction - 1) % 4
+            return TURNED_LEFT
+        elif action == TURN_RIGHT:
+            self.agent_direction = (self.agent_direction + 1) % 4
+            return TURNED_RIGHT
+        elif action == GRAB:
             return self._grab_gold()
-        elif action == "Shoot":
+        elif action == SHOOT:
             return self._shoot_arrow()
-        elif action == "Climb":
+        elif action == CLIMB:
             return self._climb()
         else:
-            return "Invalid action"
+            return INVALID_ACTION
 
-    def _move_forward(self) -> str:
+    def _move_forward(self) -> ResultCode:
         x, y = self.agent_pos
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        dx, dy = directions[self.agent_direction]
-        new_x, new_y = x + dx, y + dy
+        topology = self.topology
+        index = topology.ahead_index[(y * self.size + x) * 4 + self.agent_direction]
 
-        if new_x < 0 or new_x >= self.size or new_y < 0 or new_y >= self.size:
-            return "Bump"
+        if index < 0:
+            return BUMP
 
-        self.agent_pos = (new_x, new_y)
-
-        if self.agent_pos in self.pits:
+        self.agent_pos = topology.cells[index]
+        hazard = self.grid[index]
+        if hazard:
             self.agent_alive = False
-            return "Fell into pit - Agent died"
+            if hazard & PIT_CELL:
+                return FELL_INTO_PIT
+            return EATEN_BY_WUMPUS
 
-        if self.agent_pos in self.wumpus_alive:
-            self.agent_alive = False
-            return "Eaten by Wumpus - Agent died"
+        return MOVED
 
-        return "Moved forward"
-
-    def _turn_left(self) -> str:
-        self.agent_direction = (self.agent_direction - 1) % 4
-        return "Turned left"
-
-    def _turn_right(self) -> str:
-        self.agent_direction = (self.agent_direction + 1) % 4
-        return "Turned right"
-
-    def _grab_gold(self) -> str:
+    def _grab_gold(self) -> ResultCode:
         if self.agent_pos == self.gold_pos and not self.agent_has_gold:
             self.agent_has_gold = True
-            return "Grabbed gold"
-        return "No gold here"
+            return GRABBED_GOLD
+        return NO_GOLD
 
-    def _shoot_arrow(self) -> str:
+    def _shoot_arrow(self) -> ResultCode:
         if not self.agent_has_arrow:
-            return "No arrow to shoot"
+            return NO_ARROW
 
         self.agent_has_arrow = False
-        x, y = self.agent_pos
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
-        dx, dy = directions[self.agent_direction]
+        pos = self.agent_pos
+        forward = self.topology.forward
 
         # Arrow has 70% chance to hit if aimed correctly
-        hit_chance = random.random()
+        hit_chance = self.arrow_rng.random()
         if hit_chance > 0.7:  # 30% chance to miss
-            return "Arrow missed"
+            return ARROW_MISSED
 
         while True:
-            x, y = x + dx, y + dy
-            if x < 0 or x >= self.size or y < 0 or y >= self.size:
-                return "Arrow missed - hit wall"
+            pos = forward[(pos, self.agent_direction)]
+            if pos is None:
+                return ARROW_HIT_WALL
 
-            if (x, y) in self.wumpus_alive:
-                self.wumpus_alive.remove((x, y))
-                return "Arrow hit Wumpus - Wumpus died (Scream)"
+            if pos in self.wumpus_alive:
+                self._kill_wumpus(pos)
+                return WUMPUS_KILLED
 
-    def _climb(self) -> str:
+    def _climb(self) -> ResultCode:
         if self.agent_pos == (0, 0):
-            return "Climbed out of cave"
-        return "Can only climb from starting position (0,0)"
\ No newline at end of file
+            return CLIMBED_OUT
+        return CANNOT_CLIMB
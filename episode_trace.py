@@ -0,0 +1,214 @@
+"""Append-only binary traces of simulated episodes.
+
+A trace file is MAGIC followed by a stream of little-endian records, each
+starting with a tag byte:
+  EPISODE  seed i64 (-1 if unseeded), world i64 (-1 if none), board size u16, Wumpus count u16
+  STEP     action u8, result u8, percept flags u8, direction u8, x u16, y u16, score i32
+  END      outcome u8, steps u32, score i32
+
+Steps record the percepts the agent acted on and the position, direction and
+score after the action. Action, result and percept codes come from codes.py.
+Files ending in .gz are gzip-compressed; appending to an existing file adds a
+new gzip member, which the reader handles transparently.
+"""
+import gzip
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from codes import (ACTION_CODES, ACTION_NAMES, RESULT_CODES, RESULT_NAMES, PERCEPT_FLAGS, UNKNOWN_ACTION,
+                   OUTCOME_NAMES, percept_names)
+
+MAGIC = b"WUMPUSTR"
+STEP_TAG, EPISODE_TAG, END_TAG = 0, 1, 2
+
+STEP = struct.Struct("<BBBBBHHi")
+EPISODE = struct.Struct("<BqqHH")
+END = struct.Struct("<BBIi")
+RECORD_SIZES = {STEP_TAG: STEP.size, EPISODE_TAG: EPISODE.size, END_TAG: END.size}
+
+OUTCOME_CODES = {name: code for code, name in enumerate(OUTCOME_NAMES)}
+
+@dataclass
+class EpisodeStart:
+    seed: Optional[int]
+    world: Optional[int]
+    size: int
+    num_wumpuses: int
+
+@dataclass
+class TraceStep:
+    action: int
+    result: int
+    percepts: int
+    direction: int
+    x: int
+    y: int
+    score: int
+
+    @property
+    def action_name(self) -> Optional[str]:
+        return ACTION_NAMES[self.action] if self.action < len(ACTION_NAMES) else None
+
+    @property
+    def result_name(self) -> str:
+        return RESULT_NAMES[self.result]
+
+    @property
+    def percept_names(self) -> List[str]:
+        return percept_names(self.percepts)
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        return (self.x, self.y)
+
+@dataclass
+class EpisodeEnd:
+    outcome: str
+    steps: int
+    score: int
+
+TraceRecord = Union[EpisodeStart, TraceStep, EpisodeEnd]
+
+class TraceBuffer:
+    """Encodes trace records into an in-memory bytearray"""
+
+    def __init__(self):
+        self.data = bytearray()
+
+    def start_episode(self, seed: Optional[int], size: int, num_wumpuses: int, world: Optional[int] = None):
+        self.data += EPISODE.pack(EPISODE_TAG, -1 if seed is None else seed,
+                                  -1 if world is None else world, size, num_wumpuses)
+
+    def step(self, percepts: List[str], action: str, result: str, position: Tuple[int, int],
+             direction: int, score: int):
+        flags = 0
+        for percept in percepts:
+            flags |= PERCEPT_FLAGS.get(percept, 0)
+        self.data += STEP.pack(STEP_TAG, ACTION_CODES.get(action, UNKNOWN_ACTION),
+                               RESULT_CODES[result], flags, direction, position[0], position[1], score)
+
+    def end_episode(self, outcome: str, steps: int, score: int):
+        self.data += END.pack(END_TAG, OUTCOME_CODES[outcome], steps, score)
+
+    def take(self) -> bytes:
+        """Return and forget everything encoded so far"""
+        data = bytes(self.data)
+        self.data.clear()
+        return data
+
+class TraceWriter(TraceBuffer):
+    """TraceBuffer that appends to a file whenever flush_bytes have accumulated"""
+
+    def __init__(self, path: str, compress: Optional[bool] = None, flush_bytes=1 << 16):
+        super().__init__()
+        self.path = path
+        self.flush_bytes = flush_bytes
+        if compress is None:
+            compress = path.endswith(".gz")
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = gzip.open(path, "ab") if compress else open(path, "ab")
+        if new_file:
+            self._file.write(MAGIC)
+
+    def step(self, percepts, action, result, position, direction, score):
+        super().step(percepts, action, result, position, direction, score)
+        if len(self.data) >= self.flush_bytes:
+            self.flush()
+
+    def write_bytes(self, data: bytes):
+        """Append records encoded elsewhere, e.g. by a TraceBuffer in a worker process"""
+        self.data += data
+        if len(self.data) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        if self.data:
+            self._file.write(self.data)
+            self.data.clear()
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def _open(path: str):
+    with open(path, "rb") as file:
+        compressed = file.read(2) == b"\x1f\x8b"
+    return gzip.open(path, "rb") if compressed else open(path, "rb")
+
+def _decode(buffer: bytes, offset: int, name: str) -> Tuple[Optional[TraceRecord], int]:
+    """Decode the record at offset; returns (None, offset) if it runs past the end of buffer"""
+    tag = buffer[offset]
+    size = RECORD_SIZES.get(tag)
+    if size is None:
+        raise ValueError(f"{name}: unknown record tag {tag}")
+    if offset + size > len(buffer):
+        return None, offset
+    if tag == STEP_TAG:
+        record = TraceStep(*STEP.unpack_from(buffer, offset)[1:])
+    elif tag == EPISODE_TAG:
+        _, seed, world, board_size, num_wumpuses = EPISODE.unpack_from(buffer, offset)
+        record = EpisodeStart(None if seed < 0 else seed, None if world < 0 else world,
+                              board_size, num_wumpuses)
+    else:
+        _, outcome, steps, score = END.unpack_from(buffer, offset)
+        record = EpisodeEnd(OUTCOME_NAMES[outcome], steps, score)
+    return record, offset + size
+
+def decode_trace(data: bytes) -> Iterator[TraceRecord]:
+    """Yield the records encoded in data, e.g. the output of TraceBuffer.take()"""
+    offset = 0
+    while offset < len(data):
+        record, offset = _decode(data, offset, "trace data")
+        if record is None:
+            raise ValueError("trace data ends with a truncated record")
+        yield record
+
+def read_trace(path: str, chunk_size=1 << 16) -> Iterator[TraceRecord]:
+    """Yield the records of a trace file in order"""
+    with _open(path) as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a trace file")
+        buffer = b""
+        offset = 0
+        while True:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            buffer = buffer[offset:] + chunk
+            offset = 0
+            while offset < len(buffer):
+                record, offset = _decode(buffer, offset, path)
+                if record is None:
+                    break
+                yield record
+        if offset < len(buffer):
+            raise ValueError(f"{path} ends with a truncated record")
+
+def group_episodes(records: Iterable[TraceRecord]) -> Iterator[Tuple[EpisodeStart, List[TraceStep], Optional[EpisodeEnd]]]:
+    """Group records into (start, steps, end) per episode; end is None for an unfinished episode"""
+    start, steps = None, []
+    for record in records:
+        if isinstance(record, TraceStep):
+            steps.append(record)
+        elif isinstance(record, EpisodeStart):
+            if start is not None:
+                yield start, steps, None
+            start, steps = record, []
+        else:
+            yield start, steps, record
+            start, steps = None, []
+    if start is not None:
+        yield start, steps, None
+
+def read_episodes(path: str) -> Iterator[Tuple[EpisodeStart, List[TraceStep], Optional[EpisodeEnd]]]:
+    return group_episodes(read_trace(path))
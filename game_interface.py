@@ -1,12 +1,26 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import json
+import logging
 import math
+import queue
 import random
-from environment import WumpusEnvironment
+import time
+from environment import WumpusEnvironment, parse_grid_from_file
 from agent import WumpusAgent
+from board_view import BoardView
+from knowledge_panel import DETAIL_SETS, KnowledgePanel
+from game_loop import VICTORY, GameSnapshot, SimulationWorker, advance, game_outcome
 from collections import deque
 from knowledge_base import KnowledgeBase
+from log_config import Lazy, sorted_cells
+
+logger = logging.getLogger(__name__)
+
+# The animation clock; turbo mode also refreshes the display on this tick
+FRAME_INTERVAL_MS = 50
+# Time each turbo tick may spend stepping before control returns to Tk
+TURBO_BUDGET_MS = 15
 
 class ModernWumpusWorldGUI:
     def __init__(self, grid=None):
@@ -44,6 +58,12 @@ class ModernWumpusWorldGUI:
         self.game_running = False
         self.auto_play = False
         self.animation_id = None
+        self.auto_play_id = None
+        self.display_dirty = False
+        self.steps_played = 0
+        # Background simulation thread while auto-play runs on it, and the state on display
+        self.worker = None
+        self.snapshot = None
         
         self.agent_scale = 1.0
         self.agent_rotation = 0.0
@@ -131,45 +151,16 @@ class ModernWumpusWorldGUI:
                        background=self.colors['grid_line'])
     
     def load_environment_from_grid(self, grid):
-     self.environment.size = len(grid)
-     self.environment.pits.clear()
-    
-     self.environment.wumpus_positions.clear()
-     self.environment.wumpus_alive.clear()
-      
-     for y, row in enumerate(grid):
-        for x, cell in enumerate(row):
-            world_y = len(grid) - 1 - y
-            
-            if cell == 'P':
-                self.environment.pits.add((x, world_y))
-            elif cell == 'W':
-                self.environment.wumpus_positions.add((x, world_y))
-                self.environment.wumpus_alive.add((x, world_y))
-            elif cell == 'G':
-                self.environment.gold_pos = (x, world_y)
-    
+     self.environment.load_from_grid(grid)
      self.agent.kb.num_wumpuses = len(self.environment.wumpus_positions)
-     
-     if not self.environment.gold_pos:
-        while True:
-            pos = (random.randint(0, self.environment.size-1), 
-                   random.randint(0, self.environment.size-1))
-            if (pos != (0, 0) and 
-                pos not in self.environment.pits and 
-                pos not in self.environment.wumpus_positions):
-                self.environment.gold_pos = pos
-                break
     
-     print("Loaded Grid:")
-     for row in grid:
-        print(' '.join(cell if cell in ['P', 'W', 'G'] else '.' for cell in row))
-
-     print("Wumpus positions:", sorted(list(self.environment.wumpus_positions)))
-     print("Wumpus definite:", sorted(list(self.agent.kb.wumpus_definite)))
-     print("Wumpus possible:", sorted(list(self.agent.kb.wumpus_possible)))
-     print("pit possible:", sorted(list(self.agent.kb.pit_possible)))
-     print("pit definitr:", sorted(list(self.agent.kb.pit_definite)))
+     logger.info("Loaded grid:\n%s", Lazy(lambda: "\n".join(
+        ' '.join(cell if cell in ['P', 'W', 'G'] else '.' for cell in row) for row in grid)))
+     logger.debug("Wumpus positions: %s", sorted_cells(self.environment.wumpus_positions))
+     logger.debug("Wumpus definite: %s", sorted_cells(self.agent.kb.wumpus_definite))
+     logger.debug("Wumpus possible: %s", sorted_cells(self.agent.kb.wumpus_possible))
+     logger.debug("Pit possible: %s", sorted_cells(self.agent.kb.pit_possible))
+     logger.debug("Pit definite: %s", sorted_cells(self.agent.kb.pit_definite))
     def setup_ui(self):
         main_frame = tk.Frame(self.root, bg=self.colors['bg_primary'])
         main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -215,10 +206,19 @@ class ModernWumpusWorldGUI:
         header.pack(fill=tk.X, padx=10, pady=(10, 0))
         header.pack_propagate(False)
         
-        tk.Label(header, text="🎮 Game World (10×10)", 
-                font=('Segoe UI', 14, 'bold'),
-                fg=self.colors['text_primary'],
-                bg=self.colors['bg_secondary']).pack(side=tk.LEFT, pady=10)
+        self.grid_title = tk.Label(header, text="🎮 Game World", 
+                                   font=('Segoe UI', 14, 'bold'),
+                                   fg=self.colors['text_primary'],
+                                   bg=self.colors['bg_secondary'])
+        self.grid_title.pack(side=tk.LEFT, pady=10)
+        
+        # Zoom controls; the mouse wheel zooms and dragging pans as well
+        for text, command in (("⤢ Fit", self.fit_board), ("➕", lambda: self.zoom_board(1.25)),
+                              ("➖", lambda: self.zoom_board(0.8))):
+            tk.Button(header, text=text, command=command,
+                      bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                      borderwidth=0, relief='flat', font=('Segoe UI', 9, 'bold'),
+                      cursor='hand2', padx=8).pack(side=tk.RIGHT, padx=(5, 0), pady=8)
         
         canvas_frame = tk.Frame(grid_frame, bg=self.colors['bg_secondary'])
         canvas_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -228,10 +228,18 @@ class ModernWumpusWorldGUI:
                                bg=self.colors['bg_tertiary'],
                                highlightthickness=0,
                                relief='flat')
-        self.canvas.pack(expand=True)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
         
         self.cell_size = 55
         self.grid_offset = 25
+        self.board = BoardView(self.canvas, self.colors, self.cell_size, self.grid_offset)
+        
+        self.canvas.bind('<Configure>', lambda e: self.board.sync_viewport())
+        self.canvas.bind('<ButtonPress-1>', lambda e: self.canvas.scan_mark(e.x, e.y))
+        self.canvas.bind('<B1-Motion>', self.pan_board)
+        self.canvas.bind('<MouseWheel>', lambda e: self.zoom_board(1.25 if e.delta > 0 else 0.8, e.x, e.y))
+        self.canvas.bind('<Button-4>', lambda e: self.zoom_board(1.25, e.x, e.y))
+        self.canvas.bind('<Button-5>', lambda e: self.zoom_board(0.8, e.x, e.y))
     
     def setup_control_panel(self, parent):
         control_frame = tk.Frame(parent, bg=self.colors['bg_secondary'], relief='flat', bd=2)
@@ -294,6 +302,30 @@ class ModernWumpusWorldGUI:
                               width=8,
                               font=('Segoe UI', 9))
         speed_entry.pack(side=tk.RIGHT, padx=(5, 0))
+        
+        # Turbo plays as many steps as fit in each tick and redraws at the frame rate
+        self.turbo_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="⚡ Turbo (skip per-step redraws)",
+                       variable=self.turbo_var,
+                       bg=self.colors['bg_secondary'],
+                       fg=self.colors['text_secondary'],
+                       selectcolor=self.colors['bg_tertiary'],
+                       activebackground=self.colors['bg_secondary'],
+                       activeforeground=self.colors['text_primary'],
+                       borderwidth=0, highlightthickness=0,
+                       font=('Segoe UI', 9, 'bold')).pack(anchor=tk.W, pady=(8, 0))
+        
+        # Background mode runs auto-play on a worker thread so slow inference never blocks the window
+        self.background_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(btn_frame, text="🧵 Run auto-play in background thread",
+                       variable=self.background_var,
+                       bg=self.colors['bg_secondary'],
+                       fg=self.colors['text_secondary'],
+                       selectcolor=self.colors['bg_tertiary'],
+                       activebackground=self.colors['bg_secondary'],
+                       activeforeground=self.colors['text_primary'],
+                       borderwidth=0, highlightthickness=0,
+                       font=('Segoe UI', 9, 'bold')).pack(anchor=tk.W)
     
     def create_modern_button(self, parent, text, command, accent=False, enabled=True):
         """Create a modern styled button"""
@@ -377,6 +409,27 @@ class ModernWumpusWorldGUI:
                 fg=self.colors['text_primary'],
                 bg=self.colors['bg_secondary']).pack(side=tk.LEFT, pady=10)
         
+        # Page through the cells of the selected set
+        for text, delta in (("▶", 1), ("◀", -1)):
+            tk.Button(header, text=text, command=lambda delta=delta: self.knowledge_panel.turn_page(delta),
+                      bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                      borderwidth=0, relief='flat', font=('Segoe UI', 9, 'bold'),
+                      cursor='hand2', padx=6).pack(side=tk.RIGHT, padx=(4, 0), pady=8)
+        
+        # Which knowledge set the detail view lists
+        selector = tk.Frame(kb_frame, bg=self.colors['bg_secondary'])
+        selector.pack(fill=tk.X, padx=15, pady=(0, 8))
+        self.detail_var = tk.StringVar(value="safe")
+        for name, (_, label, _) in DETAIL_SETS.items():
+            tk.Radiobutton(selector, text=label,
+                           variable=self.detail_var, value=name, indicatoron=0,
+                           command=lambda: self.knowledge_panel.select(self.detail_var.get()),
+                           bg=self.colors['bg_tertiary'], fg=self.colors['text_primary'],
+                           selectcolor=self.colors['accent_dark'],
+                           activebackground=self.colors['accent'],
+                           borderwidth=0, font=('Segoe UI', 8, 'bold'),
+                           padx=4, pady=3).pack(side=tk.LEFT, fill=tk.X, expand=True, padx=1)
+        
         # Knowledge text with modern styling
         text_frame = tk.Frame(kb_frame, bg=self.colors['bg_secondary'])
         text_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=(0, 15))
@@ -399,215 +452,39 @@ class ModernWumpusWorldGUI:
         self.kb_text.configure(yscrollcommand=kb_scrollbar.set)
         self.kb_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         kb_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.knowledge_panel = KnowledgePanel(self.kb_text)
     
     def draw_grid(self):
-        """Draw the modern game grid with animations"""
-        self.canvas.delete("all")
-        
-        # Draw grid background with subtle pattern
-        for i in range(10):
-            for j in range(10):
-                x = self.grid_offset + i * self.cell_size
-                y = self.grid_offset + j * self.cell_size
-                
-                # Alternating pattern
-                if (i + j) % 2 == 0:
-                    fill_color = self.colors['bg_tertiary']
-                else:
-                    fill_color = '#404040'
-                
-                self.canvas.create_rectangle(x, y, x + self.cell_size, y + self.cell_size,
-                                           fill=fill_color, outline='', width=0)
-        
-        # Draw grid lines
-        for i in range(11):
-            x = self.grid_offset + i * self.cell_size
-            y = self.grid_offset + i * self.cell_size
-            self.canvas.create_line(self.grid_offset, y, 
-                                  self.grid_offset + 10 * self.cell_size, y, 
-                                  fill=self.colors['grid_line'], width=1)
-            self.canvas.create_line(x, self.grid_offset, 
-                                  x, self.grid_offset + 10 * self.cell_size, 
-                                  fill=self.colors['grid_line'], width=1)
-        
-        # Draw coordinate labels with modern styling
-        for i in range(10):
-            # X-axis labels
-            x = self.grid_offset + i * self.cell_size + self.cell_size // 2
-            y = self.grid_offset + 10 * self.cell_size + 18
-            self.canvas.create_text(x, y, text=str(i), 
-                                  font=('Segoe UI', 10, 'bold'),
-                                  fill=self.colors['text_secondary'])
-            
-            # Y-axis labels
-            x = self.grid_offset - 18
-            y = self.grid_offset + (9 - i) * self.cell_size + self.cell_size // 2
-            self.canvas.create_text(x, y, text=str(i), 
-                                  font=('Segoe UI', 10, 'bold'),
-                                  fill=self.colors['text_secondary'])
-        
-        # Draw environment elements with enhanced visuals
-        self.draw_environment_elements()
-        
-        # Draw agent with animations
-        self.draw_agent()
+        """Rebuild every canvas item for the current board"""
+        size = self.environment.size
+        self.grid_title.config(text=f"🎮 Game World ({size}×{size})")
+        self.capture_state()
+        self.board.build(self.environment, self.snapshot)
+
+    def refresh_grid(self):
+        """Update only the canvas items whose cells changed since the last refresh"""
+        self.board.update(self.snapshot)
+
+    def capture_state(self):
+        """Snapshot the game for display, unless the background thread owns it and publishes its own"""
+        if self.worker is None:
+            self.snapshot = GameSnapshot.capture(self.environment, self.agent, self.steps_played,
+                                                 previous=self.snapshot)
+
+    def pan_board(self, event):
+        """Drag the board and create items for the cells scrolled into view"""
+        self.canvas.scan_dragto(event.x, event.y, gain=1)
+        self.board.sync_viewport()
     
-    def draw_environment_elements(self):
-        """Draw environment elements with modern styling"""
-        for x in range(10):
-            for y in range(10):
-                canvas_x = self.grid_offset + x * self.cell_size
-                canvas_y = self.grid_offset + (9 - y) * self.cell_size
-                
-                # Draw visited cells
-                if (x, y) in self.agent.kb.visited:
-                    self.canvas.create_rectangle(canvas_x + 2, canvas_y + 2, 
-                                               canvas_x + self.cell_size - 2, 
-                                               canvas_y + self.cell_size - 2, 
-                                               fill=self.colors['cell_visited'], 
-                                               outline=self.colors['accent'], width=2)
-                
-                # Draw safe cells
-                elif (x, y) in self.agent.kb.safe_cells:
-                    self.canvas.create_rectangle(canvas_x + 2, canvas_y + 2, 
-                                               canvas_x + self.cell_size - 2, 
-                                               canvas_y + self.cell_size - 2, 
-                                               fill=self.colors['cell_safe'], 
-                                               outline=self.colors['success'], width=1)
-                
-                # Draw pits with depth effect
-                if (x, y) in self.environment.pits:
-                    # Shadow effect
-                    self.canvas.create_oval(canvas_x + 5, canvas_y + 5, 
-                                          canvas_x + self.cell_size - 5, 
-                                          canvas_y + self.cell_size - 5, 
-                                          fill='#000000', outline='')
-                    # Main pit
-                    self.canvas.create_oval(canvas_x + 8, canvas_y + 8, 
-                                          canvas_x + self.cell_size - 8, 
-                                          canvas_y + self.cell_size - 8, 
-                                          fill=self.colors['pit_color'], 
-                                          outline=self.colors['text_muted'], width=2)
-                    self.canvas.create_text(canvas_x + self.cell_size//2, 
-                                          canvas_y + self.cell_size//2, 
-                                          text="⚫", font=('Segoe UI', 20))
-                
-                # Draw Wumpuses (living and dead)
-                if (x, y) in self.environment.wumpus_positions:
-                    if (x, y) in self.environment.wumpus_alive:
-                        # Living wumpus - glow effect
-                        glow_size = 4 + int(2 * math.sin(self.pulse_phase))
-                        self.canvas.create_rectangle(canvas_x + 5 - glow_size, canvas_y + 5 - glow_size, 
-                                                   canvas_x + self.cell_size - 5 + glow_size, 
-                                                   canvas_y + self.cell_size - 5 + glow_size, 
-                                                   fill='#ff4444', outline='', stipple='gray25')
-                        
-                        # Wumpus body
-                        self.canvas.create_rectangle(canvas_x + 8, canvas_y + 8, 
-                                                   canvas_x + self.cell_size - 8, 
-                                                   canvas_y + self.cell_size - 8, 
-                                                   fill=self.colors['wumpus_color'], 
-                                                   outline='#cc0000', width=2)
-                        self.canvas.create_text(canvas_x + self.cell_size//2, 
-                                              canvas_y + self.cell_size//2, 
-                                              text="👹", font=('Segoe UI', 24))
-                    else:
-                        # Dead wumpus
-                        self.canvas.create_rectangle(canvas_x + 8, canvas_y + 8, 
-                                                   canvas_x + self.cell_size - 8, 
-                                                   canvas_y + self.cell_size - 8, 
-                                                   fill='#666666', 
-                                                   outline='#333333', width=2)
-                        self.canvas.create_text(canvas_x + self.cell_size//2, 
-                                              canvas_y + self.cell_size//2, 
-                                              text="💀", font=('Segoe UI', 24))
-                
-                # Draw gold with sparkle effect
-                if (x, y) == self.environment.gold_pos and not self.environment.agent_has_gold:
-                    # Sparkle effect
-                    sparkle_offset = int(3 * math.sin(self.pulse_phase * 2))
-                    self.canvas.create_oval(canvas_x + 12 + sparkle_offset, 
-                                          canvas_y + 12 + sparkle_offset,
-                                          canvas_x + self.cell_size - 12 + sparkle_offset, 
-                                          canvas_y + self.cell_size - 12 + sparkle_offset, 
-                                          fill=self.colors['gold_color'], 
-                                          outline='#cc9900', width=3)
-                    
-                    # Gold symbol
-                    self.canvas.create_text(canvas_x + self.cell_size//2, 
-                                          canvas_y + self.cell_size//2, 
-                                          text="💰", font=('Segoe UI', 20))
-                
-                # Draw possible dangers with transparency effect
-                if (x, y) in self.agent.kb.pit_possible:
-                    self.canvas.create_text(canvas_x + self.cell_size//4, 
-                                          canvas_y + self.cell_size//4, 
-                                          text="P?", fill=self.colors['danger'], 
-                                          font=('Segoe UI', 10, 'bold'))
-                
-                if (x, y) in self.agent.kb.wumpus_possible:
-                    self.canvas.create_text(canvas_x + self.cell_size//4, 
-                                          canvas_y + self.cell_size//4, 
-                                          text="W?", fill=self.colors['danger'], 
-                                          font=('Segoe UI', 10, 'bold'))
-    def draw_agent(self):
-        """Draw agent with modern animations"""
-        agent_x, agent_y = self.agent.position
-        canvas_x = self.grid_offset + agent_x * self.cell_size
-        canvas_y = self.grid_offset + (9 - agent_y) * self.cell_size
-        
-        center_x = canvas_x + self.cell_size // 2
-        center_y = canvas_y + self.cell_size // 2
-        
-        if self.environment.agent_alive:
-            # Animated glow effect
-            glow_radius = 25 + int(5 * math.sin(self.pulse_phase))
-            self.canvas.create_oval(center_x - glow_radius, center_y - glow_radius,
-                                  center_x + glow_radius, center_y + glow_radius,
-                                  fill=self.colors['agent_color'], outline='', stipple='gray25')
-            
-            # Agent body with scaling animation
-            size = int(self.cell_size // 3 * self.agent_scale)
-            self.canvas.create_oval(center_x - size, center_y - size,
-                                  center_x + size, center_y + size,
-                                  fill=self.colors['agent_color'], 
-                                  outline='#ffffff', width=3)
-            
-            # Agent direction indicator
-            direction_map = {
-                'up': (0, -1),
-                'down': (0, 1),
-                'left': (-1, 0),
-                'right': (1, 0)
-            }
-            
-            if self.agent.direction in direction_map:
-                dx, dy = direction_map[self.agent.direction]
-                arrow_x = center_x + dx * size // 2
-                arrow_y = center_y + dy * size // 2
-                self.canvas.create_oval(arrow_x - 4, arrow_y - 4,
-                                      arrow_x + 4, arrow_y + 4,
-                                      fill='#ffffff', outline='')
-            
-            # Agent emoji
-            self.canvas.create_text(center_x, center_y, text="🤖", 
-                                  font=('Segoe UI', int(20 * self.agent_scale)))
-            
-            # Status indicators
-            if self.environment.agent_has_gold:
-                self.canvas.create_text(center_x, center_y - 30, text="💰", 
-                                      font=('Segoe UI', 16))
-            
-            if self.agent.has_arrow:
-                self.canvas.create_text(center_x + 25, center_y - 25, text="🏹", 
-                                      font=('Segoe UI', 12))
-        else:
-            # Dead agent
-            self.canvas.create_oval(center_x - 15, center_y - 15,
-                                  center_x + 15, center_y + 15,
-                                  fill='#666666', outline='#333333', width=2)
-            self.canvas.create_text(center_x, center_y, text="💀", 
-                                  font=('Segoe UI', 20))
+    def zoom_board(self, factor, x=None, y=None):
+        """Zoom the board around a canvas window position (the center by default)"""
+        self.board.zoom(factor, x, y)
+    
+    def fit_board(self):
+        """Zoom out so the whole board is visible"""
+        self.board.fit()
+        self.board.build(self.environment, self.snapshot)
     
     def start_animations(self):
         """Start the animation loop"""
@@ -619,15 +496,21 @@ class ModernWumpusWorldGUI:
         self.pulse_phase += 0.1
         self.agent_scale = 1.0 + 0.1 * math.sin(self.pulse_phase * 2)
         
-        # Redraw grid if game is running
-        if self.game_running or True:  # Always animate for visual appeal
-            self.draw_grid()
+        self.poll_worker()
+        
+        # Steps played in turbo mode are shown once per frame, whatever the step rate
+        if self.display_dirty:
+            self.show_latest_state()
+        
+        # Only the pulsing items move; everything else changes with the game state
+        self.board.animate(self.pulse_phase, self.agent_scale)
         
         # Schedule next animation frame
-        self.animation_id = self.root.after(50, self.animate)
+        self.animation_id = self.root.after(FRAME_INTERVAL_MS, self.animate)
     
     def generate_random_environment(self):
         """Generate a new random environment"""
+        self.stop_worker()
         self.environment.generate_random_environment()
         self.reset_game()
         self.update_status("🎲 New random environment generated!")
@@ -643,6 +526,7 @@ class ModernWumpusWorldGUI:
                 with open(file_path, 'r') as f:
                     data = json.load(f)
                 
+                self.stop_worker()
                 self.environment.load_from_dict(data)
                 self.reset_game()
                 self.update_status(f"📁 Environment loaded from {file_path}")
@@ -673,22 +557,10 @@ class ModernWumpusWorldGUI:
                 filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
             )
             if file_path:
-                with open(file_path, 'r') as f:
-                    content = f.read().strip()
-                
-                # Parse grid content
-                lines = content.split('\n')
-                grid = []
-                for line in lines:
-                    if line.strip():
-                        # Handle both space-separated and character-by-character formats
-                        if ' ' in line:
-                            row = line.split()
-                        else:
-                            row = list(line.strip())
-                        grid.append(row)
-                
+                grid = parse_grid_from_file(file_path)
+
                 if grid:
+                    self.stop_worker()
                     self.load_environment_from_grid(grid)
                     self.reset_game()
                     self.update_status(f"📋 Grid loaded from {file_path}")
@@ -708,72 +580,94 @@ class ModernWumpusWorldGUI:
         self.auto_button.config(state='normal')
         
         self.update_status("🎮 Game started! Agent is ready to explore.")
-        self.update_knowledge_display()
-        self.draw_grid()
+        self.show_latest_state()
     def step_game(self):
-     """Execute one game step with multiple Wumpus handling"""
+     """Execute one game step and show it"""
      if not self.game_running:
         return
     
-     # Check if game is over before taking action
-     if self.is_game_over():
-        self.end_game()
-        return
-    
-     # Get current perceptions
-     percepts = self.environment.get_percepts()
+     self.play_step()
+     if self.game_running:
+        self.show_latest_state()
     
-     # Agent decides and acts
-     action = self.agent.get_action(percepts)
-    
-     if action:
-        self.update_status(f"🎯 Agent action: {action}")
-        
-        # Execute action in environment and get result
-        result = self.environment.execute_action(action)
-        self.update_status(f"   → Result: {result}")
-        
-        # Update agent's state based on action and result
-        self.agent.update_state(action, result)
-        print("\nAfter step:")
-        print("percepts:",percepts)
-        print("Wumpus definite:", sorted(list(self.agent.kb.wumpus_definite)))
-        print("Wumpus possible:", sorted(list(self.agent.kb.wumpus_possible)))
-        print("Pit definite:", sorted(list(self.agent.kb.pit_definite)))
-        print("Pit possible:", sorted(list(self.agent.kb.pit_possible)))
-        
-        # Special handling for gold grab
-        if action == "Grab" and "Grabbed gold" in result:
-            self.environment.agent_has_gold = True
-        
-        # Special handling for climb action with gold
-        if action == "Climb" and self.environment.agent_has_gold and self.agent.position == (0, 0):
-            self.update_status("🎉 Agent successfully climbed out with the gold!")
-            self.end_game(victory=True)
+     # Continue auto-play if enabled
+     self.schedule_auto_play()
+
+    def play_step(self, report=True):
+     """Advance the agent and environment one action; returns False if the agent did not act.
+
+     Displays are left alone so turbo mode can play many steps between frames;
+     report=False also skips the per-step status lines.
+     """
+     # Check if game is over before taking action
+     game_over_status = self.check_game_status()
+     if game_over_status:
+        self.end_game(victory=game_over_status == VICTORY)
+        return False
+    
+     # Agent decides and acts, and the environment executes the action
+     record = advance(self.environment, self.agent)
+     if record is None:
+        self.update_status("🤔 Agent has no valid actions")
+        return False
+     self.steps_played += 1
+     if report:
+        self.report_step(record)
+    
+     # Special handling for climb action with gold
+     if record.action == "Climb" and self.environment.agent_has_gold and self.agent.position == (0, 0):
+        self.update_status("🎉 Agent successfully climbed out with the gold!")
+        self.end_game(victory=True)
+        return True
+    
+     # Check for game over conditions after action
+     game_over_status = self.check_game_status()
+     if game_over_status:
+        self.end_game(victory=game_over_status == VICTORY)
+     return True
+
+    def report_step(self, record):
+        self.update_status(f"🎯 Agent action: {record.action}")
+        self.update_status(f"   → Result: {record.result}")
+
+    def turbo_tick(self):
+        """Play steps until this tick's time budget runs out; the frame clock shows the result"""
+        self.auto_play_id = None
+        if not (self.auto_play and self.game_running):
             return
-        
-        # Update displays
-        self.update_knowledge_display()
-        self.draw_grid()
-        
-        # Check for game over conditions after action
-        game_over_status = self.check_game_status()
-        if game_over_status:
-            if game_over_status == "victory":
-                self.end_game(victory=True)
-            else:
-                self.end_game(victory=False)
+        deadline = time.perf_counter() + TURBO_BUDGET_MS / 1000
+        while self.game_running and time.perf_counter() < deadline:
+            if not self.play_step(report=False):
+                break
+        self.display_dirty = True
+        self.schedule_auto_play()
+
+    def schedule_auto_play(self):
+        """Queue the next auto-play step, or the next turbo batch when turbo is on"""
+        if not (self.auto_play and self.game_running) or self.auto_play_id is not None:
             return
-     else:
-        self.update_status("🤔 Agent has no valid actions")
-    
-     # Continue auto-play if enabled
-     if self.auto_play and self.game_running:
+        if self.turbo_var.get():
+            # A short delay instead of 0 lets Tk handle input and redraws between batches
+            self.auto_play_id = self.root.after(1, self.turbo_tick)
+            return
+        self.auto_play_id = self.root.after(self.auto_play_delay(), self.auto_play_step)
+
+    def auto_play_delay(self):
+        """Milliseconds between auto-play steps"""
         try:
-            delay = int(self.speed_var.get())
+            return int(self.speed_var.get())
         except ValueError:
-            delay = 800
-        self.root.after(delay, self.step_game)
+            return 800
+
+    def auto_play_step(self):
+        self.auto_play_id = None
+        self.step_game()
+
+    def cancel_auto_play(self):
+        if self.auto_play_id is not None:
+            self.root.after_cancel(self.auto_play_id)
+            self.auto_play_id = None
+
     def toggle_auto_play(self):
         """Toggle auto-play mode"""
         self.auto_play = not self.auto_play
@@ -783,33 +677,92 @@ class ModernWumpusWorldGUI:
             self.step_button.config(state='disabled')
             self.update_status("⏯️ Auto-play enabled")
             # Start auto-play
-            try:
-                delay = int(self.speed_var.get())
-            except ValueError:
-                delay = 800
-            self.root.after(delay, self.step_game)
+            if self.background_var.get():
+                self.start_worker()
+            else:
+                self.schedule_auto_play()
         else:
+            self.cancel_auto_play()
+            self.stop_worker()
+            self.auto_button.config(text="⏯️ Auto Play")
+            self.step_button.config(state='normal')
+            self.update_status(f"⏸️ Auto-play paused after {self.steps_played} steps")
+            self.show_latest_state()
+    
+    def show_latest_state(self):
+        """Bring the board and knowledge panel up to date with the game state"""
+        self.display_dirty = False
+        self.capture_state()
+        self.update_knowledge_display()
+        self.refresh_grid()
+
+    def start_worker(self):
+        """Run auto-play on a background thread, which owns the environment and agent until stopped"""
+        delay = 0 if self.turbo_var.get() else self.auto_play_delay() / 1000
+        self.worker = SimulationWorker(self.environment, self.agent, self.steps_played, delay=delay,
+                                       publish_interval=FRAME_INTERVAL_MS / 1000, previous=self.snapshot)
+        self.worker.start()
+
+    def stop_worker(self):
+        """Stop the background thread after its current step and take back the environment and agent"""
+        worker = self.worker
+        if worker is None:
+            return
+        worker.stop()
+        worker.join()
+        self.worker = None
+        self.take_snapshots(worker)
+
+    def poll_worker(self):
+        """Show the latest snapshot from the background thread and finish the game once it stops"""
+        worker = self.worker
+        if worker is None:
+            return
+        # Checked before draining: once the thread is gone, every snapshot is already queued
+        finished = not worker.is_alive()
+        self.take_snapshots(worker)
+        if not finished:
+            return
+        self.worker = None
+        if worker.error is not None:
+            self.update_status(f"⚠️ Simulation thread stopped: {worker.error}")
+            self.auto_play = False
             self.auto_button.config(text="⏯️ Auto Play")
             self.step_button.config(state='normal')
-            self.update_status("⏸️ Auto-play paused")
+        elif self.snapshot.outcome:
+            self.end_game(victory=self.snapshot.outcome == VICTORY)
+
+    def take_snapshots(self, worker):
+        """Drain the worker's queue, keeping the newest snapshot for the next frame"""
+        latest = None
+        while True:
+            try:
+                snapshot = worker.snapshots.get_nowait()
+            except queue.Empty:
+                break
+            # In turbo mode snapshots skip steps, so single steps are not reported
+            if snapshot.last is not None and not self.turbo_var.get():
+                self.report_step(snapshot.last)
+            latest = snapshot
+        if latest is not None:
+            self.snapshot = latest
+            self.steps_played = latest.step
+            self.display_dirty = True
     
     def reset_game(self):
         """Reset the game to initial state with multiple Wumpus support"""
         self.game_running = False
         self.auto_play = False
+        self.cancel_auto_play()
+        self.stop_worker()
+        self.display_dirty = False
+        self.steps_played = 0
         
         # Reset agent
-        self.agent = WumpusAgent(self.environment.size)
+        self.agent = WumpusAgent(self.environment.size, len(self.environment.wumpus_positions))
         
-        # Reset environment state
-        self.environment.agent_pos = (0, 0)
-        self.environment.agent_direction = 0
-        self.environment.agent_alive = True
-        self.environment.agent_has_gold = False
-        self.environment.agent_has_arrow = True
-        
-        # Reset all Wumpuses to alive state
-        self.environment.wumpus_alive = self.environment.wumpus_positions.copy()
+        # Reset environment state and bring all Wumpuses back to life
+        self.environment.restart()
         
         # Reset button states
         self.start_button.config(state='normal')
@@ -818,21 +771,12 @@ class ModernWumpusWorldGUI:
         
         # Update displays
         self.update_status("🔄 Game reset. Ready to start!")
-        self.update_knowledge_display()
         self.draw_grid()
+        self.update_knowledge_display()
 
     def check_game_status(self):
      """Check game status and return 'victory', 'defeat', or None"""
-     # Agent died
-     if not self.environment.agent_alive:
-        return "defeat"
-    
-     # Agent won (climbed out with gold)
-     if (self.environment.agent_has_gold and 
-        self.agent.position == (0, 0)):
-        return "victory"
-    
-     return None
+     return game_outcome(self.environment, self.agent)
     def is_game_over(self):
      """Check if the game is over"""
      return self.check_game_status() is not None
@@ -841,20 +785,22 @@ class ModernWumpusWorldGUI:
         """End the game"""
         self.game_running = False
         self.auto_play = False
+        self.cancel_auto_play()
+        self.stop_worker()
+        self.show_latest_state()
         
         # Update button states
         self.start_button.config(state='normal')
         self.step_button.config(state='disabled')
         self.auto_button.config(state='disabled', text="⏯️ Auto Play")
         
+        self.update_status(f"🏁 Game over after {self.steps_played} steps")
         if victory:
             self.update_status("🎉 VICTORY! Agent successfully retrieved the gold!")
             messagebox.showinfo("Victory!", "🎉 Congratulations! The agent has successfully completed the mission!")
         else:
             self.update_status("💀 GAME OVER! Agent died.")
             messagebox.showinfo("Game Over", "💀 The agent has died. Better luck next time!")
-        
-        self.draw_grid()
     
     def update_status(self, message):
         """Update the status display"""
@@ -865,59 +811,13 @@ class ModernWumpusWorldGUI:
     
     
     def update_knowledge_display(self):
-        """Update the knowledge base display with multiple Wumpus info"""
-        kb_info = []
-        
-        # Current position and direction
-        kb_info.append(f"🤖 Position: {self.agent.position}")
-        kb_info.append(f"🧭 Direction: {self.agent.direction}")
-        kb_info.append(f"🏹 Has Arrow: {self.agent.has_arrow}")
-        kb_info.append(f"💰 Has Gold: {self.environment.agent_has_gold}")
-        kb_info.append(f"👹 Wumpuses Alive: {len(self.environment.wumpus_alive)}/{len(self.environment.wumpus_positions)}")
-        kb_info.append("")
-        
-        # Visited cells
-        kb_info.append(f"👣 Visited: {len(self.agent.kb.visited)} cells")
-        visited_str = ", ".join([f"({x},{y})" for x, y in sorted(self.agent.kb.visited)])
-        kb_info.append(f"   {visited_str}")
-        kb_info.append("")
-        
-        # Safe cells
-        kb_info.append(f"✅ Safe: {len(self.agent.kb.safe_cells)} cells")
-        safe_str = ", ".join([f"({x},{y})" for x, y in sorted(self.agent.kb.safe_cells)])
-        kb_info.append(f"   {safe_str}")
-        kb_info.append("")
-        
-        # Possible dangers
-        if self.agent.kb.pit_possible:
-            kb_info.append(f"⚠️ Possible Pits: {len(self.agent.kb.pit_possible)}")
-            pit_str = ", ".join([f"({x},{y})" for x, y in sorted(self.agent.kb.pit_possible)])
-            kb_info.append(f"   {pit_str}")
-        
-        if self.agent.kb.wumpus_possible:
-            kb_info.append(f"👹 Possible Wumpus Locations: {len(self.agent.kb.wumpus_possible)}")
-            wumpus_str = ", ".join([f"({x},{y})" for x, y in sorted(self.agent.kb.wumpus_possible)])
-            kb_info.append(f"   {wumpus_str}")
-        
-        # Current perceptions
-        if self.game_running:
-            perceptions = self.environment.get_percepts()
-            kb_info.append("")
-            kb_info.append("🔍 Current Perceptions:")
-            for perception in perceptions:
-                kb_info.append(f"   • {perception}")
-        
-        # Update display
-        self.kb_text.config(state='normal')
-        self.kb_text.delete(1.0, tk.END)
-        self.kb_text.insert(tk.END, '\n'.join(kb_info))
-        self.kb_text.config(state='disabled')
+        """Update the knowledge base display; only lines whose text changed are rewritten"""
+        self.knowledge_panel.show(self.snapshot, self.game_running)
 
     
     def run(self):
         """Start the GUI main loop"""
-        self.draw_grid()
-        self.update_knowledge_display()
+        self.show_latest_state()
         self.root.mainloop()
     
     def __del__(self):
@@ -0,0 +1,151 @@
+"""Game stepping shared by the GUI's foreground and background modes.
+
+The GUI reads the game only through GameSnapshot, an immutable copy of what it
+displays. That lets a SimulationWorker thread own the environment and agent
+while the Tk loop polls the worker's queue for the latest snapshot, so long
+inference steps never block UI events.
+"""
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from log_config import sorted_cells
+
+logger = logging.getLogger(__name__)
+
+Cell = Tuple[int, int]
+
+VICTORY = "victory"
+DEFEAT = "defeat"
+
+def game_outcome(environment, agent) -> Optional[str]:
+    """VICTORY, DEFEAT, or None while the game goes on"""
+    if not environment.agent_alive:
+        return DEFEAT
+    if environment.agent_has_gold and agent.position == (0, 0):
+        return VICTORY
+    return None
+
+@dataclass(frozen=True)
+class StepRecord:
+    percepts: Tuple[str, ...]
+    action: str
+    result: str
+
+def advance(environment, agent) -> Optional[StepRecord]:
+    """Play one agent action; None if the agent had no action to take"""
+    percepts = environment.get_percepts()
+    action = agent.get_action(percepts)
+    if not action:
+        return None
+    result = environment.execute_action(action)
+    agent.update_state(action, result)
+    kb = agent.kb
+    logger.debug("After step: percepts %s, Wumpus definite %s, Wumpus possible %s, "
+                 "pit definite %s, pit possible %s", percepts,
+                 sorted_cells(kb.wumpus_definite), sorted_cells(kb.wumpus_possible),
+                 sorted_cells(kb.pit_definite), sorted_cells(kb.pit_possible))
+    if action == "Grab" and "Grabbed gold" in result:
+        environment.agent_has_gold = True
+    return StepRecord(tuple(percepts), action, result)
+
+@dataclass(frozen=True)
+class GameSnapshot:
+    """Everything the GUI shows about a game at one step"""
+    step: int
+    position: Cell
+    direction: int
+    has_arrow: bool
+    agent_alive: bool
+    agent_has_gold: bool
+    gold_pos: Optional[Cell]
+    wumpus_alive: FrozenSet[Cell]
+    wumpus_count: int
+    percepts: Tuple[str, ...]
+    # (id, version) of the knowledge base the cell sets below were copied from
+    knowledge_key: Tuple[int, int]
+    visited: FrozenSet[Cell]
+    safe_cells: FrozenSet[Cell]
+    pit_possible: FrozenSet[Cell]
+    wumpus_possible: FrozenSet[Cell]
+    last: Optional[StepRecord] = None
+    outcome: Optional[str] = None
+
+    @classmethod
+    def capture(cls, environment, agent, step: int, last: Optional[StepRecord] = None,
+                previous: Optional["GameSnapshot"] = None) -> "GameSnapshot":
+        """Copy the displayed state; knowledge sets are shared with previous if the KB is unchanged"""
+        kb = agent.kb
+        knowledge_key = (id(kb), kb.version)
+        if previous is not None and previous.knowledge_key == knowledge_key:
+            knowledge = (previous.visited, previous.safe_cells, previous.pit_possible, previous.wumpus_possible)
+        else:
+            knowledge = (frozenset(kb.visited), frozenset(kb.safe_cells),
+                         frozenset(kb.pit_possible), frozenset(kb.wumpus_possible))
+        return cls(step, agent.position, agent.direction, agent.has_arrow,
+                   environment.agent_alive, environment.agent_has_gold, environment.gold_pos,
+                   frozenset(environment.wumpus_alive), len(environment.wumpus_positions),
+                   tuple(environment.get_percepts()), knowledge_key, *knowledge,
+                   last=last, outcome=game_outcome(environment, agent))
+
+class SimulationWorker(threading.Thread):
+    """Plays a game on its own thread and publishes snapshots to a queue.
+
+    The worker owns the environment and agent from start() until it has been
+    joined; in between, readers use only the snapshots. A snapshot is published
+    after every step when stepping with a delay, otherwise at most once per
+    publish_interval seconds, and always when the game ends or the worker stops.
+    """
+
+    def __init__(self, environment, agent, step: int = 0, delay: float = 0.0,
+                 publish_interval: float = 0.05, previous: Optional[GameSnapshot] = None):
+        super().__init__(name="wumpus-simulation", daemon=True)
+        self.environment = environment
+        self.agent = agent
+        self.step = step
+        self.delay = delay
+        self.publish_interval = publish_interval
+        self.snapshots: "queue.Queue[GameSnapshot]" = queue.Queue()
+        self.error: Optional[BaseException] = None
+        self._previous = previous
+        self._stop_requested = threading.Event()
+
+    def stop(self):
+        """Ask the worker to stop after the current step"""
+        self._stop_requested.set()
+
+    def _publish(self, last: Optional[StepRecord] = None) -> GameSnapshot:
+        snapshot = GameSnapshot.capture(self.environment, self.agent, self.step, last, self._previous)
+        self._previous = snapshot
+        self.snapshots.put(snapshot)
+        return snapshot
+
+    def run(self):
+        environment, agent = self.environment, self.agent
+        stopped = self._stop_requested
+        last_publish = time.perf_counter()
+        try:
+            while not stopped.is_set():
+                if game_outcome(environment, agent):
+                    break
+                record = advance(environment, agent)
+                if record is None:
+                    # Nothing to do until the agent changes its mind; avoid spinning
+                    self._publish()
+                    stopped.wait(max(self.delay, self.publish_interval))
+                    continue
+                self.step += 1
+                now = time.perf_counter()
+                if self.delay > 0 or now - last_publish >= self.publish_interval:
+                    last_publish = now
+                    if self._publish(record).outcome:
+                        return
+                if self.delay > 0:
+                    stopped.wait(self.delay)
+        except Exception as error:
+            self.error = error
+            logger.exception("Simulation thread failed at step %d", self.step)
+        self._publish()
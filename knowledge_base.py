@@ -1,23 +1,60 @@
-from typing import Set, Tuple, List, Dict
+import copy
+import logging
+from typing import Any, NamedTuple, Optional, Set, Tuple, List, Dict
 from collections import defaultdict
+from probability import FrontierInference
+from topology import GridTopology
+
+logger = logging.getLogger(__name__)
+
+# Mutable cell sets and neighbor tallies, in the order KnowledgeSnapshot stores them
+CELL_SETS = ("visited", "safe_cells", "pit_possible", "wumpus_possible", "wumpus_definite",
+             "pit_definite", "breeze_locations", "stench_locations", "no_stench_locations",
+             "no_breeze_locations", "no_pit", "no_wumpus")
+NEIGHBOR_COUNTS = ("visited_neighbor_count", "stench_neighbor_count", "breeze_neighbor_count",
+                   "no_stench_neighbor_count", "no_breeze_neighbor_count")
+
+class KnowledgeSnapshot(NamedTuple):
+    """Immutable state of a knowledge base.
+
+    Cell sets are stored in whatever frozen form the knowledge base class
+    uses (frozensets, or ints for bitboards) and mappings as tuples of their
+    items, so snapshots can be pickled and sent to worker processes. A tuple
+    is the cheapest immutable record to build, which matters when planners
+    snapshot thousands of times per decision.
+    """
+    version: int
+    cell_sets: Tuple[Any, ...]
+    neighbor_counts: Tuple[Tuple[Tuple[Tuple[int, int], int], ...], ...]
+    dirty: Any
+    percepts: Tuple[Tuple[Tuple[int, int], Tuple[str, ...]], ...]
+    certainty_map: Tuple[Tuple[Tuple[int, int], float], ...]
+    num_wumpuses: int
+    wumpuses_killed: int
+    wumpus_alive: bool
+    estimated_wumpus_count: int
 
 class KnowledgeBase:
-    def __init__(self, size=10, num_wumpuses=2):
+    def __init__(self, size=10, num_wumpuses=2, incremental=True, exact_probabilities=True):
         self.size = size
+        self.topology = GridTopology.for_size(size)
         self.num_wumpuses = num_wumpuses 
-        self.visited = set()
-        self.safe_cells = set()
-        self.pit_possible = set()
-        self.wumpus_possible = set()
-        self.wumpus_definite = set()
-        self.pit_definite = set() 
-        self.breeze_locations = set()
-        self.stench_locations = set()
-        self.no_stench_locations = set()
-        self.no_breeze_locations = set()
+        self.incremental = incremental
+        self.inference = FrontierInference() if exact_probabilities else None
+        self.version = 0
+        self.visited = self._new_cell_set()
+        self.safe_cells = self._new_cell_set()
+        self.pit_possible = self._new_cell_set()
+        self.wumpus_possible = self._new_cell_set()
+        self.wumpus_definite = self._new_cell_set()
+        self.pit_definite = self._new_cell_set()
+        self.breeze_locations = self._new_cell_set()
+        self.stench_locations = self._new_cell_set()
+        self.no_stench_locations = self._new_cell_set()
+        self.no_breeze_locations = self._new_cell_set()
         
-        self.no_pit = set()
-        self.no_wumpus = set()
+        self.no_pit = self._new_cell_set()
+        self.no_wumpus = self._new_cell_set()
         
         self.wumpuses_killed = 0
         self.wumpus_alive = True
@@ -25,11 +62,87 @@ class KnowledgeBase:
         self.certainty_map = {}
         self.estimated_wumpus_count = num_wumpuses
         
+        # Running per-cell tallies of how many neighbors are in each evidence set,
+        # plus the cells whose tallies changed since the last safety update
+        self.visited_neighbor_count = defaultdict(int)
+        self.stench_neighbor_count = defaultdict(int)
+        self.breeze_neighbor_count = defaultdict(int)
+        self.no_stench_neighbor_count = defaultdict(int)
+        self.no_breeze_neighbor_count = defaultdict(int)
+        self._dirty = set()
+        self._snapshot: Optional[KnowledgeSnapshot] = None
+        
         self.add_visit((0, 0))
         self.safe_cells.add((0, 0))
 
+    def _new_cell_set(self) -> Set[Tuple[int, int]]:
+        return set()
+
+    def _freeze_cells(self, cells):
+        return frozenset(cells)
+
+    def _thaw_cells(self, frozen) -> Set[Tuple[int, int]]:
+        return set(frozen)
+
+    def _freeze_dirty(self):
+        return frozenset(self._dirty)
+
+    def _thaw_dirty(self, frozen):
+        self._dirty = set(frozen)
+
+    def snapshot(self) -> KnowledgeSnapshot:
+        """Immutable copy of the current state; repeated calls without changes return the same one"""
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self.version:
+            return snapshot
+        freeze = self._freeze_cells
+        snapshot = self._snapshot = KnowledgeSnapshot(
+            self.version,
+            tuple(freeze(getattr(self, name)) for name in CELL_SETS),
+            tuple(tuple(getattr(self, name).items()) for name in NEIGHBOR_COUNTS),
+            self._freeze_dirty(),
+            tuple((pos, tuple(percepts)) for pos, percepts in self.percepts.items()),
+            tuple(self.certainty_map.items()),
+            self.num_wumpuses, self.wumpuses_killed, self.wumpus_alive, self.estimated_wumpus_count)
+        return snapshot
+
+    def restore(self, snapshot: KnowledgeSnapshot):
+        """Return to a snapshot's state.
+
+        The version moves past every version this knowledge base has had, so
+        caches keyed by it (probabilities, planners, action features) are
+        recomputed rather than reused for different contents.
+        """
+        thaw = self._thaw_cells
+        for name, frozen in zip(CELL_SETS, snapshot.cell_sets):
+            setattr(self, name, thaw(frozen))
+        for name, counts in zip(NEIGHBOR_COUNTS, snapshot.neighbor_counts):
+            setattr(self, name, defaultdict(int, counts))
+        self._thaw_dirty(snapshot.dirty)
+        self.percepts = {pos: list(percepts) for pos, percepts in snapshot.percepts}
+        self.certainty_map = dict(snapshot.certainty_map)
+        self.num_wumpuses = snapshot.num_wumpuses
+        self.wumpuses_killed = snapshot.wumpuses_killed
+        self.wumpus_alive = snapshot.wumpus_alive
+        self.estimated_wumpus_count = snapshot.estimated_wumpus_count
+        self.version = max(self.version, snapshot.version) + 1
+        self._snapshot = snapshot._replace(version=self.version)
+
+    def clone(self) -> "KnowledgeBase":
+        """Independent copy; its inference engine shares the per-component probability cache"""
+        other = copy.copy(self)
+        for name in CELL_SETS + NEIGHBOR_COUNTS:
+            setattr(other, name, getattr(self, name).copy())
+        other._dirty = self._dirty.copy()
+        other.percepts = self.percepts.copy()
+        other.certainty_map = self.certainty_map.copy()
+        if self.inference is not None:
+            other.inference = self.inference.fork()
+        return other
+
     def add_visit(self, pos: Tuple[int, int]):
-        self.visited.add(pos)
+        self.version += 1
+        self._add_location(self.visited, self.visited_neighbor_count, pos)
         self.safe_cells.add(pos)
         
         self.pit_possible.discard(pos)
@@ -39,34 +152,48 @@ class KnowledgeBase:
 
     def add_percept(self, pos: Tuple[int, int], percepts: List[str]):
         self.percepts[pos] = percepts
-        print("hello i am percepts ",percepts)
+        self.version += 1
+        logger.debug("Percepts at %s: %s", pos, percepts)
 
         if "Breeze" not in percepts:
          if "Stench" in percepts:
-            print("hi")
-            self.stench_locations.add(pos)
+            logger.debug("Stench at %s without breeze", pos)
+            self._add_location(self.stench_locations, self.stench_neighbor_count, pos)
             if self.wumpus_alive:
                 self._add_wumpus_possibilities(pos)
          else:
-            self.no_stench_locations.add(pos)
+            self._add_location(self.no_stench_locations, self.no_stench_neighbor_count, pos)
             if self.wumpus_alive:
                 self._mark_adjacent_safe_from_wumpus(pos)
 
         if "Breeze" in percepts:
-            print("hello")
-            self.breeze_locations.add(pos)
+            logger.debug("Breeze at %s", pos)
+            self._add_location(self.breeze_locations, self.breeze_neighbor_count, pos)
             self._add_pit_possibilities(pos)
             
         else:
-            self.no_breeze_locations.add(pos)
+            self._add_location(self.no_breeze_locations, self.no_breeze_neighbor_count, pos)
             self._mark_adjacent_safe_from_pits(pos)
             
         if "Breeze" in percepts and "Stench" not in percepts:
-            self.no_stench_locations.add(pos)
+            self._add_location(self.no_stench_locations, self.no_stench_neighbor_count, pos)
             if self.wumpus_alive:
                 self._mark_adjacent_safe_from_wumpus(pos)
+        self._mark_dirty(pos)
         self._update_safety_knowledge()
 
+    def _add_location(self, locations, neighbor_count: Dict[Tuple[int, int], int], pos: Tuple[int, int]):
+        """Add pos to an evidence set, keeping its neighbors' tallies in step"""
+        if pos in locations:
+            return
+        locations.add(pos)
+        for adj in self._get_adjacent(pos):
+            neighbor_count[adj] += 1
+        self._mark_dirty(pos)
+
+    def _mark_dirty(self, pos: Tuple[int, int]):
+        self._dirty.update(self._get_adjacent(pos))
+
     def _add_pit_possibilities(self, pos: Tuple[int, int]):
         for adj in self._get_adjacent(pos):
             if adj not in self.visited and adj not in self.safe_cells:
@@ -102,43 +229,42 @@ class KnowledgeBase:
                     self.safe_cells.add(adj)
 
     def _update_safety_knowledge(self):
-        for pos in list(self.wumpus_possible):
-            adjacent_to_no_stench = any(adj in self.no_stench_locations 
-                                      for adj in self._get_adjacent(pos))
-            
-            if adjacent_to_no_stench or pos in self.no_wumpus:
+        # Only cells next to new evidence can change status, so in incremental mode
+        # just those are re-checked; otherwise every possible cell is rescanned
+        if self.incremental:
+            dirty = self._dirty
+            self._dirty = set()
+            wumpus_candidates = [pos for pos in dirty if pos in self.wumpus_possible]
+            pit_candidates = [pos for pos in dirty if pos in self.pit_possible]
+        else:
+            self._dirty.clear()
+            wumpus_candidates = list(self.wumpus_possible)
+            pit_candidates = list(self.pit_possible)
+
+        for pos in wumpus_candidates:
+            if self.no_stench_neighbor_count.get(pos, 0) > 0 or pos in self.no_wumpus:
                 self.wumpus_possible.discard(pos)
                 continue
             
-            stench_neighbors = sum(1 for adj in self._get_adjacent(pos) 
-                                 if adj in self.stench_locations)
-            visited_neighbors = sum(1 for adj in self._get_adjacent(pos) 
-                                   if adj in self.visited)
+            stench_neighbors = self.stench_neighbor_count.get(pos, 0)
+            visited_neighbors = self.visited_neighbor_count.get(pos, 0)
             
             if visited_neighbors > 0:
                 self.certainty_map[pos] = min(1.0, stench_neighbors / visited_neighbors)
             else:
                 self.certainty_map[pos] = 0.5
         
-        for pos in list(self.pit_possible):
-            adjacent_to_no_breeze = any(adj in self.no_breeze_locations 
-                                      for adj in self._get_adjacent(pos))
-            
-            if adjacent_to_no_breeze or pos in self.no_pit:
+        for pos in pit_candidates:
+            if self.no_breeze_neighbor_count.get(pos, 0) > 0 or pos in self.no_pit:
                 self.pit_possible.discard(pos)
                 if pos not in self.wumpus_possible and pos not in self.wumpus_definite:
                     self.safe_cells.add(pos)
 
-    def _get_adjacent(self, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
-        x, y = pos
-        adjacent = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < self.size and 0 <= ny < self.size:
-                adjacent.append((nx, ny))
-        return adjacent
+    def _get_adjacent(self, pos: Tuple[int, int]) -> Tuple[Tuple[int, int], ...]:
+        return self.topology.adjacent(pos)
 
     def wumpus_killed(self):
+        self.version += 1
         self.wumpuses_killed += 1
         if self.wumpuses_killed >= self.num_wumpuses:
             self.wumpus_possible.clear()
@@ -183,18 +309,34 @@ class KnowledgeBase:
         return definitely_safe
 
     def get_wumpus_probability(self, pos: Tuple[int, int]) -> float:
-        if not self.wumpus_alive or pos not in self.wumpus_possible or pos in self.no_wumpus:
+        if not self.wumpus_alive or pos in self.visited or pos in self.no_wumpus:
             return 0.0
-        return self.certainty_map.get(pos, 0.3)
+        if self.inference is not None:
+            probability = self.inference.wumpus_probability(self, pos)
+            if probability is not None:
+                return probability
+        return self._heuristic_wumpus_probability(pos)
 
     def get_pit_probability(self, pos: Tuple[int, int]) -> float:
-        if pos not in self.pit_possible or pos in self.no_pit:
+        if pos in self.visited or pos in self.no_pit:
+            return 0.0
+        if self.inference is not None:
+            probability = self.inference.pit_probability(self, pos)
+            if probability is not None:
+                return probability
+        return self._heuristic_pit_probability(pos)
+
+    def _heuristic_wumpus_probability(self, pos: Tuple[int, int]) -> float:
+        if pos not in self.wumpus_possible:
+            return 0.0
+        return self.certainty_map.get(pos, 0.3)
+
+    def _heuristic_pit_probability(self, pos: Tuple[int, int]) -> float:
+        if pos not in self.pit_possible:
             return 0.0
         
-        breeze_neighbors = sum(1 for adj in self._get_adjacent(pos) 
-                             if adj in self.breeze_locations)
-        visited_neighbors = sum(1 for adj in self._get_adjacent(pos) 
-                               if adj in self.visited)
+        breeze_neighbors = self.breeze_neighbor_count.get(pos, 0)
+        visited_neighbors = self.visited_neighbor_count.get(pos, 0)
         
         if visited_neighbors > 0:
             return min(1.0, breeze_neighbors / visited_neighbors)
@@ -0,0 +1,134 @@
+"""Incrementally updated contents of the GUI's knowledge base panel.
+
+The panel has a fixed layout: a summary of the agent's state and the size of
+each knowledge set, one per line, followed by one page of the cells of a
+selected set. Each line is rewritten only when its text changed, and the
+selected set is kept as a sorted list that is patched with the cells that
+entered or left it, so a step costs work proportional to what changed
+rather than to the size of the board.
+"""
+import bisect
+from typing import Dict, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Detail views: snapshot attribute, button label and title of each selectable cell set
+DETAIL_SETS = {
+    "visited": ("visited", "👣 Visited", "👣 Visited cells"),
+    "safe": ("safe_cells", "✅ Safe", "✅ Safe cells"),
+    "pits": ("pit_possible", "⚠️ Pits?", "⚠️ Possible pits"),
+    "wumpus": ("wumpus_possible", "👹 Wumpus?", "👹 Possible Wumpus locations"),
+}
+
+SUMMARY_LINES = 12
+# The detail title and the page of cells follow the summary
+LINE_COUNT = SUMMARY_LINES + 2
+
+# Above this share of changed cells, re-sorting beats patching the sorted list
+RESORT_FRACTION = 0.25
+
+class KnowledgePanel:
+    """Keeps a Tk Text widget showing a snapshot, touching only the lines that changed"""
+
+    def __init__(self, text, page_size: int = 120):
+        self.text = text
+        self.page_size = page_size
+        self.selected = "safe"
+        self.page = 0
+        self._lines: List[Optional[str]] = [None] * LINE_COUNT
+        self._sources: Dict[str, frozenset] = {}
+        self._sorted: Dict[str, List[Cell]] = {}
+        self._snapshot = None
+        self._running = False
+
+    def select(self, name: str):
+        """Show the cells of another set, starting from its first page"""
+        self.selected = name
+        self.page = 0
+        self._refresh()
+
+    def turn_page(self, delta: int):
+        self.page += delta
+        self._refresh()
+
+    def page_count(self) -> int:
+        cells = self._sorted.get(self.selected, ())
+        return max(1, -(-len(cells) // self.page_size))
+
+    def show(self, snapshot, running: bool):
+        self._snapshot = snapshot
+        self._running = running
+        self._refresh()
+
+    def _refresh(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        lines = self._summary(snapshot, self._running)
+        cells = self._sorted_cells(self.selected, getattr(snapshot, DETAIL_SETS[self.selected][0]))
+        self.page = min(max(self.page, 0), self.page_count() - 1)
+        first = self.page * self.page_size
+        page = cells[first:first + self.page_size]
+        title = DETAIL_SETS[self.selected][2]
+        if page:
+            lines.append(f"{title} {first + 1}-{first + len(page)} of {len(cells)} "
+                         f"(page {self.page + 1}/{self.page_count()}):")
+        else:
+            lines.append(f"{title}: none")
+        lines.append(", ".join(f"({x},{y})" for x, y in page))
+        self._write(lines)
+
+    @staticmethod
+    def _summary(snapshot, running: bool) -> List[str]:
+        percepts = ", ".join(snapshot.percepts) or "none"
+        return [
+            f"🤖 Position: {snapshot.position}",
+            f"🧭 Direction: {snapshot.direction}",
+            f"🏹 Has Arrow: {snapshot.has_arrow}",
+            f"💰 Has Gold: {snapshot.agent_has_gold}",
+            f"👹 Wumpuses Alive: {len(snapshot.wumpus_alive)}/{snapshot.wumpus_count}",
+            "",
+            f"👣 Visited: {len(snapshot.visited)} cells",
+            f"✅ Safe: {len(snapshot.safe_cells)} cells",
+            f"⚠️ Possible Pits: {len(snapshot.pit_possible)}",
+            f"👹 Possible Wumpus Locations: {len(snapshot.wumpus_possible)}",
+            f"🔍 Current Perceptions: {percepts}" if running else "",
+            "",
+        ]
+
+    def _sorted_cells(self, name: str, cells: frozenset) -> List[Cell]:
+        """The cells sorted, patched from the last sorted copy of this set"""
+        previous = self._sources.get(name)
+        if previous is cells:
+            return self._sorted[name]
+        self._sources[name] = cells
+        if previous is None:
+            ordered = self._sorted[name] = sorted(cells)
+            return ordered
+        added, removed = cells - previous, previous - cells
+        ordered = self._sorted[name]
+        if len(added) + len(removed) > RESORT_FRACTION * max(len(cells), 1):
+            ordered[:] = sorted(cells)
+            return ordered
+        for cell in removed:
+            del ordered[bisect.bisect_left(ordered, cell)]
+        for cell in added:
+            bisect.insort(ordered, cell)
+        return ordered
+
+    def _write(self, lines: List[str]):
+        text = self.text
+        changed = [(number, line) for number, (line, old) in enumerate(zip(lines, self._lines), 1)
+                   if line != old]
+        if not changed:
+            return
+        text.config(state='normal')
+        if self._lines[0] is None:
+            text.delete("1.0", "end")
+            text.insert("1.0", "\n" * (LINE_COUNT - 1))
+        for number, line in changed:
+            text.delete(f"{number}.0", f"{number}.end")
+            text.insert(f"{number}.0", line)
+        text.config(state='disabled')
+        self._lines = lines
+
@@ -0,0 +1,37 @@
+"""Logging shared by the GUI and the headless tools.
+
+Modules log through logging.getLogger(__name__) with %-style arguments, so a
+message below the configured level is never formatted. Arguments that are
+expensive to build (sorted cell lists, grid dumps) are wrapped in Lazy so
+that work is skipped too.
+"""
+import logging
+import sys
+
+LOG_FORMAT = "%(levelname)s %(name)s: %(message)s"
+
+# Headless runs only report problems
+QUIET_LEVEL = logging.WARNING
+
+class Lazy:
+    """Defers function(*args) until the log record is actually formatted"""
+    __slots__ = ("function", "args")
+
+    def __init__(self, function, *args):
+        self.function = function
+        self.args = args
+
+    def __str__(self) -> str:
+        return str(self.function(*self.args))
+
+    __repr__ = __str__
+
+def sorted_cells(cells) -> Lazy:
+    return Lazy(sorted, cells)
+
+def configure_logging(level=logging.INFO, quiet=False, stream=None):
+    """Send log records to stream (stderr by default); quiet keeps warnings and errors only"""
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+    logging.basicConfig(level=QUIET_LEVEL if quiet else level, format=LOG_FORMAT,
+                        stream=stream or sys.stderr, force=True)
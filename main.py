@@ -1,19 +1,19 @@
+import logging
 from game_interface import ModernWumpusWorldGUI
+from environment import parse_grid_from_file
+from log_config import configure_logging
 
-def parse_grid_from_file(file_path):
-    with open(file_path, "r") as file:
-        return [list(line.strip()) for line in file if line.strip()]
+logger = logging.getLogger(__name__)
 
 def main():    
+    configure_logging()
     print("Starting Wumpus World - AI Agent Navigation")
     print("=" * 50)
     
     grid_file_path = "grid2.txt"
     
     grid = parse_grid_from_file(grid_file_path)
-    print("Parsed Grid:")
-    for row in grid:
-        print(row)
+    logger.debug("Parsed grid: %s", grid)
     
     gui = ModernWumpusWorldGUI(grid)
     gui.run()
@@ -0,0 +1,108 @@
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, List, Optional, Tuple
+
+from simulator import Simulator, SimulationStats
+from knowledge_base import KnowledgeBase
+from episode_trace import TraceBuffer, TraceWriter
+
+# Per-process state, created once by the pool initializer and reused for every chunk
+_worker_config = None
+_worker_simulators = {}
+_worker_trace = TraceBuffer()
+
+def _init_worker(size, num_wumpuses, grids, max_steps, kb_class, reject_impossible, corpus, trace):
+    global _worker_config
+    _worker_config = (size, num_wumpuses, grids, max_steps, kb_class, reject_impossible, corpus, trace)
+    _worker_simulators.clear()
+    _worker_trace.take()
+
+def _get_simulator(grid_index: Optional[int]) -> Simulator:
+    simulator = _worker_simulators.get(grid_index)
+    if simulator is None:
+        size, num_wumpuses, grids, max_steps, kb_class, reject_impossible, corpus, trace = _worker_config
+        grid = grids[grid_index] if grid_index is not None else None
+        simulator = Simulator(size, num_wumpuses, grid, max_steps, kb_class, reject_impossible, corpus,
+                              _worker_trace if trace else None)
+        _worker_simulators[grid_index] = simulator
+    return simulator
+
+def _run_chunk(first_episode: int, count: int, seed: int) -> Tuple[SimulationStats, bytes]:
+    """Run episodes [first_episode, first_episode + count); episode i is seeded with seed + i.
+
+    Returns the chunk's stats and its encoded trace (empty unless tracing is on).
+    """
+    grids = _worker_config[2]
+    stats = SimulationStats()
+    for i in range(first_episode, first_episode + count):
+        grid_index = i % len(grids) if grids else None
+        stats.add(_get_simulator(grid_index).run_episode(seed + i, i))
+    return stats, _worker_trace.take()
+
+class ParallelRunner:
+    """Spreads episodes over a process pool and aggregates results as chunks finish.
+
+    Every episode is seeded from its global index, so results do not depend on
+    the number of workers or on the order in which chunks complete.
+    """
+
+    def __init__(self, size=10, num_wumpuses=2, grids: Optional[List[List[List[str]]]] = None,
+                 max_steps=1000, workers: Optional[int] = None, chunk_size=256, kb_class=KnowledgeBase,
+                 reject_impossible=False, corpus: Optional[str] = None, trace: Optional[TraceWriter] = None):
+        self.size = size
+        self.num_wumpuses = num_wumpuses
+        self.grids = grids or []
+        self.max_steps = max_steps
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.kb_class = kb_class
+        self.reject_impossible = reject_impossible
+        self.corpus = corpus
+        # Workers encode their episodes and this process appends them in completion order
+        self.trace = trace
+
+    def run(self, episodes: int, seed: Optional[int] = None,
+            on_progress: Optional[Callable[[SimulationStats], None]] = None) -> SimulationStats:
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+
+        config = (self.size, self.num_wumpuses, self.grids, self.max_steps, self.kb_class,
+                  self.reject_impossible, self.corpus, self.trace is not None)
+        chunks = ((start, min(self.chunk_size, episodes - start))
+                  for start in range(0, episodes, self.chunk_size))
+
+        stats = SimulationStats()
+        start_time = time.perf_counter()
+
+        def collect(chunk: Tuple[SimulationStats, bytes]):
+            partial, trace = chunk
+            stats.merge(partial)
+            if self.trace is not None:
+                self.trace.write_bytes(trace)
+            if on_progress:
+                on_progress(stats)
+
+        if self.workers == 1:
+            _init_worker(*config)
+            for first, count in chunks:
+                collect(_run_chunk(first, count, seed))
+        else:
+            with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=config) as pool:
+                # Keep a bounded number of chunks in flight so huge sweeps don't queue everything up front
+                pending = set()
+                for first, count in chunks:
+                    pending.add(pool.submit(_run_chunk, first, count, seed))
+                    if len(pending) >= self.workers * 4:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            collect(future.result())
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future.result())
+
+        stats.elapsed = time.perf_counter() - start_time
+        return stats
@@ -0,0 +1,417 @@
+"""Incremental shortest paths over the cells the agent knows to be safe.
+
+A DistanceField holds the step distance from every reachable passable cell to
+one target. It is rooted at the target, like D* Lite, so the agent can move
+around without invalidating it. When cells become passable or stop being
+passable, only the affected distances are repaired (LPA*). A path from any
+cell then just walks downhill through the field.
+
+SafePathPlanner keeps one field per recently used target, always including
+the cave entrance. It follows the knowledge base through its version counter,
+so returning home costs time proportional to what the agent learned since the
+last query rather than to the size of the explored area.
+
+Moving costs one action per Forward and one per quarter turn, so the shortest
+cell path is not always the cheapest plan. When the agent's heading is known,
+the planner runs A* over (cell, heading) states with those costs. The target's
+distance field plus a precomputed table of the fewest turns any path needs is
+an exact-distance lower bound, so the search stays in a narrow band around the
+best routes even on 100x100 boards.
+
+To pick where to explore next, frontier() sweeps the same state space once
+and returns the cost of and path to every reachable safe unvisited cell.
+"""
+from collections import OrderedDict, deque
+from heapq import heappop, heappush
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from bitboard import BitSet
+from topology import DIRECTIONS, GridTopology
+
+Cell = Tuple[int, int]
+
+INFINITY = float("inf")
+HOME = (0, 0)
+
+def _turn_bounds() -> List[int]:
+    """Fewest quarter turns needed to reach a cell, even on an open board.
+
+    Indexed by (sign(dx) + 1) * 12 + (sign(dy) + 1) * 4 + heading, where
+    (dx, dy) is the offset from the current cell to the target.
+    """
+    table = []
+    for sign_x in (-1, 0, 1):
+        for sign_y in (-1, 0, 1):
+            needed = [direction for direction, (dx, dy) in enumerate(DIRECTIONS)
+                      if (dx and dx == sign_x) or (dy and dy == sign_y)]
+            for heading in range(4):
+                if not needed or needed == [heading]:
+                    table.append(0)
+                elif len(needed) == 1:
+                    table.append(2 if heading == (needed[0] + 2) % 4 else 1)
+                else:
+                    table.append(1 if heading in needed else 2)
+    return table
+
+TURN_BOUNDS = _turn_bounds()
+
+def _cells_along(cells: Tuple[Cell, ...], parent, state: int) -> List[Cell]:
+    """The cells entered along the chain of parent states ending in state (start excluded)"""
+    path = []
+    while parent[state] >= 0:
+        previous = parent[state]
+        if previous >> 2 != state >> 2:
+            path.append(cells[state >> 2])
+        state = previous
+    path.reverse()
+    return path
+
+class DistanceField:
+    """Step distances to one target through passable cells, repaired incrementally"""
+
+    def __init__(self, topology: GridTopology, target: Cell, passable: Set[Cell]):
+        self.topology = topology
+        self.target = target
+        # Shared with the owning planner, which applies changes before calling changed()
+        self.passable = passable
+        self.g: Dict[Cell, int] = {}
+        self.rhs: Dict[Cell, int] = {}
+        self.queue: List[Tuple[int, Cell]] = []
+        self.built = False
+
+    def _build(self):
+        """Fill the field with a breadth-first search; every cell starts out consistent"""
+        adjacent = self.topology.adjacent
+        passable = self.passable
+        g = {self.target: 0}
+        frontier = [self.target]
+        distance = 0
+        while frontier:
+            distance += 1
+            grown = []
+            for cell in frontier:
+                for neighbor in adjacent(cell):
+                    if neighbor not in g and neighbor in passable:
+                        g[neighbor] = distance
+                        grown.append(neighbor)
+            frontier = grown
+        self.g = g
+        self.rhs = dict(g)
+        self.queue = []
+        self.built = True
+
+    def _update(self, cell: Cell):
+        """Recompute the one-step lookahead distance of cell and queue it if inconsistent"""
+        g = self.g
+        if cell != self.target:
+            rhs = INFINITY
+            if cell in self.passable:
+                for neighbor in self.topology.adjacent(cell):
+                    distance = g.get(neighbor, INFINITY) + 1
+                    if distance < rhs:
+                        rhs = distance
+            if rhs == INFINITY:
+                self.rhs.pop(cell, None)
+            else:
+                self.rhs[cell] = rhs
+        else:
+            rhs = 0
+        distance = g.get(cell, INFINITY)
+        if distance != rhs:
+            heappush(self.queue, (min(distance, rhs), cell))
+
+    def changed(self, cells: Iterable[Cell]):
+        """Note cells whose passability changed; the field is repaired on the next query"""
+        if not self.built:
+            return
+        adjacent = self.topology.adjacent
+        update = self._update
+        for cell in cells:
+            update(cell)
+            for neighbor in adjacent(cell):
+                update(neighbor)
+
+    def repair(self):
+        if not self.built:
+            self._build()
+            return
+        queue, g, rhs = self.queue, self.g, self.rhs
+        adjacent = self.topology.adjacent
+        update = self._update
+        while queue:
+            key, cell = heappop(queue)
+            distance = g.get(cell, INFINITY)
+            lookahead = rhs.get(cell, INFINITY)
+            if distance == lookahead or key != min(distance, lookahead):
+                continue  # Stale entry
+            if distance > lookahead:
+                g[cell] = lookahead
+            else:
+                del g[cell]
+                update(cell)
+            for neighbor in adjacent(cell):
+                update(neighbor)
+
+    def distance(self, cell: Cell) -> float:
+        self.repair()
+        return self.g.get(cell, INFINITY)
+
+    def path(self, start: Cell, direction: Optional[int] = None) -> List[Cell]:
+        """Shortest path from start to the target, without start; [] if there is none.
+
+        Among equally short continuations the one straight ahead is preferred,
+        then the topology's neighbor order.
+        """
+        self.repair()
+        if start == self.target:
+            return []
+        g = self.g
+        adjacent = self.topology.adjacent
+        remaining = min((g.get(neighbor, INFINITY) for neighbor in adjacent(start)), default=INFINITY)
+        if remaining == INFINITY:
+            return []
+        path = []
+        current = start
+        while True:
+            ahead = None
+            if direction is not None:
+                dx, dy = DIRECTIONS[direction]
+                ahead = (current[0] + dx, current[1] + dy)
+            if ahead is not None and g.get(ahead) == remaining:
+                step = ahead
+            else:
+                step = next(neighbor for neighbor in adjacent(current) if g.get(neighbor) == remaining)
+                dx, dy = step[0] - current[0], step[1] - current[1]
+                direction = DIRECTIONS.index((dx, dy))
+            path.append(step)
+            if remaining == 0:
+                return path
+            current = step
+            remaining -= 1
+
+class FrontierSearch:
+    """Cheapest plans from one (cell, heading) to every reachable safe unvisited cell.
+
+    All actions cost the same, so one breadth-first sweep over (cell, heading)
+    states is a Dijkstra search; it records the state that first entered each
+    cell, which is the end of a cheapest plan to that cell.
+    """
+
+    def __init__(self, topology: GridTopology, distances: Dict[Cell, int], entered: Dict[Cell, int],
+                 parent: Dict[int, int]):
+        self.topology = topology
+        # Actions needed to enter each frontier cell, Forwards and turns alike
+        self.distances = distances
+        self._entered = entered
+        self._parent = parent
+
+    def path(self, target: Cell) -> List[Cell]:
+        """Cells of the cheapest plan to a frontier cell, without the start; [] if it is not one"""
+        state = self._entered.get(target)
+        if state is None:
+            return []
+        return _cells_along(self.topology.cells, self._parent, state)
+
+class SafePathPlanner:
+    """Shortest paths through definitely safe cells, kept in step with a knowledge base.
+
+    A cell is passable if it was visited, or is known safe and not suspected
+    of holding a pit or a Wumpus. The planner keeps distance fields to up to
+    max_fields targets; the field to HOME is never evicted.
+    """
+
+    def __init__(self, topology: GridTopology, max_fields: int = 4):
+        self.topology = topology
+        self.max_fields = max_fields
+        self.passable: Set[Cell] = set()
+        # passable as one flag per cell index, for the (cell, heading) search
+        self.passable_mask = bytearray(topology.cell_count)
+        self.fields: "OrderedDict[Cell, DistanceField]" = OrderedDict()
+        self._kb = None
+        self._version: Optional[int] = None
+        self._bits = 0
+        self._frontier: Optional[FrontierSearch] = None
+        self._frontier_key: Optional[Tuple[int, Cell, int]] = None
+
+    def sync(self, kb):
+        """Apply what changed in kb since the last call to every cached field"""
+        if kb is self._kb and kb.version == self._version:
+            return
+        if kb is not self._kb:
+            self._kb = kb
+            self.passable.clear()
+            self.passable_mask = bytearray(self.topology.cell_count)
+            self.fields.clear()
+            self._frontier = None
+            self._bits = 0
+        self._version = kb.version
+        added, removed = self._passable_changes(kb)
+        if not added and not removed:
+            return
+        self.passable |= added
+        self.passable -= removed
+        mask, size = self.passable_mask, self.topology.size
+        for x, y in added:
+            mask[y * size + x] = 1
+        for x, y in removed:
+            mask[y * size + x] = 0
+        changed = added | removed
+        for field in self.fields.values():
+            field.changed(changed)
+
+    def _passable_changes(self, kb) -> Tuple[Set[Cell], Set[Cell]]:
+        visited = kb.visited
+        if hasattr(visited, "bits"):
+            # Bitboard knowledge base: diff whole boards, then decode only the changed cells
+            bits = visited.bits | (kb.safe_cells.bits & ~(kb.pit_possible.bits | kb.wumpus_possible.bits))
+            changed = bits ^ self._bits
+            previous, self._bits = self._bits, bits
+            size = self.topology.size
+            return set(BitSet(size, changed & bits)), set(BitSet(size, changed & previous))
+        current = set(visited)
+        current |= kb.safe_cells - kb.pit_possible - kb.wumpus_possible
+        return current - self.passable, self.passable - current
+
+    def field(self, target: Cell) -> DistanceField:
+        fields = self.fields
+        field = fields.get(target)
+        if field is not None:
+            fields.move_to_end(target)
+            return field
+        field = fields[target] = DistanceField(self.topology, target, self.passable)
+        if len(fields) > self.max_fields:
+            for cached in fields:
+                if cached != HOME:
+                    del fields[cached]
+                    break
+        return field
+
+    def is_passable(self, kb, cell: Cell) -> bool:
+        self.sync(kb)
+        return cell in self.passable
+
+    def path(self, kb, start: Cell, target: Cell, direction: Optional[int] = None) -> List[Cell]:
+        """Cheapest safe path from start to target, without start; [] if there is none.
+
+        With a direction the path minimizes Forwards plus turns, otherwise
+        it is one of the paths with the fewest cells.
+        """
+        self.sync(kb)
+        if start == target or target not in self.passable:
+            return []
+        field = self.field(target)
+        if direction is None:
+            return field.path(start)
+        return self._turn_aware_path(field, start, direction)
+
+    def _turn_aware_path(self, field: DistanceField, start: Cell, direction: int) -> List[Cell]:
+        """A* over (cell, heading) states, numbered cell index * 4 + heading"""
+        field.repair()
+        topology = self.topology
+        cells, ahead = topology.cells, topology.ahead_index
+        passable = self.passable_mask
+        distances = field.g
+        target_x, target_y = field.target
+        goal = topology.index(field.target)
+        start_index = topology.index(start)
+        start_distance = distances.get(start)
+        if start_distance is None:
+            # The start itself may be unsafe; it only has to border a reachable cell
+            start_distance = min((distances.get(cell, INFINITY) for cell in topology.adjacent(start)),
+                                 default=INFINITY) + 1
+            if start_distance == INFINITY:
+                return []
+
+        def heuristic(state: int) -> Optional[int]:
+            index = state >> 2
+            cell = cells[index]
+            distance = start_distance if index == start_index else distances.get(cell)
+            if distance is None:
+                return None  # The target cannot be reached from this cell
+            x, y = cell
+            return distance + TURN_BOUNDS[((target_x > x) - (target_x < x) + 1) * 12 +
+                                          ((target_y > y) - (target_y < y) + 1) * 4 + (state & 3)]
+
+        start_state = start_index * 4 + direction
+        estimate = heuristic(start_state)
+        # Sized by the states the search touches, never by the board
+        closed: Set[int] = set()
+        cost = {start_state: 0}
+        parent = {start_state: -1}
+        # Ties go to the state closer to the target; stale entries are skipped instead of decreased
+        queue = [(estimate, estimate, start_state)]
+        while queue:
+            _, _, state = heappop(queue)
+            if state in closed:
+                continue
+            closed.add(state)
+            if state >> 2 == goal:
+                return _cells_along(cells, parent, state)
+            successor_cost = cost[state] + 1
+            heading = state & 3
+            turned = state - heading
+            forward = ahead[state]
+            for successor in (forward * 4 + heading if forward >= 0 and passable[forward] else -1,
+                              turned + ((heading + 3) & 3), turned + ((heading + 1) & 3)):
+                if successor < 0 or successor in closed or successor_cost >= cost.get(successor, INFINITY):
+                    continue
+                estimate = heuristic(successor)
+                if estimate is None:
+                    continue
+                cost[successor] = successor_cost
+                parent[successor] = state
+                heappush(queue, (successor_cost + estimate, estimate, successor))
+        return []
+
+    def frontier(self, kb, start: Cell, direction: int) -> FrontierSearch:
+        """Cheapest plans to all safe unvisited cells; reused until kb, start or heading change"""
+        self.sync(kb)
+        key = (kb.version, start, direction)
+        if self._frontier is not None and self._frontier_key == key:
+            return self._frontier
+        topology = self.topology
+        cells, ahead = topology.cells, topology.ahead_index
+        passable = self.passable_mask
+        visited = kb.visited
+        start_state = topology.index(start) * 4 + direction
+        # Both sized by the region explored; a state is seen once it has a parent
+        parent = {start_state: -1}
+        cost = {start_state: 0}
+        distances: Dict[Cell, int] = {}
+        entered: Dict[Cell, int] = {}
+        queue = deque([start_state])
+        while queue:
+            state = queue.popleft()
+            successor_cost = cost[state] + 1
+            heading = state & 3
+            turned = state - heading
+            forward = ahead[state]
+            if forward >= 0 and passable[forward]:
+                successor = forward * 4 + heading
+                if successor not in parent:
+                    parent[successor] = state
+                    cost[successor] = successor_cost
+                    queue.append(successor)
+                    cell = cells[forward]
+                    if cell not in entered and cell not in visited:
+                        entered[cell] = successor
+                        distances[cell] = successor_cost
+            for successor in (turned + ((heading + 3) & 3), turned + ((heading + 1) & 3)):
+                if successor not in parent:
+                    parent[successor] = state
+                    cost[successor] = successor_cost
+                    queue.append(successor)
+        self._frontier = FrontierSearch(topology, distances, entered, parent)
+        self._frontier_key = key
+        return self._frontier
+
+    def distance(self, kb, start: Cell, target: Cell) -> float:
+        """Safe step distance from start to target; INFINITY if unreachable"""
+        self.sync(kb)
+        if start == target:
+            return 0
+        if target not in self.passable:
+            return INFINITY
+        field = self.field(target)
+        return min((field.distance(neighbor) for neighbor in self.topology.adjacent(start)),
+                   default=INFINITY) + 1
@@ -0,0 +1,360 @@
+import time
+from math import comb
+from typing import Dict, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+class InferenceStats:
+    """Counters describing how much work the inference engine has done"""
+
+    def __init__(self):
+        self.queries = 0
+        self.cache_hits = 0
+        self.evaluations = 0
+        self.components = 0
+        self.component_cache_hits = 0
+        self.fallbacks = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+
+    @property
+    def mean_time(self) -> float:
+        """Average seconds spent per evaluation (one per knowledge base change that was queried)"""
+        return self.total_time / self.evaluations if self.evaluations else 0.0
+
+    def __repr__(self) -> str:
+        return (f"InferenceStats(queries={self.queries}, cache_hits={self.cache_hits}, "
+                f"evaluations={self.evaluations}, components={self.components}, "
+                f"component_cache_hits={self.component_cache_hits}, fallbacks={self.fallbacks}, "
+                f"mean_time={self.mean_time * 1000:.3f}ms)")
+
+class FrontierInference:
+    """Exact pit and Wumpus probabilities from the knowledge base's evidence.
+
+    Every breeze (stench) location says at least one of its unknown neighbors
+    holds a pit (Wumpus). The unknown cells touched by those constraints form
+    the frontier, which is split into independent connected components whose
+    consistent assignments are counted exactly. Pits are independent with a fixed
+    prior; Wumpuses are combined across components with the known number of
+    living Wumpuses, the rest being spread uniformly over the unconstrained
+    unknown cells.
+
+    Results are cached per knowledge base version, so repeated queries within
+    a step are dictionary lookups, and per component signature, so components
+    whose evidence did not change are not enumerated again.
+    """
+
+    def __init__(self, pit_prior=0.1, max_states=20000, max_cells=512, cache_limit=4096):
+        self.pit_prior = pit_prior
+        self.max_states = max_states
+        self.max_cells = max_cells
+        self.cache_limit = cache_limit
+        self.stats = InferenceStats()
+        self._pit_version = None
+        self._pit_result = None
+        self._wumpus_version = None
+        self._wumpus_result = None
+        self._component_cache = {}
+
+    def fork(self) -> "FrontierInference":
+        """Engine for a cloned knowledge base: own per-version results, shared component cache"""
+        other = FrontierInference(self.pit_prior, self.max_states, self.max_cells, self.cache_limit)
+        other._component_cache = self._component_cache
+        return other
+
+    def pit_probability(self, kb, pos: Cell) -> Optional[float]:
+        """P(pit at pos), or None if the evidence around pos could not be resolved"""
+        self.stats.queries += 1
+        if self._pit_version == kb.version:
+            self.stats.cache_hits += 1
+        else:
+            self._pit_result = self._timed(self._evaluate_pits, kb)
+            self._pit_version = kb.version
+        probabilities, unresolved, other = self._pit_result
+        if pos in probabilities:
+            return probabilities[pos]
+        if pos in unresolved:
+            return None
+        return other
+
+    def wumpus_probability(self, kb, pos: Cell) -> Optional[float]:
+        """P(live Wumpus at pos), or None if the evidence is inconsistent"""
+        self.stats.queries += 1
+        if self._wumpus_version == kb.version:
+            self.stats.cache_hits += 1
+        else:
+            self._wumpus_result = self._timed(self._evaluate_wumpuses, kb)
+            self._wumpus_version = kb.version
+        if self._wumpus_result is None:
+            return None
+        probabilities, other = self._wumpus_result
+        return probabilities.get(pos, other)
+
+    def _timed(self, evaluate, kb):
+        start = time.perf_counter()
+        result = evaluate(kb)
+        elapsed = time.perf_counter() - start
+        self.stats.evaluations += 1
+        self.stats.last_time = elapsed
+        self.stats.total_time += elapsed
+        return result
+
+    def _constraints(self, kb, locations, known_free) -> List[Tuple[Cell, ...]]:
+        constraints = set()
+        for location in locations:
+            unknown = tuple(sorted(adj for adj in kb._get_adjacent(location)
+                                   if adj not in kb.visited and adj not in known_free))
+            constraints.add(unknown)
+        return sorted(constraints)
+
+    def _unknown_count(self, kb, known_free) -> int:
+        known = len(kb.visited) + sum(1 for pos in known_free if pos not in kb.visited)
+        return kb.size * kb.size - known
+
+    def _evaluate_pits(self, kb):
+        constraints = self._constraints(kb, kb.breeze_locations, kb.no_pit)
+        probabilities = {}
+        unresolved = set()
+        for component in self._components(constraints):
+            counts = self._enumerate(component, "pit")
+            cells = _component_cells(component)
+            if counts is None:
+                self.stats.fallbacks += 1
+                unresolved.update(cells)
+                continue
+
+            # Weigh each assignment by prior^k * (1 - prior)^(n - k)
+            ratio = self.pit_prior / (1.0 - self.pit_prior)
+            total = 0.0
+            cell_weights = dict.fromkeys(cells, 0.0)
+            for k, count in enumerate(counts["total"]):
+                total += count * ratio ** k
+                for cell in cells:
+                    cell_weights[cell] += counts[cell][k] * ratio ** k
+            if total == 0.0:
+                self.stats.fallbacks += 1
+                unresolved.update(cells)
+                continue
+            for cell in cells:
+                probabilities[cell] = cell_weights[cell] / total
+        return probabilities, unresolved, self.pit_prior
+
+    def _evaluate_wumpuses(self, kb):
+        remaining = kb.num_wumpuses - kb.wumpuses_killed
+        if not kb.wumpus_alive or remaining <= 0:
+            return {}, 0.0
+
+        constraints = self._constraints(kb, kb.stench_locations, kb.no_wumpus)
+        components = []
+        for component in self._components(constraints):
+            counts = self._enumerate(component, "wumpus")
+            if counts is None:
+                self.stats.fallbacks += 1
+                return None
+            components.append((_component_cells(component), counts))
+
+        frontier_size = sum(len(cells) for cells, _ in components)
+        others = self._unknown_count(kb, kb.no_wumpus) - frontier_size
+
+        def combine(polys):
+            result = [1]
+            for poly in polys:
+                product = [0] * min(len(result) + len(poly) - 1, remaining + 1)
+                for i, a in enumerate(result):
+                    if a:
+                        for j, b in enumerate(poly):
+                            if i + j <= remaining:
+                                product[i + j] += a * b
+                result = product
+            return result
+
+        def placements(poly, free_cells, wumpuses):
+            # Ways to place the rest of the wumpuses among the unconstrained cells
+            return sum(count * comb(free_cells, wumpuses - k)
+                       for k, count in enumerate(poly) if k <= wumpuses and free_cells >= 0)
+
+        all_polys = [counts["total"] for _, counts in components]
+        total = placements(combine(all_polys), others, remaining)
+        if total == 0:
+            self.stats.fallbacks += 1
+            return None
+
+        probabilities = {}
+        for index, (cells, counts) in enumerate(components):
+            rest = combine(all_polys[:index] + all_polys[index + 1:])
+            for cell in cells:
+                weight = 0
+                for k, count in enumerate(counts[cell]):
+                    if count and k <= remaining:
+                        weight += count * placements(rest, others, remaining - k)
+                probabilities[cell] = weight / total
+
+        other = 0.0
+        if others > 0:
+            other = placements(combine(all_polys), others - 1, remaining - 1) / total
+        return probabilities, other
+
+    def _components(self, constraints: List[Tuple[Cell, ...]]) -> List[List[Tuple[Cell, ...]]]:
+        """Group constraints that share unknown cells"""
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        for constraint in constraints:
+            for cell in constraint:
+                parent.setdefault(cell, cell)
+            for cell in constraint[1:]:
+                parent[find(cell)] = find(constraint[0])
+
+        groups = {}
+        for constraint in constraints:
+            root = find(constraint[0]) if constraint else None
+            groups.setdefault(root, []).append(constraint)
+        return list(groups.values())
+
+    def _enumerate(self, component: List[Tuple[Cell, ...]], kind: str) -> Optional[Dict]:
+        """Count consistent assignments of a component by number of occupied cells.
+
+        Returns {"total": [n_0, n_1, ...], cell: [m_0, m_1, ...]} where n_k is the
+        number of assignments with k occupied cells and m_k those of them in which
+        the cell is occupied, or None if the component is unsatisfiable or has
+        too many open-constraint states to count.
+        """
+        signature = (kind, tuple(component))
+        cached = self._component_cache.get(signature)
+        if cached is not None:
+            self.stats.component_cache_hits += 1
+            return cached if cached != "unresolved" else None
+
+        self.stats.components += 1
+        result = self._count_assignments(component)
+        if len(self._component_cache) >= self.cache_limit:
+            self._component_cache.clear()
+        self._component_cache[signature] = result if result is not None else "unresolved"
+        return result
+
+    def _count_assignments(self, component: List[Tuple[Cell, ...]]) -> Optional[Dict]:
+        """Dynamic program over the component's cells in a low-bandwidth order.
+
+        The state after deciding cells 0..i-1 is the set of constraints that have
+        been opened but are not yet satisfied; a constraint whose last cell is
+        decided while it is still unsatisfied prunes that branch. Forward and
+        backward passes give both the totals and the per-cell counts.
+        """
+        if any(not constraint for constraint in component):
+            return None
+
+        order = _bandwidth_order(component)
+        if len(order) > self.max_cells:
+            return None
+        n = len(order)
+        position = {cell: i for i, cell in enumerate(order)}
+        touches = [[] for _ in range(n)]
+        opens = [[] for _ in range(n)]
+        closes = [[] for _ in range(n)]
+        for c, constraint in enumerate(component):
+            indices = [position[cell] for cell in constraint]
+            for i in indices:
+                touches[i].append(c)
+            opens[min(indices)].append(c)
+            closes[max(indices)].append(c)
+
+        def step(state, i, value):
+            unsatisfied = state.union(opens[i])
+            if value:
+                unsatisfied = unsatisfied.difference(touches[i])
+            for c in closes[i]:
+                if c in unsatisfied:
+                    return None
+            return unsatisfied.difference(closes[i])
+
+        empty = frozenset()
+        forward = [{empty: [1]}]
+        for i in range(n):
+            layer = {}
+            for state, poly in forward[i].items():
+                for value in (0, 1):
+                    next_state = step(state, i, value)
+                    if next_state is not None:
+                        layer[next_state] = _poly_add(layer.get(next_state), _poly_shift(poly, value))
+            if len(layer) > self.max_states:
+                return None
+            forward.append(layer)
+
+        totals = forward[n].get(empty)
+        if not totals or not any(totals):
+            return None
+
+        backward = [None] * n + [{empty: [1]}]
+        for i in range(n - 1, -1, -1):
+            layer = {}
+            for state in forward[i]:
+                poly = None
+                for value in (0, 1):
+                    next_state = step(state, i, value)
+                    if next_state is not None and next_state in backward[i + 1]:
+                        poly = _poly_add(poly, _poly_shift(backward[i + 1][next_state], value))
+                if poly is not None:
+                    layer[state] = poly
+            backward[i] = layer
+
+        result = {"total": _poly_pad(totals, n + 1)}
+        for cell, i in position.items():
+            counts = None
+            for state, poly in forward[i].items():
+                next_state = step(state, i, 1)
+                if next_state is not None and next_state in backward[i + 1]:
+                    counts = _poly_add(counts, _poly_mul(poly, _poly_shift(backward[i + 1][next_state], 1)))
+            result[cell] = _poly_pad(counts or [0], n + 1)
+        return result
+
+def _bandwidth_order(component: List[Tuple[Cell, ...]]) -> List[Cell]:
+    """Breadth-first order from a peripheral cell, keeping constraint spans short"""
+    links = {}
+    for constraint in component:
+        for cell in constraint:
+            links.setdefault(cell, set()).update(constraint)
+    order = []
+    seen = set()
+    for start in sorted(links, key=lambda cell: (len(links[cell]), cell)):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = [start]
+        for cell in queue:
+            order.append(cell)
+            for linked in sorted(links[cell] - seen, key=lambda c: (len(links[c]), c)):
+                seen.add(linked)
+                queue.append(linked)
+    return order
+
+def _poly_add(a: Optional[List[int]], b: List[int]) -> List[int]:
+    if a is None:
+        return list(b)
+    if len(a) < len(b):
+        a, b = b, a
+    result = list(a)
+    for k, value in enumerate(b):
+        result[k] += value
+    return result
+
+def _poly_shift(poly: List[int], amount: int) -> List[int]:
+    return [0] * amount + poly if amount else poly
+
+def _poly_mul(a: List[int], b: List[int]) -> List[int]:
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return result
+
+def _poly_pad(poly: List[int], length: int) -> List[int]:
+    return (poly + [0] * length)[:length]
+
+def _component_cells(component: List[Tuple[Cell, ...]]) -> List[Cell]:
+    return sorted({cell for constraint in component for cell in constraint})
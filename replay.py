@@ -0,0 +1,235 @@
+"""Deterministic replay of single episodes.
+
+An EpisodeRecording holds the minimal inputs of an episode: the world layout,
+the seeds of the arrow and agent random streams, the knowledge base backend
+and the actions taken.
+Replay re-runs the agent on that layout with those seeds, so the environment
+and agent can be rebuilt at any step. Snapshots of both are kept every
+snapshot_every steps, so seeking only replays from the nearest snapshot.
+The recorded actions are checked against the agent's choices, and the first
+mismatch shows where the current code departs from the recording.
+"""
+import argparse
+import random
+import struct
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from agent import AgentSnapshot, WumpusAgent
+from codes import ACTION_CODES, ACTION_NAMES, RESULT_NAMES, UNKNOWN_ACTION
+from environment import EnvironmentSnapshot, WumpusEnvironment, parse_grid_from_file
+from episode_trace import TraceBuffer, TraceStep, decode_trace
+from log_config import configure_logging
+from simulator import KNOWLEDGE_BASES, Simulator, derive_seed
+from world_corpus import WorldRecord, decode_record, record_size
+
+MAGIC = b"WUMPUSRP"
+FORMAT_VERSION = 2
+HEADER = struct.Struct("<8sHHqQQIB")
+# Format 1 had no knowledge base code; those episodes were all played with sets
+HEADER_V1 = struct.Struct("<8sHHqQQI")
+# Knowledge base backends by their code in the header
+KB_KINDS = ("sets", "bitboard")
+
+class ReplayDivergence(Exception):
+    """The agent chose a different action than the recording at this step"""
+
+    def __init__(self, step: int, expected: Optional[str], actual: str):
+        super().__init__(f"Step {step}: recording has {expected}, agent chose {actual}")
+        self.step = step
+        self.expected = expected
+        self.actual = actual
+
+@dataclass
+class EpisodeRecording:
+    world: WorldRecord
+    seed: Optional[int]
+    arrow_seed: int
+    agent_seed: int
+    actions: bytes
+    # Key of KNOWLEDGE_BASES the episode was played with
+    kb: str = "sets"
+
+    @classmethod
+    def from_simulator(cls, simulator: Simulator, seed: int, world: Optional[int] = None) -> "EpisodeRecording":
+        """Play one episode on the simulator and record it"""
+        previous = simulator.trace
+        simulator.trace = buffer = TraceBuffer()
+        try:
+            simulator.run_episode(seed, world)
+        finally:
+            simulator.trace = previous
+        actions = bytes(record.action for record in decode_trace(buffer.take()) if isinstance(record, TraceStep))
+        kb = next(name for name, kb_class in KNOWLEDGE_BASES.items() if type(simulator.agent.kb) is kb_class)
+        return cls(WorldRecord.from_environment(simulator.environment, seed), seed,
+                   derive_seed(seed, "arrow"), derive_seed(seed, "agent"), actions, kb)
+
+    def action_name(self, step: int) -> Optional[str]:
+        code = self.actions[step]
+        return ACTION_NAMES[code] if code < len(ACTION_NAMES) else None
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.world.size, -1 if self.seed is None else self.seed,
+                                   self.arrow_seed, self.agent_seed, len(self.actions), KB_KINDS.index(self.kb)))
+            file.write(self.world.to_bytes())
+            file.write(self.actions)
+
+    @classmethod
+    def load(cls, path: str) -> "EpisodeRecording":
+        with open(path, "rb") as file:
+            data = file.read()
+        if len(data) < HEADER_V1.size or data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not an episode recording")
+        version = HEADER_V1.unpack_from(data)[1]
+        if version == 1:
+            header, kb_code = HEADER_V1, 0
+            _, _, size, seed, arrow_seed, agent_seed, count = header.unpack_from(data)
+        elif version == FORMAT_VERSION:
+            header = HEADER
+            if len(data) < header.size:
+                raise ValueError(f"{path} is truncated")
+            _, _, size, seed, arrow_seed, agent_seed, count, kb_code = header.unpack_from(data)
+        else:
+            raise ValueError(f"{path} uses recording format {version}, expected {FORMAT_VERSION}")
+        if kb_code >= len(KB_KINDS):
+            raise ValueError(f"{path} was recorded with unknown knowledge base code {kb_code}")
+        start = header.size + record_size(size)
+        if len(data) != start + count:
+            raise ValueError(f"{path} is truncated")
+        return cls(decode_record(size, data, header.size), None if seed < 0 else seed,
+                   arrow_seed, agent_seed, data[start:], KB_KINDS[kb_code])
+
+@dataclass
+class ReplayStep:
+    step: int
+    percepts: List[str]
+    action: str
+    result: str
+
+class Replay:
+    """Steps a recorded episode forwards and seeks to any step.
+
+    The agent uses the recording's knowledge base backend unless kb_class is given.
+    """
+
+    def __init__(self, recording: EpisodeRecording, kb_class=None, snapshot_every=64):
+        self.recording = recording
+        self.kb_class = kb_class = kb_class or KNOWLEDGE_BASES[recording.kb]
+        self.snapshot_every = snapshot_every
+        self.snapshots: Dict[int, Tuple[EnvironmentSnapshot, AgentSnapshot]] = {}
+
+        world = recording.world
+        environment = WumpusEnvironment(world.size, len(world.wumpus_positions),
+                                        arrow_rng=random.Random(recording.arrow_seed))
+        world.load_into(environment)
+        self.environment = environment
+        self.agent = WumpusAgent(world.size, environment.num_wumpuses, kb_class,
+                                 rng=random.Random(recording.agent_seed))
+        self.step_index = 0
+        self.snapshots[0] = (environment.snapshot(), self.agent.snapshot())
+
+    def __len__(self) -> int:
+        return len(self.recording.actions)
+
+    def step(self) -> ReplayStep:
+        """Advance one step; raises ReplayDivergence if the agent leaves the recording"""
+        index = self.step_index
+        if index >= len(self):
+            raise IndexError("replay is already at the end of the recording")
+        percepts = self.environment.get_percepts()
+        action = self.agent.get_action(percepts)
+        code = ACTION_CODES.get(action, UNKNOWN_ACTION)
+        if code != self.recording.actions[index]:
+            raise ReplayDivergence(index, self.recording.action_name(index), action)
+        result = self.environment.step(code)
+        self.agent.apply_result(code, result)
+        self.step_index = index + 1
+        if self.step_index % self.snapshot_every == 0 and self.step_index not in self.snapshots:
+            self.snapshots[self.step_index] = (self.environment.snapshot(), self.agent.snapshot())
+        return ReplayStep(index, percepts, action, RESULT_NAMES[result])
+
+    def seek(self, step: int):
+        """Rebuild the state after the first `step` actions"""
+        if not 0 <= step <= len(self):
+            raise IndexError(f"step {step} is outside the recording (0..{len(self)})")
+        base = max(index for index in self.snapshots if index <= step)
+        if not base <= self.step_index <= step:
+            environment_snapshot, agent_snapshot = self.snapshots[base]
+            self.environment.restore(environment_snapshot)
+            self.agent.restore(agent_snapshot)
+            self.step_index = base
+        while self.step_index < step:
+            self.step()
+
+    def first_divergence(self) -> Optional[ReplayDivergence]:
+        """Replay to the end; the divergence if the agent no longer follows the recording"""
+        try:
+            self.seek(len(self))
+        except ReplayDivergence as divergence:
+            return divergence
+        return None
+
+def describe(replay: Replay) -> str:
+    environment, agent = replay.environment, replay.agent
+    kb = agent.kb
+    return "\n".join([
+        f"Step:          {replay.step_index} of {len(replay)}",
+        f"Position:      {environment.agent_pos} facing {'NESW'[environment.agent_direction]}",
+        f"Alive:         {environment.agent_alive}, gold: {environment.agent_has_gold}, "
+        f"arrow: {environment.agent_has_arrow}, score: {agent.get_score()}",
+        f"Wumpuses:      {sorted(environment.wumpus_alive)} alive of {sorted(environment.wumpus_positions)}",
+        f"Visited:       {len(kb.visited)} cells, {len(kb.get_safe_unvisited_cells())} safe unvisited",
+        f"Pits possible: {sorted(kb.pit_possible)}",
+        f"Wumpus possible: {sorted(kb.wumpus_possible)}",
+    ])
+
+def main():
+    parser = argparse.ArgumentParser(description="Record and replay single episodes")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="play one episode from its seed and save the recording")
+    record.add_argument("recording")
+    record.add_argument("--seed", type=int, required=True, help="episode seed (base seed + episode index)")
+    record.add_argument("--size", type=int, default=10)
+    record.add_argument("--wumpuses", type=int, default=2)
+    record.add_argument("--grid", help="grid file the episode was played on")
+    record.add_argument("--corpus", help="world corpus the episode was played on")
+    record.add_argument("--world", type=int, help="episode index into the corpus")
+    record.add_argument("--max-steps", type=int, default=1000)
+    record.add_argument("--kb", choices=KB_KINDS, default="sets", help="knowledge base backend")
+    record.add_argument("--reject-impossible", action="store_true")
+
+    show = commands.add_parser("show", help="print the state after a given step")
+    show.add_argument("recording")
+    show.add_argument("--step", type=int, help="defaults to the last step")
+
+    check = commands.add_parser("check", help="report where the current agent departs from the recording")
+    check.add_argument("recording")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+
+    if args.command == "record":
+        grid = parse_grid_from_file(args.grid) if args.grid else None
+        simulator = Simulator(args.size, args.wumpuses, grid, args.max_steps, KNOWLEDGE_BASES[args.kb],
+                              reject_impossible=args.reject_impossible, corpus=args.corpus)
+        recording = EpisodeRecording.from_simulator(simulator, args.seed, args.world)
+        recording.save(args.recording)
+        print(f"Recorded {len(recording.actions)} steps to {args.recording}")
+    elif args.command == "show":
+        replay = Replay(EpisodeRecording.load(args.recording))
+        try:
+            replay.seek(len(replay) if args.step is None else args.step)
+        except IndexError as error:
+            show.error(str(error))
+        print(describe(replay))
+    else:
+        divergence = Replay(EpisodeRecording.load(args.recording)).first_divergence()
+        if divergence is None:
+            print("The agent follows the recording to the end")
+        else:
+            print(divergence)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+
+from environment import parse_grid_from_file
+from simulator import KNOWLEDGE_BASES, Simulator
+from parallel_runner import ParallelRunner
+from episode_trace import TraceWriter
+from log_config import configure_logging
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Wumpus World episodes headlessly")
+    parser.add_argument("--episodes", type=int, default=1000, help="number of episodes to run")
+    parser.add_argument("--grid", nargs="+", help="grid file(s) to cycle through instead of random worlds")
+    parser.add_argument("--corpus", help="binary world corpus (see world_corpus.py); episode i plays world i")
+    parser.add_argument("--size", type=int, default=10, help="board size for random worlds")
+    parser.add_argument("--wumpuses", type=int, default=2, help="number of Wumpuses in random worlds")
+    parser.add_argument("--max-steps", type=int, default=1000, help="step limit per episode")
+    parser.add_argument("--seed", type=int, help="base seed; episode i uses seed + i")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per core)")
+    parser.add_argument("--chunk-size", type=int, default=256, help="episodes per work unit when running in parallel")
+    parser.add_argument("--kb", choices=sorted(KNOWLEDGE_BASES), default="sets", help="knowledge base backend")
+    parser.add_argument("--reject-impossible", action="store_true",
+                        help="redraw random worlds whose gold cannot be reached")
+    parser.add_argument("--trace", help="append a binary trace of every step to this file (.gz compresses)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+                        help="agent and knowledge base log output (WARNING keeps runs quiet)")
+    args = parser.parse_args()
+    configure_logging(args.log_level)
+    kb_class = KNOWLEDGE_BASES[args.kb]
+
+    if args.grid and args.corpus:
+        parser.error("--grid and --corpus cannot be combined")
+    grids = [parse_grid_from_file(path) for path in args.grid] if args.grid else []
+
+    trace = TraceWriter(args.trace) if args.trace else None
+    try:
+        if args.workers == 1 and len(grids) <= 1:
+            simulator = Simulator(args.size, args.wumpuses, grids[0] if grids else None, args.max_steps, kb_class,
+                                  args.reject_impossible, args.corpus, trace)
+            stats = simulator.run(args.episodes, args.seed)
+        else:
+            runner = ParallelRunner(args.size, args.wumpuses, grids, args.max_steps,
+                                    args.workers or None, args.chunk_size, kb_class, args.reject_impossible,
+                                    args.corpus, trace)
+            stats = runner.run(args.episodes, args.seed)
+            print(f"Base seed:     {runner.seed}")
+    finally:
+        if trace is not None:
+            trace.close()
+
+    print(stats.summary())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import random
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from environment import WumpusEnvironment
+from agent import WumpusAgent
+from knowledge_base import KnowledgeBase
+from bitboard import BitboardKnowledgeBase
+from world_generator import SOLVABLE, IMPOSSIBLE
+from world_corpus import WorldCorpus
+from codes import ACTION_CODES, RESULT_NAMES, UNKNOWN_ACTION, CLIMB, VICTORY, DEATH, TIMEOUT
+from episode_trace import TraceBuffer
+
+KNOWLEDGE_BASES = {"sets": KnowledgeBase, "bitboard": BitboardKnowledgeBase}
+
+def derive_seed(seed: int, stream: str) -> int:
+    """Seed for one random stream of an episode; the world itself is generated from seed"""
+    return random.Random(f"{stream}:{seed}").getrandbits(64)
+
+@dataclass
+class EpisodeResult:
+    seed: Optional[int]
+    outcome: str
+    score: int
+    steps: int
+    solvability: int = SOLVABLE
+
+@dataclass
+class SimulationStats:
+    episodes: int = 0
+    victories: int = 0
+    deaths: int = 0
+    timeouts: int = 0
+    total_score: int = 0
+    total_steps: int = 0
+    impossible: int = 0
+    elapsed: float = 0.0
+
+    def add(self, result: EpisodeResult):
+        self.episodes += 1
+        if result.solvability == IMPOSSIBLE:
+            self.impossible += 1
+        self.total_score += result.score
+        self.total_steps += result.steps
+        if result.outcome == VICTORY:
+            self.victories += 1
+        elif result.outcome == DEATH:
+            self.deaths += 1
+        else:
+            self.timeouts += 1
+
+    def merge(self, other: "SimulationStats"):
+        """Fold another batch's counters into this one (elapsed time is left to the caller)"""
+        self.episodes += other.episodes
+        self.victories += other.victories
+        self.deaths += other.deaths
+        self.timeouts += other.timeouts
+        self.total_score += other.total_score
+        self.total_steps += other.total_steps
+        self.impossible += other.impossible
+
+    @property
+    def win_rate(self) -> float:
+        return self.victories / self.episodes if self.episodes else 0.0
+
+    @property
+    def mean_score(self) -> float:
+        return self.total_score / self.episodes if self.episodes else 0.0
+
+    @property
+    def steps_per_second(self) -> float:
+        return self.total_steps / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return "\n".join([
+            f"Episodes:      {self.episodes}",
+            f"Win rate:      {self.win_rate:.1%} ({self.victories} victories)",
+            f"Deaths:        {self.deaths}",
+            f"Timeouts:      {self.timeouts}",
+            f"Mean score:    {self.mean_score:.1f}",
+            f"Impossible:    {self.impossible} worlds with unreachable gold",
+            f"Steps/second:  {self.steps_per_second:,.0f} ({self.total_steps} steps in {self.elapsed:.2f}s)",
+        ])
+
+class Simulator:
+    """Runs the percept -> action -> result loop without any GUI"""
+
+    def __init__(self, size=10, num_wumpuses=2, grid: Optional[List[List[str]]] = None, max_steps=1000,
+                 kb_class=KnowledgeBase, reject_impossible=False, corpus: Optional[str] = None,
+                 trace: Optional[TraceBuffer] = None):
+        self.environment = WumpusEnvironment(size, num_wumpuses, reject_impossible=reject_impossible)
+        self.grid = grid
+        if grid:
+            self.environment.load_from_grid(grid)
+        # Episodes index into the corpus by episode number instead of generating worlds
+        self.corpus = WorldCorpus(corpus) if corpus else None
+        self.agent = WumpusAgent(self.environment.size, self.environment.num_wumpuses, kb_class)
+        self.max_steps = max_steps
+        # Every step is encoded here when set (a TraceWriter streams it to a file)
+        self.trace = trace
+
+    def run_episode(self, seed: Optional[int] = None, world: Optional[int] = None) -> EpisodeResult:
+        """Play one episode; world picks the corpus record (wrapping around) when a corpus is set"""
+        if seed is not None:
+            self.environment.rng.seed(seed)
+            self.environment.arrow_rng.seed(derive_seed(seed, "arrow"))
+            self.agent.rng.seed(derive_seed(seed, "agent"))
+
+        environment = self.environment
+        agent = self.agent
+        if self.corpus is not None:
+            world = (world or 0) % len(self.corpus)
+            self.corpus.load_into(environment, world)
+        else:
+            world = None
+            if self.grid:
+                environment.restart()
+            else:
+                environment.reset()
+        agent.size = environment.size
+        agent.num_wumpuses = len(environment.wumpus_positions)
+        agent.reset()
+
+        trace = self.trace
+        if trace is not None:
+            trace.start_episode(seed, environment.size, agent.num_wumpuses, world)
+
+        outcome = TIMEOUT
+        steps = 0
+        while steps < self.max_steps:
+            percepts = environment.get_percepts()
+            action = agent.get_action(percepts)
+            code = ACTION_CODES.get(action, UNKNOWN_ACTION)
+            result = environment.step(code)
+            agent.apply_result(code, result)
+            steps += 1
+            if trace is not None:
+                trace.step(percepts, action, RESULT_NAMES[result], environment.agent_pos,
+                           environment.agent_direction, agent.get_score())
+
+            if not environment.agent_alive:
+                outcome = DEATH
+                break
+            if code == CLIMB and environment.agent_has_gold and agent.position == (0, 0):
+                outcome = VICTORY
+                break
+
+        if trace is not None:
+            trace.end_episode(outcome, steps, agent.get_score())
+        return EpisodeResult(seed, outcome, agent.get_score(), steps, environment.solvability)
+
+    def run(self, episodes: int, seed: Optional[int] = None, first_episode=0) -> SimulationStats:
+        """Run a batch of episodes; episode i is seeded with seed + i when a seed is given"""
+        stats = SimulationStats()
+        start = time.perf_counter()
+        for i in range(first_episode, first_episode + episodes):
+            stats.add(self.run_episode(None if seed is None else seed + i, i))
+        stats.elapsed = time.perf_counter() - start
+        return stats
@@ -0,0 +1,63 @@
+"""BitSet against built-in sets, and the bitboard knowledge base against the set one"""
+import random
+
+import pytest
+
+from agent import WumpusAgent
+from bitboard import BitSet, BitboardKnowledgeBase
+from environment import WumpusEnvironment
+from knowledge_base import CELL_SETS, KnowledgeBase
+
+def random_cells(rng, size, count):
+    return {(rng.randrange(size), rng.randrange(size)) for _ in range(count)}
+
+@pytest.mark.parametrize("size", [1, 7, 40])
+def test_bitset_behaves_like_a_set(size):
+    rng = random.Random(size)
+    for _ in range(50):
+        a, b = random_cells(rng, size, 20), random_cells(rng, size, 20)
+        bits_a, bits_b = BitSet(size), BitSet(size)
+        for cell in a:
+            bits_a.add(cell)
+        for cell in b:
+            bits_b.add(cell)
+        assert set(bits_a) == a and len(bits_a) == len(a)
+        assert set(bits_a - bits_b) == a - b
+        assert set(bits_a & bits_b) == a & b
+        assert set(bits_a | bits_b) == a | b
+        for cell in random_cells(rng, size, 10) | {(-1, 0), (0, size), (size, size - 1)}:
+            assert (cell in bits_a) == (cell in a)
+        copy = bits_a.copy()
+        removed = next(iter(a))
+        copy.discard(removed)
+        assert removed in bits_a and removed not in copy
+        assert bits_a == a
+
+@pytest.mark.parametrize("incremental", [True, False])
+@pytest.mark.parametrize("seed", range(20))
+def test_bitboard_knowledge_matches_sets(incremental, seed):
+    """Feed both backends the percepts of one episode and compare them after every step"""
+    size = 6 + seed % 8
+    environment = WumpusEnvironment(size, 2, seed=seed)
+    environment.generate_random_environment()
+    environment.restart()
+    agent = WumpusAgent(size, 2, BitboardKnowledgeBase, rng=random.Random(seed))
+    agent.kb.incremental = incremental
+    reference = KnowledgeBase(size, 2, incremental=incremental)
+    for _ in range(300):
+        percepts = environment.get_percepts()
+        action = agent.get_action(percepts)
+        reference.add_percept(agent.position, percepts)
+        if "Scream" in percepts:
+            reference.wumpus_killed()
+        for name in CELL_SETS:
+            assert set(getattr(agent.kb, name)) == set(getattr(reference, name)), name
+        assert agent.kb.certainty_map == reference.certainty_map
+        for cell in agent.kb.topology.cells:
+            assert agent.kb.is_definitely_safe(cell) == reference.is_definitely_safe(cell)
+            assert agent.kb.is_dangerous(cell) == reference.is_dangerous(cell)
+        agent.update_state(action, environment.execute_action(action))
+        if agent.position not in reference.visited:
+            reference.add_visit(agent.position)
+        if not environment.agent_alive or action == "Climb":
+            break
@@ -0,0 +1,120 @@
+"""Planner paths against breadth-first search over (cell, heading) states"""
+import random
+from collections import deque
+
+import pytest
+
+from path_planner import INFINITY, SafePathPlanner
+from simulator import KNOWLEDGE_BASES
+from topology import DIRECTIONS
+
+SIZE = 12
+
+def explored(kb_class, seed):
+    """Knowledge of a board where about two thirds of the cells were visited and a few more are safe"""
+    rng = random.Random(seed)
+    kb = kb_class(SIZE, 2)
+    cells = kb.topology.cells
+    for cell in cells:
+        if cell == (0, 0) or rng.random() < 0.65:
+            kb.add_visit(cell)
+    for cell in rng.sample(cells, 10):
+        if cell not in kb.visited:
+            kb.safe_cells.add(cell)
+    kb.version += 1
+    return kb, rng
+
+def passable(kb, cell):
+    return cell in kb.visited or (cell in kb.safe_cells and cell not in kb.pit_possible
+                                  and cell not in kb.wumpus_possible)
+
+def action_costs(kb, start, direction):
+    """Fewest actions to enter each cell from (start, direction), moving only through passable cells"""
+    costs = {}
+    seen = {(start, direction)}
+    queue = deque([(start, direction, 0)])
+    while queue:
+        cell, heading, cost = queue.popleft()
+        dx, dy = DIRECTIONS[heading]
+        ahead = (cell[0] + dx, cell[1] + dy)
+        successors = [(cell, (heading + 1) % 4), (cell, (heading + 3) % 4)]
+        if 0 <= ahead[0] < SIZE and 0 <= ahead[1] < SIZE and passable(kb, ahead):
+            successors.append((ahead, heading))
+            costs.setdefault(ahead, cost + 1)
+        for state in successors:
+            if state not in seen:
+                seen.add(state)
+                queue.append((state[0], state[1], cost + 1))
+    return costs
+
+def plan_cost(kb, start, direction, path):
+    """Actions needed to follow path, checking each step is a safe neighbor"""
+    cost, cell = 0, start
+    for step in path:
+        assert passable(kb, step)
+        heading = DIRECTIONS.index((step[0] - cell[0], step[1] - cell[1]))
+        turns = (heading - direction) % 4
+        cost += min(turns, 4 - turns) + 1
+        cell, direction = step, heading
+    return cost
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+@pytest.mark.parametrize("seed", range(6))
+def test_turn_aware_paths_are_cheapest(kb, seed):
+    kb, rng = explored(KNOWLEDGE_BASES[kb], seed)
+    planner = SafePathPlanner(kb.topology)
+    cells = kb.topology.cells
+    for _ in range(40):
+        start, direction, target = rng.choice(cells), rng.randrange(4), rng.choice(cells)
+        expected = action_costs(kb, start, direction).get(target)
+        path = planner.path(kb, start, target, direction)
+        if expected is None or start == target:
+            assert path == []
+        else:
+            assert path[-1] == target
+            assert plan_cost(kb, start, direction, path) == expected
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+@pytest.mark.parametrize("seed", range(6))
+def test_repaired_fields_match_fresh_ones(kb, seed):
+    kb, rng = explored(KNOWLEDGE_BASES[kb], seed)
+    planner = SafePathPlanner(kb.topology)
+    targets = [(0, 0)] + rng.sample(sorted(kb.visited), 3)
+    for _ in range(5):
+        for target in targets:
+            planner.distance(kb, (0, 0), target)
+        for cell in rng.sample(kb.topology.cells, 6):
+            if rng.random() < 0.5:
+                kb.add_visit(cell)
+            elif cell not in kb.visited:
+                kb.safe_cells.discard(cell)
+                kb.pit_possible.add(cell)
+                kb.version += 1
+        fresh = SafePathPlanner(kb.topology)
+        for target in targets:
+            for cell in kb.topology.cells:
+                assert planner.distance(kb, cell, target) == fresh.distance(kb, cell, target)
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+@pytest.mark.parametrize("seed", range(6))
+def test_frontier_reaches_every_safe_unvisited_cell_cheapest(kb, seed):
+    kb, rng = explored(KNOWLEDGE_BASES[kb], seed)
+    planner = SafePathPlanner(kb.topology)
+    for _ in range(10):
+        start, direction = rng.choice(sorted(kb.visited)), rng.randrange(4)
+        costs = action_costs(kb, start, direction)
+        frontier = planner.frontier(kb, start, direction)
+        expected = {cell: cost for cell, cost in costs.items() if cell not in kb.visited}
+        assert frontier.distances == expected
+        for target, cost in expected.items():
+            assert plan_cost(kb, start, direction, frontier.path(target)) == cost
+        assert planner.frontier(kb, start, direction) is frontier
+
+def test_unreachable_target():
+    kb_class = KNOWLEDGE_BASES["sets"]
+    kb = kb_class(SIZE, 2)
+    kb.add_visit((0, 0))
+    kb.add_visit((5, 5))
+    planner = SafePathPlanner(kb.topology)
+    assert planner.path(kb, (0, 0), (5, 5), 0) == []
+    assert planner.distance(kb, (0, 0), (5, 5)) == INFINITY
@@ -0,0 +1,89 @@
+"""FrontierInference against brute-force enumeration on small boards"""
+import itertools
+import random
+
+import pytest
+
+from bitboard import BitboardKnowledgeBase
+from knowledge_base import KnowledgeBase
+from world_generator import WorldGenerator
+
+SIZE = 4
+
+def observe(kb_class, seed):
+    """A knowledge base that has visited a random hazard-free region of a random world"""
+    rng = random.Random(seed)
+    pits, wumpuses, _, _ = WorldGenerator(SIZE, 2, pit_density=(0.1, 0.2)).generate(rng)
+    kb = kb_class(SIZE, len(wumpuses))
+    frontier, visited = [(0, 0)], set()
+    while frontier and len(visited) < rng.randint(2, 8):
+        pos = frontier.pop(rng.randrange(len(frontier)))
+        if pos in visited:
+            continue
+        visited.add(pos)
+        adjacent = kb.topology.adjacent(pos)
+        percepts = []
+        if any(adj in wumpuses for adj in adjacent):
+            percepts.append("Stench")
+        if any(adj in pits for adj in adjacent):
+            percepts.append("Breeze")
+        kb.add_visit(pos)
+        kb.add_percept(pos, percepts)
+        frontier.extend(adj for adj in adjacent if adj not in pits and adj not in wumpuses)
+    return kb
+
+def unknown_cells(kb, known_free):
+    return [(x, y) for y in range(SIZE) for x in range(SIZE)
+            if (x, y) not in kb.visited and (x, y) not in known_free]
+
+def brute_force_pits(kb, prior):
+    constraints = [[adj for adj in kb.topology.adjacent(pos) if adj not in kb.visited and adj not in kb.no_pit]
+                   for pos in kb.breeze_locations]
+    cells = sorted({cell for constraint in constraints for cell in constraint})
+    total, weights = 0.0, dict.fromkeys(cells, 0.0)
+    for values in itertools.product((0, 1), repeat=len(cells)):
+        pits = {cell for cell, value in zip(cells, values) if value}
+        if all(pits.intersection(constraint) for constraint in constraints):
+            weight = prior ** len(pits) * (1 - prior) ** (len(cells) - len(pits))
+            total += weight
+            for cell in pits:
+                weights[cell] += weight
+    return {cell: weight / total for cell, weight in weights.items()}
+
+def brute_force_wumpuses(kb):
+    remaining = kb.num_wumpuses - kb.wumpuses_killed
+    constraints = [set(kb.topology.adjacent(pos)) for pos in kb.stench_locations]
+    cells = unknown_cells(kb, kb.no_wumpus)
+    consistent = [set(chosen) for chosen in itertools.combinations(cells, remaining)
+                  if all(constraint.intersection(chosen) for constraint in constraints)]
+    return {cell: sum(cell in chosen for chosen in consistent) / len(consistent) for cell in cells}
+
+@pytest.mark.parametrize("kb_class", [KnowledgeBase, BitboardKnowledgeBase])
+@pytest.mark.parametrize("seed", range(25))
+def test_pit_probabilities_match_brute_force(kb_class, seed):
+    kb = observe(kb_class, seed)
+    inference = kb.inference
+    expected = brute_force_pits(kb, inference.pit_prior)
+    for cell in unknown_cells(kb, kb.no_pit):
+        probability = inference.pit_probability(kb, cell)
+        assert probability is not None
+        assert probability == pytest.approx(expected.get(cell, inference.pit_prior))
+
+@pytest.mark.parametrize("kb_class", [KnowledgeBase, BitboardKnowledgeBase])
+@pytest.mark.parametrize("seed", range(25))
+def test_wumpus_probabilities_match_brute_force(kb_class, seed):
+    kb = observe(kb_class, seed)
+    expected = brute_force_wumpuses(kb)
+    for cell, probability in expected.items():
+        assert kb.inference.wumpus_probability(kb, cell) == pytest.approx(probability)
+
+def test_results_are_cached_per_version():
+    kb = observe(KnowledgeBase, 3)
+    inference = kb.inference
+    inference.pit_probability(kb, (3, 3))
+    evaluations = inference.stats.evaluations
+    inference.pit_probability(kb, (2, 3))
+    assert inference.stats.evaluations == evaluations
+    kb.add_visit((0, 0))
+    inference.pit_probability(kb, (2, 3))
+    assert inference.stats.evaluations == evaluations + 1
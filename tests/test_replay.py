@@ -0,0 +1,52 @@
+"""Recorded episodes replay exactly and can be sought in any order"""
+import pytest
+
+from replay import EpisodeRecording, Replay, ReplayDivergence
+from simulator import KNOWLEDGE_BASES, Simulator
+
+def state(replay):
+    environment, agent = replay.environment, replay.agent
+    return (environment.snapshot()[:-1], environment.arrow_rng.getstate(), agent.position, agent.direction,
+            agent.score, set(agent.kb.visited), set(agent.kb.safe_cells), agent.rng.getstate())
+
+@pytest.fixture(params=["sets", "bitboard"])
+def recording(request, tmp_path):
+    simulator = Simulator(8, 2, max_steps=300, kb_class=KNOWLEDGE_BASES[request.param])
+    recorded = EpisodeRecording.from_simulator(simulator, 11)
+    path = str(tmp_path / "episode.wrp")
+    recorded.save(path)
+    loaded = EpisodeRecording.load(path)
+    assert loaded == recorded and loaded.kb == request.param
+    assert len(loaded.actions) > 10
+    return loaded
+
+def test_replay_follows_recording(recording):
+    replay = Replay(recording)
+    assert type(replay.agent.kb) is KNOWLEDGE_BASES[recording.kb]
+    assert replay.first_divergence() is None
+    assert replay.step_index == len(recording.actions)
+
+def test_seek_matches_straight_replay(recording):
+    straight = Replay(recording, snapshot_every=4)
+    states = [state(straight)]
+    while straight.step_index < len(straight):
+        straight.step()
+        states.append(state(straight))
+
+    replay = Replay(recording, snapshot_every=4)
+    for step in [len(replay), 0, len(replay) // 2, 3, len(replay) - 1, 1]:
+        replay.seek(step)
+        assert state(replay) == states[step]
+
+def test_seek_out_of_range(recording):
+    replay = Replay(recording)
+    for step in (-1, len(replay) + 1):
+        with pytest.raises(IndexError):
+            replay.seek(step)
+
+def test_divergence_is_reported(recording):
+    actions = bytearray(recording.actions)
+    actions[0] = (actions[0] + 1) % 6
+    recording.actions = bytes(actions)
+    divergence = Replay(recording).first_divergence()
+    assert isinstance(divergence, ReplayDivergence) and divergence.step == 0
@@ -0,0 +1,75 @@
+"""snapshot()/restore() and clone() of environments, agents and knowledge bases"""
+import pickle
+import random
+
+import pytest
+
+from codes import ACTION_CODES, CLIMB, CLIMBED_OUT, UNKNOWN_ACTION
+from simulator import KNOWLEDGE_BASES, Simulator
+
+def play(environment, agent, steps):
+    """Step the game and return what happened, for comparing runs"""
+    history = []
+    for _ in range(steps):
+        if not environment.agent_alive:
+            break
+        code = ACTION_CODES.get(agent.get_action(environment.get_percepts()), UNKNOWN_ACTION)
+        result = environment.step(code)
+        agent.apply_result(code, result)
+        history.append((code, result, agent.position, agent.score, len(agent.kb.safe_cells)))
+        if code == CLIMB and result == CLIMBED_OUT:
+            break
+    return history
+
+def started_game(kb, seed, size=10):
+    simulator = Simulator(size, 2, max_steps=1, kb_class=KNOWLEDGE_BASES[kb])
+    simulator.run_episode(seed)
+    environment, agent = simulator.environment, simulator.agent
+    play(environment, agent, random.Random(seed).randint(0, 25))
+    return environment, agent
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+@pytest.mark.parametrize("seed", range(8))
+def test_restore_and_clone_replay_the_same_game(kb, seed):
+    environment, agent = started_game(kb, seed)
+    environment_snapshot, agent_snapshot = environment.snapshot(), agent.snapshot()
+    environment_clone, agent_clone = environment.clone(), agent.clone()
+    expected = play(environment, agent, 300)
+
+    environment.restore(environment_snapshot)
+    agent.restore(agent_snapshot)
+    assert play(environment, agent, 300) == expected
+    assert play(environment_clone, agent_clone, 300) == expected
+
+    environment.restore(environment_snapshot)
+    agent.restore(agent_snapshot)
+    assert play(environment, agent, 300) == expected
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+def test_snapshots_are_unaffected_by_later_changes(kb):
+    environment, agent = started_game(kb, 3)
+    environment_snapshot, agent_snapshot = environment.snapshot(), agent.snapshot()
+    frozen = pickle.dumps((environment_snapshot, agent_snapshot))
+    environment.pits.add((5, 5))
+    environment.breeze_map[0] += 1
+    agent.kb.visited.add((7, 7))
+    play(environment, agent, 50)
+    assert pickle.dumps((environment_snapshot, agent_snapshot)) == frozen
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+def test_clone_is_independent(kb):
+    environment, agent = started_game(kb, 5)
+    visited = set(agent.kb.visited)
+    clone = agent.clone(rng=random.Random(0))
+    clone.kb.add_visit((9, 9))
+    assert set(agent.kb.visited) == visited
+    assert (9, 9) in clone.kb.visited
+
+@pytest.mark.parametrize("kb", sorted(KNOWLEDGE_BASES))
+def test_snapshots_pickle(kb):
+    environment, agent = started_game(kb, 2)
+    environment_snapshot, agent_snapshot = pickle.loads(pickle.dumps((environment.snapshot(), agent.snapshot())))
+    expected = play(environment.clone(), agent.clone(), 300)
+    environment.restore(environment_snapshot)
+    agent.restore(agent_snapshot)
+    assert play(environment, agent, 300) == expected
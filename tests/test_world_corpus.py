@@ -0,0 +1,82 @@
+"""Corpus records survive encoding, files and environments unchanged"""
+import random
+
+import pytest
+
+from environment import WumpusEnvironment
+from world_corpus import (CorpusWriter, WorldCorpus, WorldRecord, decode_record, encode_record,
+                          generate_corpus, record_size)
+from world_generator import IMPOSSIBLE, WorldGenerator, classify_cells
+
+@pytest.mark.parametrize("size", [4, 10, 17])
+def test_record_round_trip(size):
+    rng = random.Random(size)
+    generator = WorldGenerator(size, 2)
+    for seed in range(20):
+        pits, wumpuses, gold, solvability = generator.generate(rng)
+        record = WorldRecord.from_world(size, pits, wumpuses, gold, seed, solvability)
+        data = record.to_bytes()
+        assert len(data) == record_size(size)
+        decoded = decode_record(size, data)
+        assert decoded == record
+        assert (decoded.pits, decoded.wumpus_positions, decoded.gold_pos) == (pits, wumpuses, gold)
+        assert WorldRecord.from_grid(record.to_grid(), seed) == record
+        assert classify_cells(size, record.to_cells()) == solvability
+
+def test_encode_without_gold():
+    data = encode_record(5, 0b1010, 1 << 24, None, seed=9, solvability=IMPOSSIBLE)
+    assert decode_record(5, data) == WorldRecord(5, 9, None, IMPOSSIBLE, 0b1010, 1 << 24)
+
+def test_corpus_file_round_trip(tmp_path):
+    path = str(tmp_path / "worlds.wwc")
+    assert generate_corpus(path, 40, size=8, seed=100) == 40
+    generator = WorldGenerator(8, 2)
+    with WorldCorpus(path) as corpus:
+        assert len(corpus) == 40 and corpus.size == 8
+        for index in (0, 17, 39, -1):
+            record = corpus[index]
+            pits, wumpuses, gold, solvability = generator.generate(random.Random(record.seed))
+            assert record == WorldRecord.from_world(8, pits, wumpuses, gold, record.seed, solvability)
+        assert corpus[2:5] == [corpus[2], corpus[3], corpus[4]]
+        with pytest.raises(IndexError):
+            corpus[40]
+
+    copy_path = str(tmp_path / "copy.wwc")
+    with WorldCorpus(path) as corpus, CorpusWriter(copy_path, 8) as writer:
+        for record in corpus:
+            writer.write(record)
+    with WorldCorpus(path) as corpus, WorldCorpus(copy_path) as copy:
+        assert list(copy) == list(corpus)
+
+def test_record_view_outlives_close(tmp_path):
+    path = str(tmp_path / "worlds.wwc")
+    generate_corpus(path, 3, size=6)
+    corpus = WorldCorpus(path)
+    raw, record = corpus.record_view(1), corpus[1]
+    corpus.close()
+    assert decode_record(6, raw) == record
+
+def test_as_array_matches_records(tmp_path):
+    pytest.importorskip("numpy")
+    path = str(tmp_path / "worlds.wwc")
+    generate_corpus(path, 10, size=6, seed=5)
+    with WorldCorpus(path) as corpus:
+        array = corpus.as_array()
+        assert [int(seed) for seed in array["seed"]] == [record.seed for record in corpus]
+        assert [int(code) for code in array["solvability"]] == [record.solvability for record in corpus]
+        del array
+
+def test_environment_plays_the_recorded_world():
+    grid = [list("--W-"), list("-P--"), list("---G"), list("----")]
+    record = WorldRecord.from_grid(grid, seed=2)
+    environment = WumpusEnvironment(4, 1, seed=0)
+    record.load_into(environment)
+    assert WorldRecord.from_environment(environment, 2) == record
+
+def test_gold_less_record_is_played_without_gold():
+    record = WorldRecord.from_grid([list("----"), list("-P--"), list("----"), list("--W-")])
+    assert record.gold is None and record.solvability == IMPOSSIBLE
+    environment = WumpusEnvironment(4, 1, seed=1)
+    record.load_into(environment)
+    assert environment.gold_pos is None
+    assert environment.solvability == IMPOSSIBLE
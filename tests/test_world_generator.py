@@ -0,0 +1,53 @@
+"""Seeded world generation, single and bulk"""
+import random
+
+import pytest
+
+import world_generator
+from world_generator import GOLD, IMPOSSIBLE, PIT, WUMPUS, SAFE_ZONE, WorldGenerator, classify_cells
+
+def check_world(cells, size, num_wumpuses, min_distance=3):
+    codes = list(cells)
+    assert codes.count(GOLD) == 1
+    wumpuses = [(i % size, i // size) for i, code in enumerate(codes) if code == WUMPUS]
+    assert len(wumpuses) == num_wumpuses
+    for x, y in SAFE_ZONE:
+        assert codes[y * size + x] not in (PIT, WUMPUS)
+    for i, (ax, ay) in enumerate(wumpuses):
+        for bx, by in wumpuses[i + 1:]:
+            assert abs(ax - bx) + abs(ay - by) >= min_distance
+
+def test_seed_reproduces_world():
+    generator = WorldGenerator(12, 3)
+    assert generator.generate(random.Random(4)) == generator.generate(random.Random(4))
+
+def test_bulk_python_worlds_are_valid():
+    generator = WorldGenerator(8, 2)
+    worlds, solvabilities = generator._generate_bulk_python(200, seed=1)
+    for index in range(200):
+        cells = worlds[index * 64:(index + 1) * 64]
+        check_world(cells, 8, 2)
+        assert classify_cells(8, cells) == solvabilities[index]
+
+def test_bulk_numpy_worlds_are_valid():
+    pytest.importorskip("numpy")
+    generator = WorldGenerator(8, 2)
+    worlds, solvabilities = generator.generate_bulk_numpy(300, seed=2)
+    for cells, solvability in zip(worlds, solvabilities):
+        check_world(bytes(cells), 8, 2)
+        assert classify_cells(8, bytes(cells)) == solvability
+    bulk_worlds, bulk_solvabilities = generator.generate_bulk(300, seed=2)
+    assert bytes(bulk_worlds) == worlds.tobytes()
+    assert bytes(bulk_solvabilities) == solvabilities.tobytes()
+
+def test_bulk_numpy_works_in_chunks(monkeypatch):
+    np = pytest.importorskip("numpy")
+    monkeypatch.setattr(world_generator, "BULK_CHUNK_CELLS", 64 * 7)
+    generator = WorldGenerator(8, 2, reject_impossible=True)
+    chunks = list(generator.iter_bulk_numpy(30, seed=3))
+    assert [len(worlds) for worlds, _ in chunks] == [7, 7, 7, 7, 2]
+    worlds, solvabilities = generator.generate_bulk_numpy(30, seed=3)
+    assert np.array_equal(worlds, np.concatenate([worlds for worlds, _ in chunks]))
+    assert not (solvabilities == IMPOSSIBLE).any()
+    pits, wumpuses, gold, failed = generator.generate_arrays(30, np.random.default_rng(0))
+    assert pits.shape == wumpuses.shape == (30, 64) and len(gold) == len(failed) == 30
@@ -0,0 +1,110 @@
+from typing import Dict, List, Optional, Tuple
+
+Cell = Tuple[int, int]
+
+# Heading vectors indexed by direction: 0 = North, 1 = East, 2 = South, 3 = West
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))
+
+# Order in which adjacent cells are listed (N, S, E, W); planners break ties by it
+ADJACENT_OFFSETS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+# Boards up to this many cells get a full per-cell neighbor bitmask table; larger boards
+# build masks on demand since each mask is as wide as the board itself
+NEIGHBOR_MASK_TABLE_LIMIT = 4096
+
+class GridTopology:
+    """Immutable neighbor and heading tables for one board size, shared by every user.
+
+    Use GridTopology.for_size(size) rather than the constructor so all agents,
+    knowledge bases and environments of the same size share one instance.
+    """
+
+    _instances: Dict[int, "GridTopology"] = {}
+
+    def __init__(self, size: int):
+        self.size = size
+        self.cell_count = size * size
+        self.cells = tuple((x, y) for y in range(size) for x in range(size))
+        self.neighbors: Dict[Cell, Tuple[Cell, ...]] = {
+            cell: self._compute_adjacent(cell) for cell in self.cells
+        }
+        # forward[(cell, direction)] is the cell ahead, or None at the edge of the board
+        self.forward: Dict[Tuple[Cell, int], Optional[Cell]] = {}
+        for x, y in self.cells:
+            for direction, (dx, dy) in enumerate(DIRECTIONS):
+                ahead = (x + dx, y + dy)
+                self.forward[((x, y), direction)] = ahead if self.in_bounds(ahead) else None
+        # ahead_index[index * 4 + direction] is the index of the cell ahead, or -1 at the edge;
+        # lets planners search (cell, heading) states as plain ints
+        self.ahead_index: List[int] = [
+            -1 if ahead is None else ahead[1] * size + ahead[0]
+            for ahead in (self.forward[(cell, direction)] for cell in self.cells for direction in range(4))
+        ]
+
+        self.full_mask = (1 << self.cell_count) - 1
+        left_column = sum(1 << (y * size) for y in range(size))
+        self.not_left_column = self.full_mask & ~left_column
+        self.not_right_column = self.full_mask & ~(left_column << (size - 1))
+        self._neighbor_masks: Optional[List[int]] = None
+
+    @classmethod
+    def for_size(cls, size: int) -> "GridTopology":
+        topology = cls._instances.get(size)
+        if topology is None:
+            topology = cls._instances[size] = cls(size)
+        return topology
+
+    def __copy__(self) -> "GridTopology":
+        return self
+
+    def __deepcopy__(self, memo) -> "GridTopology":
+        # Shared and never mutated, so copies of agents and environments keep the same instance
+        return self
+
+    def in_bounds(self, pos: Cell) -> bool:
+        x, y = pos
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def _compute_adjacent(self, pos: Cell) -> Tuple[Cell, ...]:
+        x, y = pos
+        return tuple((x + dx, y + dy) for dx, dy in ADJACENT_OFFSETS
+                     if 0 <= x + dx < self.size and 0 <= y + dy < self.size)
+
+    def adjacent(self, pos: Cell) -> Tuple[Cell, ...]:
+        """In-bounds orthogonal neighbors of pos (pos itself may lie off the board)"""
+        neighbors = self.neighbors.get(pos)
+        if neighbors is None:
+            neighbors = self._compute_adjacent(pos)
+        return neighbors
+
+    def ahead(self, pos: Cell, direction: int) -> Cell:
+        """Cell one step from pos along direction, without bounds checking"""
+        dx, dy = DIRECTIONS[direction]
+        return (pos[0] + dx, pos[1] + dy)
+
+    def index(self, pos: Cell) -> int:
+        return pos[1] * self.size + pos[0]
+
+    def dilate(self, bits: int) -> int:
+        """Bitboard of cells orthogonally adjacent to any cell in bits"""
+        size = self.size
+        return ((bits << size) | (bits >> size) |
+                ((bits & self.not_right_column) << 1) |
+                ((bits & self.not_left_column) >> 1)) & self.full_mask
+
+    def flood_fill(self, seeds: int, passable: int) -> int:
+        """Bitboard of passable cells reachable from the passable cells in seeds"""
+        reach = seeds & passable
+        while True:
+            grown = (reach | self.dilate(reach)) & passable
+            if grown == reach:
+                return reach
+            reach = grown
+
+    def neighbor_mask(self, index: int) -> int:
+        """Bitboard of the neighbors of the cell at index"""
+        if self._neighbor_masks is None:
+            if self.cell_count > NEIGHBOR_MASK_TABLE_LIMIT:
+                return self.dilate(1 << index)
+            self._neighbor_masks = [self.dilate(1 << i) for i in range(self.cell_count)]
+        return self._neighbor_masks[index]
@@ -0,0 +1,335 @@
+"""Binary world corpus: fixed-size records that are memory-mapped and indexed in place.
+
+Layout (little endian):
+  header  magic (8 bytes), format version u16, board size u16, record size u32, record count u64
+  record  seed u64, gold cell u32, solvability u8, Wumpus count u8, padding u16,
+          pit bitmap, Wumpus bitmap (ceil(size * size / 8) bytes each, bit i is cell y * size + x),
+          padded to a multiple of 8 bytes
+
+Records are written in bulk by CorpusWriter and read by WorldCorpus, which maps the
+file and decodes a record only when it is indexed. Cell codes, seeds and solvability
+come from world_generator.
+"""
+import argparse
+import mmap
+import random
+import struct
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set, Tuple
+
+from environment import parse_grid_from_file, format_grid
+from world_generator import WorldGenerator, PIT, WUMPUS, GOLD, SOLVABILITY_NAMES, classify_world
+
+Cell = Tuple[int, int]
+
+MAGIC = b"WUMPUSWC"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sHHIQ")
+RECORD_HEADER = struct.Struct("<QIBBH")
+NO_GOLD = 0xFFFFFFFF
+
+def bitmap_bytes(size: int) -> int:
+    return (size * size + 7) // 8
+
+def record_size(size: int) -> int:
+    return (RECORD_HEADER.size + 2 * bitmap_bytes(size) + 7) & ~7
+
+def encode_record(size: int, pit_bits: int, wumpus_bits: int, gold: Optional[int], seed=0, solvability=0) -> bytes:
+    """One record in the corpus layout, padding included"""
+    nbytes = bitmap_bytes(size)
+    header = RECORD_HEADER.pack(seed, NO_GOLD if gold is None else gold, solvability,
+                                bin(wumpus_bits).count("1"), 0)
+    data = header + pit_bits.to_bytes(nbytes, "little") + wumpus_bits.to_bytes(nbytes, "little")
+    return data + bytes(record_size(size) - len(data))
+
+def decode_record(size: int, buffer, offset=0) -> "WorldRecord":
+    seed, gold, solvability, _, _ = RECORD_HEADER.unpack_from(buffer, offset)
+    nbytes = bitmap_bytes(size)
+    start = offset + RECORD_HEADER.size
+    view = memoryview(buffer)
+    pit_bits = int.from_bytes(view[start:start + nbytes], "little")
+    wumpus_bits = int.from_bytes(view[start + nbytes:start + 2 * nbytes], "little")
+    return WorldRecord(size, seed, None if gold == NO_GOLD else gold, solvability, pit_bits, wumpus_bits)
+
+def _bits(cells: Iterable[Cell], size: int) -> int:
+    bits = 0
+    for x, y in cells:
+        bits |= 1 << (y * size + x)
+    return bits
+
+def _cells(bits: int, size: int) -> Set[Cell]:
+    cells = set()
+    digits = bin(bits)[:1:-1]
+    index = digits.find("1")
+    while index >= 0:
+        cells.add((index % size, index // size))
+        index = digits.find("1", index + 1)
+    return cells
+
+@dataclass(frozen=True)
+class WorldRecord:
+    size: int
+    seed: int
+    gold: Optional[int]
+    solvability: int
+    pit_bits: int
+    wumpus_bits: int
+
+    @property
+    def pits(self) -> Set[Cell]:
+        return _cells(self.pit_bits, self.size)
+
+    @property
+    def wumpus_positions(self) -> Set[Cell]:
+        return _cells(self.wumpus_bits, self.size)
+
+    @property
+    def gold_pos(self) -> Optional[Cell]:
+        if self.gold is None:
+            return None
+        return (self.gold % self.size, self.gold // self.size)
+
+    def load_into(self, environment):
+        environment.load_world(self.size, self.pits, self.wumpus_positions, self.gold_pos, self.solvability)
+
+    @classmethod
+    def from_world(cls, size: int, pits: Iterable[Cell], wumpus_positions: Iterable[Cell],
+                   gold_pos: Optional[Cell], seed=0, solvability: Optional[int] = None) -> "WorldRecord":
+        pits = set(pits)
+        wumpus_positions = set(wumpus_positions)
+        if solvability is None:
+            solvability = classify_world(size, pits, wumpus_positions, gold_pos)
+        gold = gold_pos[1] * size + gold_pos[0] if gold_pos is not None else None
+        return cls(size, seed, gold, solvability, _bits(pits, size), _bits(wumpus_positions, size))
+
+    @classmethod
+    def from_environment(cls, environment, seed=0) -> "WorldRecord":
+        return cls.from_world(environment.size, environment.pits, environment.wumpus_positions,
+                              environment.gold_pos, seed, environment.solvability)
+
+    @classmethod
+    def from_grid(cls, grid: List[List[str]], seed=0) -> "WorldRecord":
+        """Text grid (row 0 is the top row) to record; a grid without G has no gold"""
+        size = len(grid)
+        pits, wumpuses, gold_pos = set(), set(), None
+        for row_index, row in enumerate(grid):
+            y = size - 1 - row_index
+            for x, cell in enumerate(row):
+                if cell == 'P':
+                    pits.add((x, y))
+                elif cell == 'W':
+                    wumpuses.add((x, y))
+                elif cell == 'G':
+                    gold_pos = (x, y)
+        return cls.from_world(size, pits, wumpuses, gold_pos, seed)
+
+    def to_grid(self) -> List[List[str]]:
+        grid = [['-'] * self.size for _ in range(self.size)]
+        for x, y in self.pits:
+            grid[self.size - 1 - y][x] = 'P'
+        for x, y in self.wumpus_positions:
+            grid[self.size - 1 - y][x] = 'W'
+        if self.gold is not None:
+            x, y = self.gold_pos
+            grid[self.size - 1 - y][x] = 'G'
+        return grid
+
+    def to_bytes(self) -> bytes:
+        return encode_record(self.size, self.pit_bits, self.wumpus_bits, self.gold, self.seed, self.solvability)
+
+    def to_cells(self) -> bytearray:
+        """The record in world_generator's compact one-byte-per-cell format"""
+        cells = bytearray(self.size * self.size)
+        for index in range(self.size * self.size):
+            if self.pit_bits >> index & 1:
+                cells[index] = PIT
+            elif self.wumpus_bits >> index & 1:
+                cells[index] = WUMPUS
+        if self.gold is not None:
+            cells[self.gold] = GOLD
+        return cells
+
+class CorpusWriter:
+    """Appends records to a new corpus file; the record count is written on close"""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.bitmap_bytes = bitmap_bytes(size)
+        self.record_size = record_size(size)
+        self.count = 0
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, size, self.record_size, 0))
+
+    def write_bits(self, pit_bits: int, wumpus_bits: int, gold: Optional[int], seed=0, solvability=0):
+        """Append one record given as bitboards (cell index y * size + x)"""
+        self._file.write(encode_record(self.size, pit_bits, wumpus_bits, gold, seed, solvability))
+        self.count += 1
+
+    def write(self, record: WorldRecord):
+        if record.size != self.size:
+            raise ValueError(f"Record is {record.size}x{record.size} but the corpus holds {self.size}x{self.size} worlds")
+        self.write_bits(record.pit_bits, record.wumpus_bits, record.gold, record.seed, record.solvability)
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.size, self.record_size, self.count))
+        self._file.close()
+
+    def __enter__(self) -> "CorpusWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+class WorldCorpus(Sequence):
+    """Read-only, memory-mapped view of a corpus file; records decode on access"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a world corpus")
+        magic, version, self.size, self.record_size, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a world corpus")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} uses corpus format {version}, expected {FORMAT_VERSION}")
+        if self.record_size != record_size(self.size):
+            raise ValueError(f"{path} has {self.record_size}-byte records, expected {record_size(self.size)}")
+        if len(self._map) < HEADER.size + self.count * self.record_size:
+            raise ValueError(f"{path} is truncated")
+        self.bitmap_bytes = bitmap_bytes(self.size)
+        self._view = memoryview(self._map)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("corpus index out of range")
+        return HEADER.size + index * self.record_size
+
+    def record_view(self, index: int) -> bytes:
+        """Raw bytes of one record.
+
+        A copy, so it stays valid after close(); a view into the map would keep
+        the map from being closed while any caller still held one.
+        """
+        offset = self._offset(index)
+        return self._map[offset:offset + self.record_size]
+
+    def __getitem__(self, index: int) -> WorldRecord:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self.count))]
+        return decode_record(self.size, self._view, self._offset(index))
+
+    def load_into(self, environment, index: int):
+        self[index].load_into(environment)
+
+    def as_array(self):
+        """The records as a read-only numpy.memmap structured array (needs NumPy)"""
+        import numpy as np
+
+        nbytes = self.bitmap_bytes
+        dtype = np.dtype({
+            "names": ["seed", "gold", "solvability", "wumpus_count", "pits", "wumpuses"],
+            "formats": ["<u8", "<u4", "u1", "u1", ("u1", nbytes), ("u1", nbytes)],
+            "offsets": [0, 8, 12, 13, RECORD_HEADER.size, RECORD_HEADER.size + nbytes],
+            "itemsize": self.record_size,
+        })
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=HEADER.size, shape=(self.count,))
+
+    def close(self):
+        self._view.release()
+        self._map.close()
+
+    def __enter__(self) -> "WorldCorpus":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def generate_corpus(path: str, count: int, size=10, num_wumpuses=2, seed=0, reject_impossible=False) -> int:
+    """Write count random worlds; world i is generated from random.Random(seed + i) and records that seed"""
+    generator = WorldGenerator(size, num_wumpuses, reject_impossible=reject_impossible)
+    rng = random.Random()
+    with CorpusWriter(path, size) as writer:
+        for i in range(count):
+            rng.seed(seed + i)
+            pits, wumpuses, gold, solvability = generator.generate_indices(rng)
+            pit_bits = 0
+            for cell in pits:
+                pit_bits |= 1 << cell
+            wumpus_bits = 0
+            for cell in wumpuses:
+                wumpus_bits |= 1 << cell
+            writer.write_bits(pit_bits, wumpus_bits, gold, seed + i, solvability)
+    return count
+
+def convert_grid_files(paths: List[str], corpus_path: str) -> int:
+    """Pack text grid files (all of one size) into a corpus"""
+    records = [WorldRecord.from_grid(parse_grid_from_file(path)) for path in paths]
+    if not records:
+        raise ValueError("No grid files given")
+    with CorpusWriter(corpus_path, records[0].size) as writer:
+        for record in records:
+            writer.write(record)
+    return len(records)
+
+def export_grid_file(corpus_path: str, index: int, grid_path: str):
+    with WorldCorpus(corpus_path) as corpus:
+        grid = corpus[index].to_grid()
+    with open(grid_path, "w") as file:
+        file.write(format_grid(grid))
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect binary world corpora")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="write random worlds to a corpus")
+    generate.add_argument("corpus")
+    generate.add_argument("--count", type=int, default=100000)
+    generate.add_argument("--size", type=int, default=10)
+    generate.add_argument("--wumpuses", type=int, default=2)
+    generate.add_argument("--seed", type=int, default=0, help="world i is generated with seed + i")
+    generate.add_argument("--reject-impossible", action="store_true")
+
+    pack = commands.add_parser("from-grids", help="pack text grid files into a corpus")
+    pack.add_argument("corpus")
+    pack.add_argument("grids", nargs="+")
+
+    export = commands.add_parser("to-grid", help="write one corpus world as a text grid")
+    export.add_argument("corpus")
+    export.add_argument("index", type=int)
+    export.add_argument("grid")
+
+    info = commands.add_parser("info", help="summarize a corpus")
+    info.add_argument("corpus")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_corpus(args.corpus, args.count, args.size, args.wumpuses, args.seed, args.reject_impossible)
+        print(f"Wrote {args.count} worlds to {args.corpus}")
+    elif args.command == "from-grids":
+        count = convert_grid_files(args.grids, args.corpus)
+        print(f"Wrote {count} worlds to {args.corpus}")
+    elif args.command == "to-grid":
+        export_grid_file(args.corpus, args.index, args.grid)
+    else:
+        with WorldCorpus(args.corpus) as corpus:
+            counts = [0] * len(SOLVABILITY_NAMES)
+            for i in range(len(corpus)):
+                counts[corpus[i].solvability] += 1
+            print(f"{len(corpus)} worlds of {corpus.size}x{corpus.size}")
+            for name, count in zip(SOLVABILITY_NAMES, counts):
+                print(f"  {name}: {count}")
+
+if __name__ == "__main__":
+    main()
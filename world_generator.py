@@ -0,0 +1,347 @@
+import importlib.util
+import random
+from typing import Iterable, List, Optional, Set, Tuple
+
+from topology import GridTopology
+
+Cell = Tuple[int, int]
+
+# Cell codes used by the compact world format (one byte per cell, index y * size + x)
+EMPTY, PIT, WUMPUS, GOLD = 0, 1, 2, 3
+
+# World classifications: the gold can be fetched without touching a hazard, only by
+# shooting one Wumpus out of the way (one arrow, 70% hit chance), or not at all
+SOLVABLE, SOLVABLE_WITH_RISK, IMPOSSIBLE = 0, 1, 2
+SOLVABILITY_NAMES = ("solvable", "solvable with risk", "impossible")
+
+SAFE_ZONE = ((0, 0), (0, 1), (1, 0))
+
+# Vectorized generation works through worlds in chunks of about this many cells,
+# which bounds its float key matrices at a few tens of megabytes
+BULK_CHUNK_CELLS = 1 << 22
+
+def _classify(topology: GridTopology, pit_bits: int, wumpuses: Iterable[int], gold: int) -> int:
+    """Classify a world from its pit bitboard, Wumpus cell indices and gold cell index"""
+    wumpus_bits = 0
+    for wumpus in wumpuses:
+        wumpus_bits |= 1 << wumpus
+    free = topology.full_mask & ~pit_bits & ~wumpus_bits
+    gold_bit = 1 << gold
+    reach = topology.flood_fill(1, free)
+    if reach & gold_bit:
+        return SOLVABLE
+
+    # Only a Wumpus on the edge of the reachable region can be shot from inside it
+    border = topology.dilate(reach) & wumpus_bits
+    while border:
+        bit = border & -border
+        border ^= bit
+        if topology.flood_fill(1, free | bit) & gold_bit:
+            return SOLVABLE_WITH_RISK
+    return IMPOSSIBLE
+
+def classify_world(size: int, pits: Iterable[Cell], wumpuses: Iterable[Cell], gold: Optional[Cell]) -> int:
+    """SOLVABLE, SOLVABLE_WITH_RISK or IMPOSSIBLE for a world starting at (0, 0)"""
+    if gold is None:
+        return IMPOSSIBLE
+    pit_bits = 0
+    for x, y in pits:
+        pit_bits |= 1 << (y * size + x)
+    return _classify(GridTopology.for_size(size), pit_bits,
+                     [y * size + x for x, y in wumpuses], gold[1] * size + gold[0])
+
+def classify_cells(size: int, cells) -> int:
+    """Classify one world in the compact format"""
+    pit_bits = 0
+    wumpuses = []
+    gold = None
+    for index, code in enumerate(cells):
+        if code == PIT:
+            pit_bits |= 1 << index
+        elif code == WUMPUS:
+            wumpuses.append(index)
+        elif code == GOLD:
+            gold = index
+    if gold is None:
+        return IMPOSSIBLE
+    return _classify(GridTopology.for_size(size), pit_bits, wumpuses, gold)
+
+class WorldGenerator:
+    """Samples random worlds without rejection loops.
+
+    Pits are drawn in one shot with a partial Fisher-Yates shuffle of the
+    allowed cells. Wumpuses are drawn from a candidate pool from which every
+    cell closer than min_wumpus_distance to a placed Wumpus is removed, and the
+    gold is drawn from whatever free cells remain. All randomness comes from
+    the generator passed in, so worlds are reproducible per seed.
+
+    Every world is classified with a bitboard flood fill from (0, 0); with
+    reject_impossible=True worlds whose gold cannot be reached are redrawn.
+    """
+
+    def __init__(self, size=10, num_wumpuses=2, pit_density=(0.08, 0.10), min_wumpus_distance=3,
+                 reject_impossible=False):
+        self.size = size
+        self.topology = GridTopology.for_size(size)
+        self.num_wumpuses = num_wumpuses
+        self.reject_impossible = reject_impossible
+        self.min_pits = int(size * size * pit_density[0])
+        self.max_pits = int(size * size * pit_density[1])
+        self.min_wumpus_distance = min_wumpus_distance
+
+        safe = {y * size + x for x, y in SAFE_ZONE if x < size and y < size}
+        self.allowed = [i for i in range(size * size) if i not in safe]
+        # Offsets of every cell strictly closer than min_wumpus_distance (Manhattan)
+        reach = min_wumpus_distance - 1
+        self.exclusion_offsets = [(dx, dy) for dx in range(-reach, reach + 1)
+                                  for dy in range(-reach, reach + 1)
+                                  if abs(dx) + abs(dy) <= reach]
+
+    def generate_indices(self, rng: random.Random) -> Tuple[List[int], List[int], int, int]:
+        """Return (pit indices, Wumpus indices, gold index, solvability) for one world"""
+        while True:
+            pits, wumpuses, gold = self._sample(rng)
+            pit_bits = 0
+            for i in pits:
+                pit_bits |= 1 << i
+            solvability = _classify(self.topology, pit_bits, wumpuses, gold)
+            if solvability != IMPOSSIBLE or not self.reject_impossible:
+                return pits, wumpuses, gold, solvability
+
+    def _sample(self, rng: random.Random) -> Tuple[List[int], List[int], int]:
+        size = self.size
+        cells = list(self.allowed)
+        count = len(cells)
+
+        num_pits = rng.randint(self.min_pits, self.max_pits)
+        for i in range(num_pits):
+            j = rng.randrange(i, count)
+            cells[i], cells[j] = cells[j], cells[i]
+        pits = cells[:num_pits]
+
+        candidates = cells[num_pits:]
+        slot = {cell: i for i, cell in enumerate(candidates)}
+        wumpuses = []
+        for _ in range(self.num_wumpuses):
+            if not candidates:
+                raise ValueError("No room left to place a Wumpus with the required spacing")
+            wumpus = candidates[rng.randrange(len(candidates))]
+            wumpuses.append(wumpus)
+            wx, wy = wumpus % size, wumpus // size
+            for dx, dy in self.exclusion_offsets:
+                x, y = wx + dx, wy + dy
+                if 0 <= x < size and 0 <= y < size:
+                    index = slot.pop(y * size + x, None)
+                    if index is not None:
+                        # Swap-remove keeps the candidate pool a dense list
+                        last = candidates.pop()
+                        if index < len(candidates):
+                            candidates[index] = last
+                            slot[last] = index
+
+        taken = set(wumpuses)
+        free = [cell for cell in cells[num_pits:] if cell not in taken]
+        if not free:
+            raise ValueError("No free cell left for the gold")
+        gold = free[rng.randrange(len(free))]
+        return pits, wumpuses, gold
+
+    def generate(self, rng: random.Random) -> Tuple[Set[Cell], Set[Cell], Cell, int]:
+        """Return (pits, Wumpus positions, gold position, solvability) for one world"""
+        size = self.size
+        pits, wumpuses, gold, solvability = self.generate_indices(rng)
+        return ({(i % size, i // size) for i in pits},
+                {(i % size, i // size) for i in wumpuses},
+                (gold % size, gold // size), solvability)
+
+    def generate_cells(self, rng: random.Random) -> bytearray:
+        """One world in the compact format: a cell code per byte"""
+        cells = bytearray(self.size * self.size)
+        pits, wumpuses, gold, _ = self.generate_indices(rng)
+        for i in pits:
+            cells[i] = PIT
+        for i in wumpuses:
+            cells[i] = WUMPUS
+        cells[gold] = GOLD
+        return cells
+
+    def generate_bulk(self, count: int, seed: Optional[int] = None) -> Tuple[bytearray, bytearray]:
+        """count worlds back to back in the compact format (count * size * size bytes),
+        plus one solvability code per world.
+
+        With NumPy installed the worlds come from generate_bulk_numpy, chunk by
+        chunk; without it each is drawn from random.Random(seed) in turn. The
+        two paths draw different worlds for the same seed.
+        """
+        if importlib.util.find_spec("numpy") is None:
+            return self._generate_bulk_python(count, seed)
+
+        cell_count = self.size * self.size
+        worlds = bytearray(count * cell_count)
+        solvabilities = bytearray(count)
+        start = 0
+        for chunk, solvability in self.iter_bulk_numpy(count, seed):
+            end = start + len(chunk)
+            worlds[start * cell_count:end * cell_count] = chunk.tobytes()
+            solvabilities[start:end] = solvability.tobytes()
+            start = end
+        return worlds, solvabilities
+
+    def _generate_bulk_python(self, count: int, seed: Optional[int]) -> Tuple[bytearray, bytearray]:
+        rng = random.Random(seed)
+        cell_count = self.size * self.size
+        worlds = bytearray(count * cell_count)
+        solvabilities = bytearray(count)
+        for world in range(count):
+            pits, wumpuses, gold, solvabilities[world] = self.generate_indices(rng)
+            base = world * cell_count
+            for i in pits:
+                worlds[base + i] = PIT
+            for i in wumpuses:
+                worlds[base + i] = WUMPUS
+            worlds[base + gold] = GOLD
+        return worlds, solvabilities
+
+    @property
+    def chunk_size(self) -> int:
+        """Worlds per chunk of vectorized generation"""
+        return max(1, BULK_CHUNK_CELLS // (self.size * self.size))
+
+    def generate_arrays(self, count: int, rng):
+        """Vectorized generation with a NumPy Generator.
+
+        Returns (pits, wumpuses, gold, failed): boolean (count, cells) masks, gold
+        indices, and a mask of worlds where the Wumpuses did not fit and which
+        should be drawn again. Worlds are drawn chunk_size at a time.
+        """
+        import numpy as np
+
+        chunk_size = self.chunk_size
+        if count <= chunk_size:
+            return self._generate_chunk(count, rng)
+        parts = [self._generate_chunk(min(chunk_size, count - start), rng)
+                 for start in range(0, count, chunk_size)]
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def _generate_chunk(self, count: int, rng):
+        import numpy as np
+
+        size = self.size
+        cells = size * size
+        allowed = np.zeros(cells, dtype=bool)
+        allowed[self.allowed] = True
+        cell_x = np.arange(cells) % size
+        cell_y = np.arange(cells) // size
+        rows = np.arange(count)
+
+        num_pits = rng.integers(self.min_pits, self.max_pits + 1, size=count)
+        keys = rng.random((count, cells))
+        keys[:, ~allowed] = np.inf
+        rank = np.argsort(np.argsort(keys, axis=1), axis=1)
+        pits = rank < num_pits[:, None]
+
+        wumpuses = np.zeros((count, cells), dtype=bool)
+        failed = np.zeros(count, dtype=bool)
+        candidates = allowed[None, :] & ~pits
+        for _ in range(self.num_wumpuses):
+            keys = np.where(candidates, rng.random((count, cells)), -1.0)
+            choice = np.argmax(keys, axis=1)
+            failed |= keys[rows, choice] < 0
+            wumpuses[rows, choice] = True
+            distance = (np.abs(cell_x[None, :] - cell_x[choice][:, None]) +
+                        np.abs(cell_y[None, :] - cell_y[choice][:, None]))
+            candidates &= distance >= self.min_wumpus_distance
+
+        keys = np.where(allowed[None, :] & ~pits & ~wumpuses, rng.random((count, cells)), -1.0)
+        gold = np.argmax(keys, axis=1)
+        return pits, wumpuses, gold, failed
+
+    def classify_arrays(self, pits, wumpuses, gold):
+        """Vectorized classification of worlds given as boolean (count, cells) masks"""
+        import numpy as np
+
+        size = self.size
+        count = len(gold)
+        rows = np.arange(count)
+        free = ~pits & ~wumpuses
+        reach = _flood_fill_arrays(free, size)
+        solvability = np.full(count, IMPOSSIBLE, dtype=np.uint8)
+        solvable = reach[rows, gold]
+        solvability[solvable] = SOLVABLE
+
+        # Retry the rest with each Wumpus in turn shot out of the way
+        blocked = np.flatnonzero(~solvable)
+        if len(blocked):
+            order = np.argsort(~wumpuses[blocked], axis=1, kind="stable")
+            for k in range(self.num_wumpuses):
+                passable = free[blocked].copy()
+                passable[np.arange(len(blocked)), order[:, k]] = True
+                reach = _flood_fill_arrays(passable, size)
+                risky = reach[np.arange(len(blocked)), gold[blocked]]
+                solvability[blocked[risky]] = SOLVABLE_WITH_RISK
+        return solvability
+
+    def generate_bulk_numpy(self, count: int, seed: Optional[int] = None):
+        """count worlds as a (count, size * size) uint8 array of cell codes, plus a
+        uint8 array of solvability codes"""
+        import numpy as np
+
+        worlds = np.empty((count, self.size * self.size), dtype=np.uint8)
+        solvability = np.empty(count, dtype=np.uint8)
+        start = 0
+        for chunk, codes in self.iter_bulk_numpy(count, seed):
+            end = start + len(chunk)
+            worlds[start:end] = chunk
+            solvability[start:end] = codes
+            start = end
+        return worlds, solvability
+
+    def iter_bulk_numpy(self, count: int, seed: Optional[int] = None):
+        """Yield the worlds of generate_bulk_numpy as (worlds, solvability) chunks of
+        up to chunk_size worlds, so any count fits in bounded memory"""
+        import numpy as np
+
+        rng = np.random.default_rng(seed)
+        chunk_size = self.chunk_size
+        for start in range(0, count, chunk_size):
+            yield self._bulk_chunk(min(chunk_size, count - start), rng)
+
+    def _bulk_chunk(self, count: int, rng):
+        import numpy as np
+
+        pits, wumpuses, gold, failed = self._generate_chunk(count, rng)
+        solvability = self.classify_arrays(pits, wumpuses, gold)
+        if self.reject_impossible:
+            failed |= solvability == IMPOSSIBLE
+        while failed.any():
+            redo = np.flatnonzero(failed)
+            p, w, g, f = self._generate_chunk(len(redo), rng)
+            s = self.classify_arrays(p, w, g)
+            if self.reject_impossible:
+                f |= s == IMPOSSIBLE
+            pits[redo], wumpuses[redo], gold[redo], solvability[redo] = p, w, g, s
+            failed[redo] = f
+
+        worlds = np.zeros(pits.shape, dtype=np.uint8)
+        worlds[pits] = PIT
+        worlds[wumpuses] = WUMPUS
+        worlds[np.arange(count), gold] = GOLD
+        return worlds, solvability
+
+def _flood_fill_arrays(passable, size: int):
+    """Cells reachable from (0, 0) through passable cells, for (count, cells) boolean masks"""
+    import numpy as np
+
+    passable = passable.reshape(-1, size, size)
+    reach = np.zeros_like(passable)
+    reach[:, 0, 0] = passable[:, 0, 0]
+    while True:
+        grown = reach.copy()
+        grown[:, 1:, :] |= reach[:, :-1, :]
+        grown[:, :-1, :] |= reach[:, 1:, :]
+        grown[:, :, 1:] |= reach[:, :, :-1]
+        grown[:, :, :-1] |= reach[:, :, 1:]
+        grown &= passable
+        if np.array_equal(grown, reach):
+            return reach.reshape(len(reach), -1)
+        reach = grown